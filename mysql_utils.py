@@ -12,6 +12,9 @@ from datetime import datetime
 from typing import List, Dict, Tuple
 from dotenv import load_dotenv
 
+from src.deduplication.known_index import remember_saved_listing, CARD_UNCHANGED
+from src.scrapers.listing import Listing
+
 # Załaduj zmienne środowiskowe
 load_dotenv()
 
@@ -46,6 +49,9 @@ REQUIRED_FIELDS = [
 # Cache dla istniejących kolumn - żeby nie sprawdzać za każdym razem
 _table_columns_cache = {}
 
+# Historia zmian cen (zob. sql/migrate_card_fingerprint.sql)
+PRICE_HISTORY_TABLE = "nieruchomosci_price_history"
+
 def get_mysql_connection():
     """
     Tworzy połączenie z bazą danych MySQL
@@ -129,6 +135,37 @@ def get_table_columns(table: str = "nieruchomosci") -> list:
             'has_elevator', 'standard_of_finish', 'source', 'created_at', 'updated_at'
         ]
 
+def load_known_listing_keys(table: str = "nieruchomosci") -> Tuple[Dict[str, str], set]:
+    """
+    Wczytuje klucze ogłoszeń już zapisanych w bazie (indeks znanych ogłoszeń)
+
+    Returns:
+        Tuple[Dict[str, str], set]: URL -> odcisk karty (None bez odcisku) i zbiór
+                                    listing_id znanych ogłoszeń (puste przy błędzie połączenia)
+    """
+    known_urls, known_ids = {}, set()
+    fingerprint_column = "card_fingerprint" if "card_fingerprint" in get_table_columns(table) else "NULL"
+    try:
+        connection = get_mysql_connection()
+        cursor = connection.cursor()
+
+        cursor.execute(f"SELECT url, listing_id, {fingerprint_column} FROM {table}")
+        for url, listing_id, fingerprint in cursor:
+            if url:
+                known_urls[url] = fingerprint
+            if listing_id:
+                known_ids.add(str(listing_id))
+
+        cursor.close()
+        connection.close()
+
+        logger.info(f"📋 Wczytano znane ogłoszenia z '{table}': {len(known_urls)} URL, {len(known_ids)} ID")
+
+    except Exception as e:
+        logger.error(f"❌ Błąd wczytywania znanych ogłoszeń z {table}: {e}")
+
+    return known_urls, known_ids
+
 def save_listing(listing: dict, table: str = "nieruchomosci", require_complete: bool = True) -> bool:
     """
     Zapisuje ogłoszenie do tabeli MySQL zgodnie z nową strukturą bazy
@@ -153,86 +190,32 @@ def save_listing(listing: dict, table: str = "nieruchomosci", require_complete:
         connection = get_mysql_connection()
         cursor = connection.cursor()
         
+        # Pobierz dostępne kolumny
+        available_columns = get_table_columns(table)
+        track_changes = "card_fingerprint" in available_columns
+        
         # Sprawdź czy ogłoszenie już istnieje (po URL)
         url = listing.get("url", "")
+        existing = None
         if url:
-            cursor.execute(f"SELECT ad_id FROM {table} WHERE url = %s", (url,))
-            if cursor.fetchone():
-                logger.debug(f"Ogłoszenie już istnieje: {url}")
-                cursor.close()
-                connection.close()
-                return False
-        
-        # Pobierz dostępne kolumny
-        available_columns = get_table_columns(table)
+            extra_columns = ", card_fingerprint, price" if track_changes else ""
+            cursor.execute(f"SELECT ad_id{extra_columns} FROM {table} WHERE url = %s", (url,))
+            existing = cursor.fetchone()
+            if existing:
+                remember_saved_listing(listing)
+                changed = (track_changes and listing.get("card_fingerprint") and existing[1]
+                           and existing[1] != listing["card_fingerprint"])
+                if not changed:
+                    logger.debug(f"Ogłoszenie już istnieje: {url}")
+                    cursor.close()
+                    connection.close()
+                    touch_listings_seen([listing], table)
+                    return False
         
         # WSZYSTKIE MOŻLIWE DANE - struktura zgodna z nową bazą danych
-        all_possible_data = {
-            # Podstawowe informacje (ad_id pomijamy - AUTO_INCREMENT)
-            "url": listing.get("url"),
-            "listing_id": listing.get("listing_id"),
-            "title_raw": listing.get("title_raw"),
-            "address_raw": listing.get("address_raw"),
-            
-            # Cena i powierzchnia - konwersja na odpowiednie typy
-            "price": float(listing.get("price")) if listing.get("price") is not None and listing.get("price") != '' else None,
-            "area": float(listing.get("area")) if listing.get("area") is not None and listing.get("area") != '' else None,
-            "rooms": int(listing.get("rooms")) if listing.get("rooms") is not None and listing.get("rooms") != '' else None,
-            
-            # Typ rynku
-            "market": listing.get("market"),
-            
-            # Data ogłoszenia
-            "listing_date": listing.get("listing_date"),
-            
-            # Lokalizacja
-            "city": listing.get("city"),
-            "district": listing.get("district"),
-            "street": listing.get("street"),
-            "province": listing.get("province"),
-            "latitude": float(listing.get("latitude")) if listing.get("latitude") is not None and listing.get("latitude") != '' else None,
-            "longitude": float(listing.get("longitude")) if listing.get("longitude") is not None and listing.get("longitude") != '' else None,
-            
-            # Cechy boolean
-            "has_balcony": 1 if listing.get("has_balcony") else 0,
-            "has_garage": 1 if listing.get("has_garage") else 0,
-            "has_garden": 1 if listing.get("has_garden") else 0,
-            "has_elevator": 1 if listing.get("has_elevator") else 0,
-            "has_basement": 1 if listing.get("has_basement") else 0,
-            "has_separate_kitchen": 1 if listing.get("has_separate_kitchen") else 0,
-            "has_dishwasher": 1 if listing.get("has_dishwasher") else 0,
-            "has_fridge": 1 if listing.get("has_fridge") else 0,
-            "has_oven": 1 if listing.get("has_oven") else 0,
-            
-            # Informacje o budynku
-            "year_of_construction": int(listing.get("year_of_construction")) if listing.get("year_of_construction") is not None and listing.get("year_of_construction") != '' else None,
-            "building_type": listing.get("building_type"),
-            "floor": int(listing.get("floor")) if listing.get("floor") is not None and listing.get("floor") != '' else None,
-            "total_floors": int(listing.get("total_floors")) if listing.get("total_floors") is not None and listing.get("total_floors") != '' else None,
-            "standard_of_finish": int(listing.get("standard_of_finish")) if listing.get("standard_of_finish") is not None and listing.get("standard_of_finish") != '' else None,
-            
-            # Ogrzewanie i media
-            "heating_type": listing.get("heating_type"),
-            "rent_amount": float(listing.get("rent_amount")) if listing.get("rent_amount") is not None and listing.get("rent_amount") != '' else None,
-            
-            # Odległości - poprawne nazwy kolumn
-            "distance_to_city_center": int(listing.get("distance_to_city_center")) if listing.get("distance_to_city_center") is not None and listing.get("distance_to_city_center") != '' else None,
-            "distance_to_nearest_lake": int(listing.get("distance_to_nearest_lake")) if listing.get("distance_to_nearest_lake") is not None and listing.get("distance_to_nearest_lake") != '' else None,
-            "distance_to_university": int(listing.get("distance_to_university")) if listing.get("distance_to_university") is not None and listing.get("distance_to_university") != '' else None,
-            "distance_to_nearest_public_transport": int(listing.get("distance_to_nearest_public_transport")) if listing.get("distance_to_nearest_public_transport") is not None and listing.get("distance_to_nearest_public_transport") != '' else None,
-            "distance_to_nearest_school": int(listing.get("distance_to_nearest_school")) if listing.get("distance_to_nearest_school") is not None and listing.get("distance_to_nearest_school") != '' else None,
-            "distance_to_nearest_kindergarten": int(listing.get("distance_to_nearest_kindergarten")) if listing.get("distance_to_nearest_kindergarten") is not None and listing.get("distance_to_nearest_kindergarten") != '' else None,
-            "distance_to_nearest_supermarket": int(listing.get("distance_to_nearest_supermarket")) if listing.get("distance_to_nearest_supermarket") is not None and listing.get("distance_to_nearest_supermarket") != '' else None,
-            
-            # JSON fields
-            "security_features": listing.get("security_features"),
-            "media_features": listing.get("media_features"),
-            
-            # Metadane
-            "source": listing.get("source", "otodom.pl"),
-            "source_page": int(listing.get("source_page")) if listing.get("source_page") is not None and listing.get("source_page") != '' else None,
-            "source_position": int(listing.get("source_position")) if listing.get("source_position") is not None and listing.get("source_position") != '' else None
-        }
+        # (typy znormalizowane raz w rekordzie Listing - bez ponownych konwersji pól)
+        all_possible_data = Listing.from_dict(listing).db_row()
+        all_possible_data["last_seen"] = datetime.now()
         
         # FILTRUJ tylko te kolumny które istnieją w tabeli I MAJĄ WARTOŚCI
         data_to_save = {}
@@ -243,9 +226,25 @@ def save_listing(listing: dict, table: str = "nieruchomosci", require_complete:
                     value = json.dumps(value, ensure_ascii=False)
                 except Exception:
                     value = str(value)
-            if column in available_columns and value is not None and value != "" and str(value) != "None":
+            if column in available_columns and value is not None and value != "" and value != "None":
                 data_to_save[column] = value
         
+        # Karta zmieniła się od ostatniego przebiegu - aktualizuj istniejący wiersz
+        if existing and data_to_save:
+            ad_id, old_price = existing[0], existing[2]
+            assignments = ', '.join(f"{column} = %s" for column in data_to_save)
+            cursor.execute(f"UPDATE {table} SET {assignments} WHERE ad_id = %s",
+                           list(data_to_save.values()) + [ad_id])
+            connection.commit()
+            
+            new_price = data_to_save.get("price")
+            if new_price is not None and (old_price is None or float(old_price) != float(new_price)):
+                record_price_change(cursor, ad_id, old_price, new_price)
+                logger.info(f"💱 Zmiana ceny: {listing.get('title_raw', 'Brak tytułu')[:30]}... {old_price} → {new_price}")
+            else:
+                logger.info(f"🔄 Zaktualizowano: {listing.get('title_raw', 'Brak tytułu')[:30]}...")
+            return True
+        
         # Przygotuj zapytanie INSERT
         if data_to_save:
             columns = ', '.join(data_to_save.keys())
@@ -255,6 +254,7 @@ def save_listing(listing: dict, table: str = "nieruchomosci", require_complete:
             query = f"INSERT INTO {table} ({columns}) VALUES ({placeholders})"
             cursor.execute(query, values)
             connection.commit()
+            remember_saved_listing(listing)
             
             logger.info(f"✅ Zapisano: {listing.get('title_raw', 'Brak tytułu')[:30]}...")
             return True
@@ -286,6 +286,62 @@ def save_listing(listing: dict, table: str = "nieruchomosci", require_complete:
         except:
             pass
 
+def record_price_change(cursor, ad_id: int, old_price, new_price):
+    """Dopisuje zmianę ceny do historii (brak tabeli historii nie przerywa zapisu)"""
+    try:
+        cursor.execute(
+            f"INSERT INTO {PRICE_HISTORY_TABLE} (ad_id, old_price, new_price) VALUES (%s, %s, %s)",
+            (ad_id, old_price, new_price)
+        )
+    except Error as e:
+        logger.debug(f"⚠️ Nie zapisano historii ceny dla ID {ad_id}: {e}")
+
+def touch_listings_seen(listings: list, table: str = "nieruchomosci") -> int:
+    """
+    Oznacza niezmienione ogłoszenia jako widziane (last_seen) bez pobierania szczegółów
+    
+    Wierszom bez odcisku karty (sprzed migracji) dopisuje bieżący odcisk.
+    
+    Args:
+        listings: Ogłoszenia z polami url / card_fingerprint
+        table: Nazwa tabeli w MySQL
+    
+    Returns:
+        int: Liczba zaktualizowanych wierszy
+    """
+    available_columns = get_table_columns(table)
+    if "last_seen" not in available_columns:
+        return 0
+    
+    rows = [(listing.get("card_fingerprint"), listing["url"]) for listing in listings if listing.get("url")]
+    if not rows:
+        return 0
+    
+    connection = None
+    cursor = None
+    try:
+        connection = get_mysql_connection()
+        cursor = connection.cursor()
+        if "card_fingerprint" in available_columns:
+            query = f"UPDATE {table} SET last_seen = NOW(), card_fingerprint = COALESCE(card_fingerprint, %s) WHERE url = %s"
+        else:
+            query = f"UPDATE {table} SET last_seen = NOW() WHERE url = %s"
+            rows = [(url,) for _, url in rows]
+        cursor.executemany(query, rows)
+        connection.commit()
+        return cursor.rowcount
+    except Exception as e:
+        logger.error(f"❌ Błąd aktualizacji last_seen: {e}")
+        return 0
+    finally:
+        try:
+            if cursor:
+                cursor.close()
+            if connection:
+                connection.close()
+        except:
+            pass
+
 def save_listings_to_mysql(listings: list, table: str = "nieruchomosci", require_complete: bool = True) -> int:
     """
     Zapisuje listę ogłoszeń do MySQL z walidacją kompletności danych
@@ -302,6 +358,15 @@ def save_listings_to_mysql(listings: list, table: str = "nieruchomosci", require
         logger.warning("⚠️ Brak ogłoszeń do zapisu")
         return 0
     
+    # Niezmienione karty znanych ogłoszeń - tylko znacznik last_seen, jednym zapytaniem
+    unchanged = [listing for listing in listings if listing.get("card_status") == CARD_UNCHANGED]
+    if unchanged:
+        touched = touch_listings_seen(unchanged, table)
+        logger.info(f"👁️ Niezmienione ogłoszenia: {len(unchanged)} (last_seen: {touched})")
+        listings = [listing for listing in listings if listing.get("card_status") != CARD_UNCHANGED]
+        if not listings:
+            return 0
+    
     logger.info(f"💾 Rozpoczynam zapis {len(listings)} ogłoszeń do MySQL...")
     
     saved_count = 0
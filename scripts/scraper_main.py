@@ -8,17 +8,30 @@ import logging
 import sys
 import os
 import argparse
+import json
 from datetime import datetime
-from typing import List, Dict
+from typing import List, Dict, Optional
 
 # Dodaj główny katalog do ścieżki
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from src.scrapers.otodom_scraper import get_otodom_listings, DEFAULT_BASE_URL
+from src.scrapers.otodom_scraper import iter_otodom_listings, DEFAULT_BASE_URL, INCREMENTAL_STOP_AFTER_KNOWN_PAGES
 from src.parsers.address_parser import process_all_locations
-from src.geocoding.geocoder import main_geocoding_process
+from src.geocoding.geocoder import main_geocoding_process, NOMINATIM_BASE_URL
+from src.fetching.rate_limiter import get_rate_limiter
 from mysql_utils import save_listings_to_mysql, get_mysql_connection
+from src.deduplication.known_index import load_known_index, save_known_index, KNOWN_INDEX_PERSIST
+from src.scrapers.otodom_shards import (
+    plan_shards, run_shards, select_shards, save_shard_plan, load_shard_plan, TARGET_SHARD_PAGES
+)
+from src.scrapers.work_queue import open_work_queue
+from src.scrapers.queue_crawler import seed_crawl, run_queue_worker, default_run_id
+from src.scrapers.crawl_journal import CrawlJournal, JOURNAL_ENABLED, DEFAULT_JOURNAL_PATH
+from src.scrapers.crawl_deadline import CrawlDeadline
 from src.deduplication.deduplicator import deduplicate_listings, generate_duplicate_report
+from src.fetching.html_archive import configure_html_archive, enable_replay_mode, is_replay_mode, get_html_archive
+from src.parsers.parse_pool import configure_parse_pool
+from src.parsers.selector_registry import log_selector_report
 
 # Konfiguracja logowania
 logging.basicConfig(
@@ -131,24 +144,80 @@ def print_stats(title: str, stats: Dict[str, int]):
     print(f"🏢 Z balkonem: {stats['with_balcony_count']:,}")
     print(f"🚗 Z garażem: {stats['with_garage_count']:,}")
 
-def run_scraping_phase(max_pages: int, scrape_details: bool = True, base_url: str = DEFAULT_BASE_URL, batch_size: int = 0, enable_scraper_geocoding: bool = True) -> List[Dict]:
+# Statystyki jakości danych liczone w trakcie scrapowania (nazwa -> warunek)
+QUALITY_STAT_CHECKS = {
+    'with_price': lambda l: l.get('price'),
+    'with_address': lambda l: l.get('address_raw'),
+    'with_area': lambda l: l.get('area'),
+    'with_rooms': lambda l: l.get('rooms'),
+    'with_city': lambda l: l.get('city'),
+    'with_balcony': lambda l: l.get('has_balcony'),
+    'with_garage': lambda l: l.get('has_garage'),
+    'with_garden': lambda l: l.get('has_garden'),
+    'with_elevator': lambda l: l.get('has_elevator'),
+    'primary_market': lambda l: l.get('market') == 'pierwotny',
+    'secondary_market': lambda l: l.get('market') == 'wtórny',
+    'with_year': lambda l: l.get('year_of_construction'),
+    'with_floor': lambda l: l.get('floor'),
+    'with_building_type': lambda l: l.get('building_type'),
+    'with_finish': lambda l: l.get('standard_of_finish'),
+}
+
+def open_crawl_journal(args) -> Optional[CrawlJournal]:
+    """
+    Dziennik crawlu dla zwykłego przebiegu (bez replay) - niedokończony przebieg
+    z tymi samymi parametrami jest wznawiany
+    """
+    if args.no_journal or not JOURNAL_ENABLED or args.replay:
+        return None
+    run_key = json.dumps({"url": args.url or DEFAULT_BASE_URL, "pages": args.pages,
+                          "details": not args.no_details, "incremental": args.incremental}, sort_keys=True)
+    return CrawlJournal(args.journal or DEFAULT_JOURNAL_PATH, run_key=run_key, resume=not args.fresh)
+
+def confirm_saved(journal: Optional[CrawlJournal], listings: List[Dict]):
+    """
+    Potwierdza w dzienniku zapis ogłoszeń do bazy
+    
+    save_listing nie zgłasza błędów połączenia (zwraca False jak dla duplikatu),
+    więc zapis jest potwierdzany tylko, gdy baza jest osiągalna - inaczej
+    ogłoszenia zostają w dzienniku do ponownego zapisu.
+    """
+    if journal is None or not listings:
+        return
+    try:
+        get_mysql_connection().close()
+    except Exception as e:
+        logger.warning(f"⚠️ Baza nieosiągalna - {len(listings)} ogłoszeń zostaje w dzienniku: {e}")
+        return
+    journal.record_flush(listings)
+
+def run_scraping_phase(max_pages: int, scrape_details: bool = True, base_url: str = DEFAULT_BASE_URL, batch_size: int = 0, enable_scraper_geocoding: bool = True, incremental: bool = False, known_pages_stop: int = INCREMENTAL_STOP_AFTER_KNOWN_PAGES, journal: Optional[CrawlJournal] = None, deadline: Optional[CrawlDeadline] = None) -> List[Dict]:
     """
     Faza 1: Scrapowanie ogłoszeń z Otodom.pl z nową strukturą danych
     
     Args:
         max_pages: Maksymalna liczba stron do scrapowania
         scrape_details: Czy pobierać szczegółowe dane z indywidualnych stron
+        incremental: Crawl przyrostowy - tylko nowe ogłoszenia (od najnowszych)
+        known_pages_stop: Po ilu stronach samych znanych ogłoszeń zakończyć crawl przyrostowy
+        journal: Dziennik crawlu - wznowienie od dokładnego ogłoszenia po awarii
+        deadline: Budżet czasu - crawl kończy się z zapasem na opróżnienie potoku i zapis
     
     Returns:
-        List[Dict]: Lista pobranych ogłoszeń
+        List[Dict]: Ogłoszenia niezapisane jeszcze batchami (przy batch_size=0 - wszystkie)
     """
     print(f"\n🔍 FAZA 1: SCRAPOWANIE OTODOM.PL {'+ SZCZEGÓŁOWE DANE' if scrape_details else '(TYLKO LISTA)'}")
     print(f"📄 Maksymalna liczba stron: {'WSZYSTKIE' if (max_pages is None or max_pages <= 0) else max_pages}")
     print(f"🔍 Szczegółowy scraping: {'✅ TAK' if scrape_details else '❌ NIE'}")
     print(f"💾 Batch zapis: {'co ' + str(batch_size) + ' ofert' if batch_size else 'po zakończeniu'}")
+    print(f"🆕 Crawl przyrostowy: {'✅ TAK (stop po ' + str(known_pages_stop) + ' znanych stronach)' if incremental else '❌ NIE'}")
     print("-" * 60)
     
     try:
+        # Indeks ogłoszeń już zapisanych w bazie - ich szczegóły nie są pobierane ponownie
+        if not is_replay_mode():
+            load_known_index()
+        
         # Funkcja zapisu batcha
         def batch_save(batch: List[Dict]):
             if not batch:
@@ -156,64 +225,73 @@ def run_scraping_phase(max_pages: int, scrape_details: bool = True, base_url: st
             print(f"\n💾 Zapis batcha ({len(batch)}) do bazy…")
             unique_batch = deduplicate_listings(batch, similarity_threshold=75.0, keep_best_source=True)
             saved = save_listings_to_mysql(unique_batch, require_complete=False)
+            confirm_saved(journal, batch)
             print(f"✅ Batch zapisany: {saved}/{len(unique_batch)} rekordów")
 
-        listings = get_otodom_listings(base_url=base_url,
-                                       max_pages=max_pages,
-                                       scrape_details=scrape_details,
-                                       batch_size=batch_size,
-                                       batch_callback=batch_save if batch_size else None,
-                                       resume=False,
-                                       enable_geocoding=enable_scraper_geocoding)
-        
-        if listings:
-            print(f"✅ Pobrano {len(listings)} ogłoszeń z Otodom.pl")
-            
-            # Statystyki jakości danych
-            with_price = len([l for l in listings if l.get('price')])
-            with_address = len([l for l in listings if l.get('address_raw')])
-            with_area = len([l for l in listings if l.get('area')])
-            with_rooms = len([l for l in listings if l.get('rooms')])
-            with_city = len([l for l in listings if l.get('city')])
+        # Ogłoszenia spływają strumieniem - w pamięci jest tylko bieżący batch,
+        # a statystyki jakości liczone są na bieżąco
+        listings = []
+        stats = dict.fromkeys(QUALITY_STAT_CHECKS, 0)
+        total = 0
+        for listing in iter_otodom_listings(base_url=base_url,
+                                            max_pages=max_pages,
+                                            scrape_details=scrape_details,
+                                            resume=False,
+                                            enable_geocoding=enable_scraper_geocoding,
+                                            incremental=incremental,
+                                            stop_after_known_pages=known_pages_stop,
+                                            journal=journal,
+                                            deadline=deadline):
+            total += 1
+            for name, check in QUALITY_STAT_CHECKS.items():
+                if check(listing):
+                    stats[name] += 1
             
-            # Statystyki nowych pól
-            with_balcony = len([l for l in listings if l.get('has_balcony')])
-            with_garage = len([l for l in listings if l.get('has_garage')])
-            with_garden = len([l for l in listings if l.get('has_garden')])
-            with_elevator = len([l for l in listings if l.get('has_elevator')])
+            listings.append(listing)
+            if batch_size and len(listings) >= batch_size:
+                try:
+                    batch_save(listings)
+                finally:
+                    listings.clear()
+        
+        if deadline is not None and (deadline.paging_stopped or deadline.stats["dropped"]):
+            print(f"⏱️ Crawl zakończony przez budżet czasu - pominięte ogłoszenia: {deadline.stats['dropped']}, "
+                  f"zmienione odłożone za nowe: {deadline.stats['deferred']}")
+        
+        # Skuteczność selektorów DOM (martwe selektory = zmiana klas CSS na stronie)
+        log_selector_report()
+        
+        if total:
+            print(f"✅ Pobrano {total} ogłoszeń z Otodom.pl")
             
-            primary_market = len([l for l in listings if l.get('market') == 'pierwotny'])
-            secondary_market = len([l for l in listings if l.get('market') == 'wtórny'])
+            def pct(name: str) -> str:
+                return f"{stats[name]}/{total} ({stats[name]/total*100:.1f}%)"
             
-            print(f"💰 Z cenami: {with_price}/{len(listings)} ({with_price/len(listings)*100:.1f}%)")
-            print(f"📍 Z adresami: {with_address}/{len(listings)} ({with_address/len(listings)*100:.1f}%)")
-            print(f"📐 Z powierzchnią: {with_area}/{len(listings)} ({with_area/len(listings)*100:.1f}%)")
-            print(f"🚪 Z pokojami: {with_rooms}/{len(listings)} ({with_rooms/len(listings)*100:.1f}%)")
-            print(f"🏙️ Z miastem: {with_city}/{len(listings)} ({with_city/len(listings)*100:.1f}%)")
+            print(f"💰 Z cenami: {pct('with_price')}")
+            print(f"📍 Z adresami: {pct('with_address')}")
+            print(f"📐 Z powierzchnią: {pct('with_area')}")
+            print(f"🚪 Z pokojami: {pct('with_rooms')}")
+            print(f"🏙️ Z miastem: {pct('with_city')}")
             
             print(f"\n🏷️ STATYSTYKI RYNKU:")
-            print(f"🆕 Rynek pierwotny: {primary_market}/{len(listings)} ({primary_market/len(listings)*100:.1f}%)")
-            print(f"🏘️ Rynek wtórny: {secondary_market}/{len(listings)} ({secondary_market/len(listings)*100:.1f}%)")
+            print(f"🆕 Rynek pierwotny: {pct('primary_market')}")
+            print(f"🏘️ Rynek wtórny: {pct('secondary_market')}")
             
             print(f"\n🏠 STATYSTYKI UDOGODNIEŃ:")
-            print(f"🏢 Z balkonem: {with_balcony}/{len(listings)} ({with_balcony/len(listings)*100:.1f}%)")
-            print(f"🚗 Z garażem: {with_garage}/{len(listings)} ({with_garage/len(listings)*100:.1f}%)")
-            print(f"🌿 Z ogrodem: {with_garden}/{len(listings)} ({with_garden/len(listings)*100:.1f}%)")
-            print(f"🛗 Z windą: {with_elevator}/{len(listings)} ({with_elevator/len(listings)*100:.1f}%)")
+            print(f"🏢 Z balkonem: {pct('with_balcony')}")
+            print(f"🚗 Z garażem: {pct('with_garage')}")
+            print(f"🌿 Z ogrodem: {pct('with_garden')}")
+            print(f"🛗 Z windą: {pct('with_elevator')}")
             
             # Dodatkowe statystyki szczegółowych danych (jeśli dostępne)
             if scrape_details:
-                with_year = len([l for l in listings if l.get('year_of_construction')])
-                with_floor = len([l for l in listings if l.get('floor')])
-                with_building_type = len([l for l in listings if l.get('building_type')])
-                with_finish = len([l for l in listings if l.get('standard_of_finish')])
-                
                 print(f"\n🏗️ STATYSTYKI SZCZEGÓŁOWYCH DANYCH:")
-                print(f"📅 Z rokiem budowy: {with_year}/{len(listings)} ({with_year/len(listings)*100:.1f}%)")
-                print(f"🏢 Z piętrem: {with_floor}/{len(listings)} ({with_floor/len(listings)*100:.1f}%)")
-                print(f"🏘️ Z typem budynku: {with_building_type}/{len(listings)} ({with_building_type/len(listings)*100:.1f}%)")
-                print(f"🎨 Ze stanem wykończenia: {with_finish}/{len(listings)} ({with_finish/len(listings)*100:.1f}%)")
+                print(f"📅 Z rokiem budowy: {pct('with_year')}")
+                print(f"🏢 Z piętrem: {pct('with_floor')}")
+                print(f"🏘️ Z typem budynku: {pct('with_building_type')}")
+                print(f"🎨 Ze stanem wykończenia: {pct('with_finish')}")
             
+            # Zwracamy tylko ogłoszenia, które nie trafiły jeszcze do bazy batchami
             return listings
         else:
             print("❌ Nie pobrano żadnych ogłoszeń")
@@ -279,7 +357,7 @@ def run_geocoding_phase(max_addresses: int) -> bool:
         
         print(f"⚡ Parametry optymalizacji:")
         print(f"   • Batch size: {optimal_batch_size}")
-        print(f"   • Opóźnienie: 1.0s między requestami")
+        print(f"   • Limit tempa: {get_rate_limiter().bucket(NOMINATIM_BASE_URL).rate} req/s (limiter hosta)")
         print(f"   • Max retries: 2")
         
         # Uruchom geocoding (funkcja wyświetla własne statystyki)
@@ -291,7 +369,104 @@ def run_geocoding_phase(max_addresses: int) -> bool:
         logger.error(f"❌ Błąd w fazie geocodingu: {e}")
         return False
 
-def run_complete_pipeline(max_pages: int = 0, max_geocoding_addresses: int = 100, scrape_details: bool = True, base_url: str = DEFAULT_BASE_URL, batch_size: int = 0, enable_scraper_geocoding: bool = True) -> bool:
+def run_sharded_pipeline(args, scrape_details: bool, enable_scraper_geocoding: bool) -> bool:
+    """
+    Shardowany crawl: plan shardów → równoległe procesy (zapis batchami) → geocoding
+    
+    Args:
+        args: Argumenty wiersza poleceń (--shards, --shard-plan, --shard-index, --shard-count, ...)
+        scrape_details: Czy pobierać szczegółowe dane z indywidualnych stron
+        enable_scraper_geocoding: Czy geocodować w scraperze
+    
+    Returns:
+        bool: True jeśli wszystkie shardy zakończyły się bez błędów
+    """
+    print_banner()
+    initial_stats = get_database_stats()
+    print_stats("STATYSTYKI POCZĄTKOWE", initial_stats)
+    
+    base_url = args.url or DEFAULT_BASE_URL
+    print(f"\n🧩 FAZA 1: SHARDOWANY CRAWL ({args.shards} procesów)")
+    print("-" * 60)
+    
+    # Wspólny plan dla wielu maszyn: pierwsza go tworzy, kolejne wczytują
+    if args.shard_plan and os.path.exists(args.shard_plan):
+        shards = load_shard_plan(args.shard_plan)
+        print(f"📋 Wczytano plan shardów: {args.shard_plan} ({len(shards)} shardów)")
+    else:
+        shards = plan_shards(base_url, target_pages=args.shard_target_pages)
+        if args.shard_plan:
+            save_shard_plan(shards, args.shard_plan)
+            print(f"💾 Zapisano plan shardów: {args.shard_plan}")
+    
+    shards = select_shards(shards, args.shard_index, args.shard_count)
+    print(f"🧩 Shardy tej maszyny: {len(shards)} (indeks {args.shard_index}/{args.shard_count})")
+    
+    summary = run_shards(shards,
+                         workers=args.shards,
+                         max_pages=args.pages,
+                         scrape_details=scrape_details,
+                         enable_geocoding=enable_scraper_geocoding,
+                         incremental=args.incremental,
+                         stop_after_known_pages=args.known_pages_stop,
+                         batch_size=args.batch_size,
+                         replay=args.replay,
+                         replay_before=args.replay_before,
+                         archive_dir=args.archive_dir,
+                         archive_enabled=False if args.no_archive else None)
+    
+    print(f"✅ Pobrano {summary['listings']} ogłoszeń, zapisano {summary['saved']}")
+    if summary["failed"]:
+        print(f"❌ Shardy z błędami: {', '.join(summary['failed'])}")
+    
+    if not args.scraping_only and not is_replay_mode() and summary["saved"] > 0:
+        run_geocoding_phase(args.geocoding)
+    
+    final_stats = get_database_stats()
+    print_stats("STATYSTYKI KOŃCOWE", final_stats)
+    return not summary["failed"]
+
+def run_queue_pipeline(args, scrape_details: bool) -> bool:
+    """
+    Crawl z trwałej kolejki zadań: opcjonalne założenie przebiegu → worker → geocoding
+    
+    Wiele procesów/maszyn może uruchomić ten sam tryb na wspólnej kolejce
+    (--queue mysql lub plik SQLite na wspólnym dysku); zadania porzucone przez
+    przerwany worker wracają do kolejki po upływie leasu.
+    
+    Args:
+        args: Argumenty wiersza poleceń (--queue, --queue-seed, --queue-run, --requeue-dead, ...)
+        scrape_details: Czy pobierać szczegółowe dane z indywidualnych stron
+    
+    Returns:
+        bool: True jeśli worker zakończył pracę bez nieudanych zadań
+    """
+    print_banner()
+    queue = open_work_queue(args.queue)
+    print(f"\n📬 KOLEJKA ZADAŃ: {args.queue} {queue.counts()}")
+    print("-" * 60)
+    
+    if args.requeue_dead:
+        print(f"♻️ Przywrócono z dead-letter: {queue.requeue_dead()} zadań")
+    
+    if args.queue_seed:
+        run_id = seed_crawl(queue, args.url or DEFAULT_BASE_URL, run_id=args.queue_run or default_run_id(),
+                            max_pages=args.pages, incremental=args.incremental,
+                            stop_after_known_pages=args.known_pages_stop)
+        print(f"🌱 Założono przebieg {run_id}")
+    
+    if not is_replay_mode():
+        load_known_index()
+    
+    stats = run_queue_worker(queue, scrape_details=scrape_details)
+    print(f"✅ Worker: {stats['pages']} stron, {stats['details']} szczegółów, zapisano {stats['saved']}")
+    print(f"📬 Stan kolejki: {queue.counts()}")
+    
+    if not args.scraping_only and not is_replay_mode() and stats["saved"] > 0:
+        run_geocoding_phase(args.geocoding)
+    return not stats["failed"]
+
+def run_complete_pipeline(max_pages: int = 0, max_geocoding_addresses: int = 100, scrape_details: bool = True, base_url: str = DEFAULT_BASE_URL, batch_size: int = 0, enable_scraper_geocoding: bool = True, incremental: bool = False, known_pages_stop: int = INCREMENTAL_STOP_AFTER_KNOWN_PAGES, journal: Optional[CrawlJournal] = None, deadline: Optional[CrawlDeadline] = None) -> bool:
     """
     Uruchamia kompletny pipeline: scraping → zapis → geocoding
     
@@ -310,7 +485,7 @@ def run_complete_pipeline(max_pages: int = 0, max_geocoding_addresses: int = 100
     print_stats("STATYSTYKI POCZĄTKOWE", initial_stats)
     
     # FAZA 1: Scrapowanie
-    listings = run_scraping_phase(max_pages, scrape_details, base_url=base_url, batch_size=batch_size, enable_scraper_geocoding=enable_scraper_geocoding)
+    listings = run_scraping_phase(max_pages, scrape_details, base_url=base_url, batch_size=batch_size, enable_scraper_geocoding=enable_scraper_geocoding, incremental=incremental, known_pages_stop=known_pages_stop, journal=journal, deadline=deadline)
     if not listings:
         print("❌ Brak danych do dalszego przetwarzania")
         return False
@@ -332,10 +507,17 @@ def run_complete_pipeline(max_pages: int = 0, max_geocoding_addresses: int = 100
 
     # FAZA 3: Zapis do bazy
     saved_count = run_saving_phase(unique_listings)
+    confirm_saved(journal, listings)
     
     # FAZA 4: Geocoding (tylko jeśli zapisano nowe dane)
     geocoding_success = True
-    if saved_count > 0:
+    if is_replay_mode():
+        print(f"\n🌍 FAZA 3: GEOCODING POMINIĘTY")
+        print("💡 Tryb replay - bez zapytań sieciowych")
+    elif deadline is not None and deadline.expired():
+        print(f"\n🌍 FAZA 3: GEOCODING POMINIĘTY")
+        print("💡 Budżet czasu wyczerpany - geocoding w następnym przebiegu")
+    elif saved_count > 0:
         geocoding_success = run_geocoding_phase(max_geocoding_addresses)
     else:
         print(f"\n🌍 FAZA 3: GEOCODING POMINIĘTY")
@@ -369,17 +551,59 @@ def main():
     parser.add_argument('--no-scraper-geocoding', action='store_true', help='Wyłącz geocoding w scrapperze (użyj osobny proces)')
     parser.add_argument('--url', type=str, help='Niestandardowy URL wyników Otodom (opcjonalnie)')
     parser.add_argument('--batch-size', type=int, default=100, help='Rozmiar batcha do zapisu (0 = zapis na końcu)')
+    parser.add_argument('--replay', action='store_true', help='Przetwórz strony z archiwum HTML bez dostępu do sieci')
+    parser.add_argument('--replay-before', type=str, help='Replay stanu sprzed podanego czasu (ISO 8601, np. 2024-05-01T00:00:00)')
+    parser.add_argument('--archive-dir', type=str, help='Katalog archiwum HTML (domyślnie ~/.otodom_archive)')
+    parser.add_argument('--no-archive', action='store_true', help='Nie zapisuj pobranych stron do archiwum HTML')
+    parser.add_argument('--incremental', action='store_true', help='Crawl przyrostowy: od najnowszych, bez ogłoszeń już zapisanych w bazie')
+    parser.add_argument('--known-pages-stop', type=int, default=INCREMENTAL_STOP_AFTER_KNOWN_PAGES, help='Crawl przyrostowy: stop po tylu stronach samych znanych ogłoszeń')
+    parser.add_argument('--shards', type=int, default=0, help='Shardowany crawl: liczba równoległych procesów (0 = jeden strumień stron)')
+    parser.add_argument('--shard-plan', type=str, help='Plik JSON z planem shardów (tworzony, jeśli nie istnieje)')
+    parser.add_argument('--shard-target-pages', type=int, default=TARGET_SHARD_PAGES, help='Docelowa liczba stron wyników na shard')
+    parser.add_argument('--shard-index', type=int, default=0, help='Indeks tej maszyny przy podziale shardów między maszyny')
+    parser.add_argument('--shard-count', type=int, default=1, help='Liczba maszyn dzielących shardy')
+    parser.add_argument('--queue', type=str, help='Crawl z trwałej kolejki zadań: ścieżka SQLite, sqlite:///ścieżka lub mysql')
+    parser.add_argument('--queue-seed', action='store_true', help='Kolejka: załóż przebieg (zadanie pierwszej strony wyników)')
+    parser.add_argument('--queue-run', type=str, help='Kolejka: identyfikator przebiegu (domyślnie bieżąca godzina)')
+    parser.add_argument('--journal', type=str, help='Plik dziennika crawlu (domyślnie ~/.otodom_journal.jsonl)')
+    parser.add_argument('--no-journal', action='store_true', help='Nie prowadź dziennika crawlu (brak wznowienia po awarii)')
+    parser.add_argument('--fresh', action='store_true', help='Zignoruj niedokończony dziennik i zacznij crawl od nowa')
+    parser.add_argument('--deadline', type=float, help='Budżet czasu przebiegu w minutach (np. 600 przy limicie joba 640)')
+    parser.add_argument('--drain-reserve', type=float, help='Budżet czasu: minuty zostawiane na opróżnienie potoku i zapis (domyślnie 10)')
+    parser.add_argument('--requeue-dead', action='store_true', help='Kolejka: przywróć zadania z dead-letter przed startem')
+    parser.add_argument('--parse-workers', type=int, help='Liczba procesów parsujących strony (domyślnie liczba rdzeni, 0 = w wątkach)')
     
     args = parser.parse_args()
     
+    # Budżet czasu liczony od startu procesu
+    deadline = CrawlDeadline.from_minutes(args.deadline, args.drain_reserve) if args.deadline else None
+    
     # Określ czy scraping szczegółów
     scrape_details = not args.no_details
     
     # Określ czy geocoding w scrapperze
     enable_scraper_geocoding = not args.no_scraper_geocoding
     
+    # Parsowanie stron w osobnych procesach (niezależnie od współbieżności pobrań)
+    configure_parse_pool(workers=args.parse_workers)
+    
+    # Archiwum HTML / tryb replay
+    configure_html_archive(root=args.archive_dir, enabled=False if args.no_archive else None)
+    if args.replay:
+        enable_replay_mode(before=args.replay_before)
+        enable_scraper_geocoding = False
+    
+    journal = None
     try:
-        if args.scraping_only:
+        if args.queue:
+            # Worker trwałej kolejki zadań (wiele procesów/maszyn)
+            success = run_queue_pipeline(args, scrape_details)
+            print(f"\n{'🎉 WORKER ZAKOŃCZONY POMYŚLNIE!' if success else '❌ WORKER ZAKOŃCZONY Z BŁĘDAMI'}")
+        elif args.shards:
+            # Shardowany crawl w wielu procesach
+            success = run_sharded_pipeline(args, scrape_details, enable_scraper_geocoding)
+            print(f"\n{'🎉 SHARDY ZAKOŃCZONE POMYŚLNIE!' if success else '❌ SHARDY ZAKOŃCZONE Z BŁĘDAMI'}")
+        elif args.scraping_only:
             # Tylko scrapowanie i zapis
             print_banner()
             initial_stats = get_database_stats()
@@ -387,15 +611,18 @@ def main():
             
             base_url = args.url or DEFAULT_BASE_URL
             batch_size = args.batch_size
-            listings = run_scraping_phase(args.pages, scrape_details, base_url=base_url, batch_size=batch_size)
+            journal = open_crawl_journal(args)
+            listings = run_scraping_phase(args.pages, scrape_details, base_url=base_url, batch_size=batch_size, enable_scraper_geocoding=enable_scraper_geocoding, incremental=args.incremental, known_pages_stop=args.known_pages_stop, journal=journal, deadline=deadline)
             if listings:
                 saved_count = run_saving_phase(listings)
+                confirm_saved(journal, listings)
                 print(f"\n🎉 ZAKOŃCZONO: Pobrano {len(listings)}, zapisano {saved_count}")
             else:
                 print("❌ Nie pobrano żadnych danych")
         else:
             # Kompletny pipeline
-            success = run_complete_pipeline(args.pages, args.geocoding, scrape_details, args.url or DEFAULT_BASE_URL, batch_size=args.batch_size, enable_scraper_geocoding=enable_scraper_geocoding)
+            journal = open_crawl_journal(args)
+            success = run_complete_pipeline(args.pages, args.geocoding, scrape_details, args.url or DEFAULT_BASE_URL, batch_size=args.batch_size, enable_scraper_geocoding=enable_scraper_geocoding, incremental=args.incremental, known_pages_stop=args.known_pages_stop, journal=journal, deadline=deadline)
             if success:
                 print(f"\n🎉 PIPELINE ZAKOŃCZONY POMYŚLNIE!")
             else:
@@ -406,6 +633,14 @@ def main():
     except Exception as e:
         logger.error(f"❌ Błąd głównego procesu: {e}")
         print(f"\n❌ Błąd: {e}")
+    finally:
+        if journal is not None:
+            journal.close()
+        if KNOWN_INDEX_PERSIST:
+            save_known_index()
+        archive_stats = get_html_archive().stats
+        if any(archive_stats.values()):
+            print(f"🗄️ Archiwum HTML: {archive_stats}")
 
 if __name__ == "__main__":
     main() 
\ No newline at end of file
@@ -8,7 +8,8 @@
 -- Użyj istniejącej bazy danych
 USE hyxoyexiuq_scraper;
 
--- Usuń tabelę jeśli istnieje
+-- Usuń tabele jeśli istnieją
+DROP TABLE IF EXISTS nieruchomosci_price_history;
 DROP TABLE IF EXISTS nieruchomosci;
 
 -- =====================================================
@@ -85,6 +86,8 @@ CREATE TABLE nieruchomosci (
     source VARCHAR(50) DEFAULT 'otodom.pl',
     source_page INT,
     source_position INT,
+    card_fingerprint CHAR(16),
+    last_seen TIMESTAMP NULL,
     scraped_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
     updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
@@ -94,7 +97,24 @@ CREATE TABLE nieruchomosci (
     INDEX idx_price (price),
     INDEX idx_city (city),
     INDEX idx_source (source),
-    INDEX idx_url (url)
+    INDEX idx_url (url),
+    INDEX idx_last_seen (last_seen)
+    
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+
+-- =====================================================
+-- HISTORIA ZMIAN CEN (wykrywanie zmian kart)
+-- =====================================================
+
+CREATE TABLE nieruchomosci_price_history (
+    id INT AUTO_INCREMENT PRIMARY KEY,
+    ad_id INT NOT NULL,
+    old_price DECIMAL(12,2),
+    new_price DECIMAL(12,2),
+    changed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    
+    INDEX idx_ad_id (ad_id),
+    INDEX idx_changed_at (changed_at)
     
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
 
@@ -0,0 +1,31 @@
+-- =====================================================
+-- MIGRACJA: WYKRYWANIE ZMIAN KART OGŁOSZEŃ
+-- Odcisk pól karty wyników (tytuł, cena, powierzchnia, pokoje, adres),
+-- znacznik ostatniego wystąpienia w wynikach i historia zmian cen.
+-- Scraper pobiera ponownie szczegóły tylko ogłoszeń ze zmienionym odciskiem.
+-- =====================================================
+
+USE hyxoyexiuq_scraper;
+
+ALTER TABLE nieruchomosci
+    ADD COLUMN card_fingerprint CHAR(16) NULL AFTER source_position,
+    ADD COLUMN last_seen TIMESTAMP NULL AFTER card_fingerprint,
+    ADD INDEX idx_last_seen (last_seen);
+
+-- Dotychczasowe ogłoszenia: widziane ostatnio przy ostatniej aktualizacji
+-- (odcisk karty zostanie uzupełniony przy najbliższym crawlu bez pobierania szczegółów)
+UPDATE nieruchomosci SET last_seen = updated_at WHERE last_seen IS NULL;
+
+CREATE TABLE IF NOT EXISTS nieruchomosci_price_history (
+    id INT AUTO_INCREMENT PRIMARY KEY,
+    ad_id INT NOT NULL,
+    old_price DECIMAL(12,2),
+    new_price DECIMAL(12,2),
+    changed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    
+    INDEX idx_ad_id (ad_id),
+    INDEX idx_changed_at (changed_at)
+    
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+
+SELECT '✅ MIGRACJA ZAKOŃCZONA: card_fingerprint, last_seen, historia cen' AS status;
@@ -135,16 +135,17 @@ def calculate_listings_similarity(listing1: Dict, listing2: Dict) -> float:
     Returns:
         float: Procent podobieństwa (0-100).
     """
+    # Waliduj dane wejściowe
+    return _validated_similarity(validate_listing_data(listing1), validate_listing_data(listing2))
+
+def _validated_similarity(listing1: Dict, listing2: Dict) -> float:
+    """Podobieństwo ogłoszeń już przepuszczonych przez validate_listing_data"""
     # Wybierz funkcję porównania tekstów
     if FUZZYWUZZY_AVAILABLE:
         ratio_func = fuzz.ratio
     else:
         ratio_func = levenshtein_ratio  # Użyj alternatywnej funkcji
     
-    # Waliduj dane wejściowe
-    listing1 = validate_listing_data(listing1)
-    listing2 = validate_listing_data(listing2)
-    
     total_weight = 0
     similarity_score = 0
 
@@ -261,12 +262,14 @@ def find_duplicates(listings: List[Dict], similarity_threshold: float = 75.0) ->
         Tuple[List[Dict], List[Dict]]: Krotka zawierająca listę unikalnych ogłoszeń i listę duplikatów.
     """
     unique_listings = []
+    unique_validated = []  # Walidacja raz na ogłoszenie, nie przy każdym porównaniu pary
     duplicates = []
     
     for i, current_listing in enumerate(listings):
         is_duplicate = False
-        for j, unique_listing in enumerate(unique_listings):
-            similarity = calculate_listings_similarity(current_listing, unique_listing)
+        current_validated = validate_listing_data(current_listing)
+        for j, unique_listing in enumerate(unique_validated):
+            similarity = _validated_similarity(current_validated, unique_listing)
             if similarity >= similarity_threshold:
                 duplicates.append(current_listing)
                 is_duplicate = True
@@ -274,6 +277,7 @@ def find_duplicates(listings: List[Dict], similarity_threshold: float = 75.0) ->
         
         if not is_duplicate:
             unique_listings.append(current_listing)
+            unique_validated.append(current_validated)
             
     return unique_listings, duplicates
 
@@ -302,11 +306,13 @@ def deduplicate_listings(listings: List[Dict], similarity_threshold: float = 75.
         listings.sort(key=lambda x: source_priority.index(x.get('source', 'unknown')) if x.get('source') in source_priority else len(source_priority))
 
     unique_listings = []
+    unique_validated = []  # Walidacja raz na ogłoszenie, nie przy każdym porównaniu pary
     
     for current_listing in listings:
         is_duplicate = False
+        current_validated = validate_listing_data(current_listing)
         for i, existing_unique in enumerate(unique_listings):
-            similarity = calculate_listings_similarity(current_listing, existing_unique)
+            similarity = _validated_similarity(current_validated, unique_validated[i])
             if similarity >= similarity_threshold:
                 # Znaleziono duplikat
                 is_duplicate = True
@@ -318,10 +324,12 @@ def deduplicate_listings(listings: List[Dict], similarity_threshold: float = 75.
                     
                     if current_source_priority < existing_source_priority: # Jeśli obecne jest lepsze
                         unique_listings[i] = current_listing # Zastąp istniejący unikalny ogłoszeniem z lepszego źródła
+                        unique_validated[i] = current_validated
                 break
         
         if not is_duplicate:
             unique_listings.append(current_listing)
+            unique_validated.append(current_validated)
             
     return unique_listings
 
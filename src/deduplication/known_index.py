@@ -0,0 +1,320 @@
+#!/usr/bin/env python3
+"""
+INDEKS ZNANYCH OGŁOSZEŃ - SZYBKIE SPRAWDZANIE CZŁONKOSTWA I ZMIAN
+Kompaktowy indeks URL-i i ID ogłoszeń już zapisanych w bazie: wczytywany
+hurtowo przy starcie, uzupełniany przy każdym zapisie i opcjonalnie
+utrwalany na dysku. Etap szczegółów sprawdza go przed pobraniem strony,
+więc najdroższa operacja nie jest wykonywana dla danych, które już mamy.
+Przy każdym URL indeks trzyma odcisk karty z wyników (tytuł, cena,
+powierzchnia, pokoje, adres) - szczegóły są pobierane ponownie tylko,
+gdy karta się zmieniła.
+"""
+import hashlib
+import logging
+import math
+import os
+import struct
+import sys
+import threading
+from array import array
+from pathlib import Path
+from typing import Dict, Iterable, Optional
+from urllib.parse import urlsplit
+
+# Dodaj główny katalog do ścieżki
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+logger = logging.getLogger(__name__)
+
+# Konfiguracja indeksu
+KNOWN_INDEX_PATH = Path(os.getenv("KNOWN_INDEX_PATH", str(Path.home() / ".otodom_known_index.bin")))
+KNOWN_INDEX_PERSIST = os.getenv("KNOWN_INDEX_PERSIST", "0") == "1"
+BLOOM_CAPACITY = 2_000_000        # Przewidywana liczba kluczy (URL + ID na ogłoszenie)
+BLOOM_ERROR_RATE = 0.001          # Odsetek fałszywie "znanych" kluczy
+
+FILE_MAGIC = b"OKIX"
+FILE_VERSION = 2
+FILE_HEADER = struct.Struct("<4sBBQQI")  # magic, wersja, rodzaj, klucze, bity, funkcje skrótu
+KIND_HASHSET, KIND_BLOOM = 1, 2
+
+# Status karty względem bazy
+CARD_NEW = "new"              # Ogłoszenia nie ma w bazie
+CARD_CHANGED = "changed"      # Jest w bazie, ale karta się zmieniła (np. obniżka ceny)
+CARD_UNCHANGED = "unchanged"  # Jest w bazie z tym samym odciskiem karty (lub bez odcisku)
+
+NO_FINGERPRINT = 0
+
+
+def _digest(key: str) -> int:
+    """64-bitowy skrót klucza (8 bajtów zamiast całego URL w pamięci)"""
+    return int.from_bytes(hashlib.blake2b(key.encode("utf-8"), digest_size=8).digest(), "little")
+
+
+def card_fingerprint(listing: Dict) -> str:
+    """
+    Stabilny odcisk pól karty wyników (tytuł, cena, powierzchnia, pokoje, adres)
+
+    Returns:
+        str: 16 znaków hex (kolumna card_fingerprint)
+    """
+    def text(value) -> str:
+        return " ".join(str(value or "").lower().split())
+
+    def number(value, digits: int) -> str:
+        try:
+            return f"{round(float(value), digits):.{digits}f}"
+        except (TypeError, ValueError):
+            return ""
+
+    key = "|".join((
+        text(listing.get("title_raw")),
+        number(listing.get("price"), 0),
+        number(listing.get("area"), 2),
+        number(listing.get("rooms"), 0),
+        text(listing.get("address_raw")),
+    ))
+    return hashlib.blake2b(key.encode("utf-8"), digest_size=8).hexdigest()
+
+
+def _fingerprint_value(fingerprint: Optional[str]) -> int:
+    try:
+        return int(fingerprint, 16) if fingerprint else NO_FINGERPRINT
+    except ValueError:
+        return NO_FINGERPRINT
+
+
+def normalize_listing_url(url: str) -> str:
+    """Sprowadza URL ogłoszenia do postaci kanonicznej (bez query, fragmentu i końcowego /)"""
+    parts = urlsplit(url.strip())
+    return f"{parts.netloc.lower()}{parts.path.rstrip('/')}"
+
+
+class BloomFilter:
+    """
+    Filtr Blooma na skrótach 64-bitowych (podwójne haszowanie Kirscha-Mitzenmachera)
+
+    Około 1.8 MB na milion kluczy przy 0.1% fałszywych trafień; nigdy nie zwraca
+    fałszywego "nieznany".
+    """
+
+    def __init__(self, capacity: int = BLOOM_CAPACITY, error_rate: float = BLOOM_ERROR_RATE,
+                 num_bits: Optional[int] = None, num_hashes: Optional[int] = None):
+        self.num_bits = num_bits or max(8, int(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.num_hashes = num_hashes or max(1, round(self.num_bits / capacity * math.log(2)))
+        self.bits = bytearray((self.num_bits + 7) // 8)
+
+    def _positions(self, digest: int) -> Iterable[int]:
+        h1, h2 = digest & 0xFFFFFFFF, (digest >> 32) | 1
+        return ((h1 + i * h2) % self.num_bits for i in range(self.num_hashes))
+
+    def add(self, digest: int):
+        for position in self._positions(digest):
+            self.bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, digest: int) -> bool:
+        return all(self.bits[position >> 3] & (1 << (position & 7)) for position in self._positions(digest))
+
+
+class KnownListingIndex:
+    """
+    Thread-safe indeks znanych ogłoszeń (klucze: URL i listing_id)
+
+    Domyślnie dokładna mapa 64-bitowy skrót -> odcisk karty; z use_bloom=True
+    - filtr Blooma o stałym rozmiarze (kosztem rzadkich fałszywie "znanych"
+    ogłoszeń i bez wykrywania zmian kart).
+    """
+
+    def __init__(self, use_bloom: bool = False, capacity: int = BLOOM_CAPACITY,
+                 error_rate: float = BLOOM_ERROR_RATE):
+        self.use_bloom = use_bloom
+        self._keys = BloomFilter(capacity, error_rate) if use_bloom else {}
+        self._lock = threading.Lock()
+        self.loaded = False
+        self.stats = {"keys": 0, "hits": 0, "misses": 0}
+
+    def _add_digest(self, digest: int, fingerprint: int = NO_FINGERPRINT):
+        with self._lock:
+            if self.use_bloom:
+                if digest not in self._keys:
+                    self._keys.add(digest)
+                    self.stats["keys"] += 1
+            else:
+                if digest not in self._keys:
+                    self.stats["keys"] += 1
+                if fingerprint != NO_FINGERPRINT or digest not in self._keys:
+                    self._keys[digest] = fingerprint
+
+    def add(self, url: Optional[str] = None, listing_id: Optional[str] = None,
+            fingerprint: Optional[str] = None):
+        """Dodaje ogłoszenie (z odciskiem karty przypisanym do URL) do indeksu"""
+        if url:
+            self._add_digest(_digest("u:" + normalize_listing_url(url)), _fingerprint_value(fingerprint))
+        if listing_id:
+            self._add_digest(_digest(f"i:{listing_id}"))
+
+    def add_listing(self, listing: Dict):
+        """Dodaje ogłoszenie (słownik z polami url / listing_id / card_fingerprint) do indeksu"""
+        self.add(listing.get("url"), listing.get("listing_id"), listing.get("card_fingerprint"))
+
+    def contains(self, url: Optional[str] = None, listing_id: Optional[str] = None) -> bool:
+        """Sprawdza czy ogłoszenie (po URL lub listing_id) jest już w bazie"""
+        known = bool(
+            (url and _digest("u:" + normalize_listing_url(url)) in self._keys)
+            or (listing_id and _digest(f"i:{listing_id}") in self._keys)
+        )
+        with self._lock:
+            self.stats["hits" if known else "misses"] += 1
+        return known
+
+    def is_known(self, listing: Dict) -> bool:
+        """Sprawdza czy ogłoszenie (słownik z polami url / listing_id) jest już w bazie"""
+        return self.contains(listing.get("url"), listing.get("listing_id"))
+
+    def card_status(self, listing: Dict) -> str:
+        """
+        Porównuje kartę z wyników ze stanem w bazie
+
+        Returns:
+            str: CARD_NEW, CARD_CHANGED lub CARD_UNCHANGED (ogłoszenia bez zapisanego
+                 odcisku liczą się jako niezmienione - odcisk dopisze touch w bazie)
+        """
+        if not self.is_known(listing):
+            return CARD_NEW
+        if self.use_bloom or not listing.get("url"):
+            return CARD_UNCHANGED
+        stored = self._keys.get(_digest("u:" + normalize_listing_url(listing["url"])), NO_FINGERPRINT)
+        current = _fingerprint_value(listing.get("card_fingerprint"))
+        if stored == NO_FINGERPRINT or current == NO_FINGERPRINT or stored == current:
+            return CARD_UNCHANGED
+        return CARD_CHANGED
+
+    def __len__(self) -> int:
+        return self.stats["keys"]
+
+    def load_from_database(self, table: str = "nieruchomosci") -> int:
+        """
+        Hurtowo wczytuje URL-e i ID ogłoszeń zapisanych w bazie
+
+        Returns:
+            int: Liczba kluczy w indeksie po wczytaniu
+        """
+        from mysql_utils import load_known_listing_keys
+
+        known_urls, known_ids = load_known_listing_keys(table)
+        for url, fingerprint in known_urls.items():
+            self.add(url=url, fingerprint=fingerprint)
+        for listing_id in known_ids:
+            self.add(listing_id=listing_id)
+        self.loaded = True
+        logger.info(f"🗂️ Indeks znanych ogłoszeń: {len(self)} kluczy ({'Bloom' if self.use_bloom else 'zbiór skrótów'})")
+        return len(self)
+
+    def save(self, path: Path = KNOWN_INDEX_PATH):
+        """Utrwala indeks na dysku (zapis atomowy)"""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(f".tmp{threading.get_ident()}")
+        with self._lock:
+            if self.use_bloom:
+                header = FILE_HEADER.pack(FILE_MAGIC, FILE_VERSION, KIND_BLOOM,
+                                     self.stats["keys"], self._keys.num_bits, self._keys.num_hashes)
+                payload = bytes(self._keys.bits)
+            else:
+                header = FILE_HEADER.pack(FILE_MAGIC, FILE_VERSION, KIND_HASHSET,
+                                     self.stats["keys"], 0, 0)
+                payload = array("Q", (value for pair in self._keys.items() for value in pair)).tobytes()
+        with open(tmp_path, "wb") as f:
+            f.write(header)
+            f.write(payload)
+        os.replace(tmp_path, path)
+        logger.info(f"💾 Zapisano indeks znanych ogłoszeń: {path} ({len(self)} kluczy)")
+
+    @classmethod
+    def load(cls, path: Path = KNOWN_INDEX_PATH) -> "KnownListingIndex":
+        """
+        Wczytuje indeks zapisany przez save()
+
+        Raises:
+            ValueError: Plik nie jest indeksem znanych ogłoszeń
+        """
+        with open(path, "rb") as f:
+            header = f.read(FILE_HEADER.size)
+            payload = f.read()
+        magic, version, kind, keys, num_bits, num_hashes = FILE_HEADER.unpack(header)
+        if magic != FILE_MAGIC or version != FILE_VERSION:
+            raise ValueError(f"Nieznany format indeksu: {path}")
+
+        index = cls(use_bloom=kind == KIND_BLOOM)
+        if kind == KIND_BLOOM:
+            index._keys = BloomFilter(num_bits=num_bits, num_hashes=num_hashes)
+            index._keys.bits[:] = payload
+        else:
+            pairs = array("Q")
+            pairs.frombytes(payload)
+            index._keys = dict(zip(pairs[::2], pairs[1::2]))
+        index.stats["keys"] = keys
+        index.loaded = True
+        return index
+
+
+# Globalny indeks współdzielony przez scraper i zapis do bazy
+_index: Optional[KnownListingIndex] = None
+_index_lock = threading.Lock()
+
+
+def get_known_index() -> KnownListingIndex:
+    """Zwraca globalny indeks znanych ogłoszeń (pusty, dopóki nie zostanie wczytany)"""
+    global _index
+    with _index_lock:
+        if _index is None:
+            _index = KnownListingIndex()
+        return _index
+
+
+def load_known_index(from_database: bool = True, use_bloom: bool = False,
+                     persist: Optional[bool] = None, path: Optional[Path] = None) -> KnownListingIndex:
+    """
+    Buduje globalny indeks: z pliku (jeśli utrwalony) i/lub hurtowo z bazy
+
+    Args:
+        from_database: Czy wczytać klucze z bazy MySQL
+        use_bloom: Czy użyć filtra Blooma zamiast dokładnego zbioru skrótów
+        persist: Czy czytać/zapisywać indeks na dysku (domyślnie KNOWN_INDEX_PERSIST)
+        path: Plik indeksu (domyślnie KNOWN_INDEX_PATH)
+
+    Returns:
+        KnownListingIndex: Globalny indeks
+    """
+    global _index
+    persist = KNOWN_INDEX_PERSIST if persist is None else persist
+    path = Path(path or KNOWN_INDEX_PATH)
+
+    index = None
+    if persist and path.exists():
+        try:
+            index = KnownListingIndex.load(path)
+            logger.info(f"🗂️ Wczytano indeks znanych ogłoszeń z {path}: {len(index)} kluczy")
+        except (OSError, ValueError, struct.error) as e:
+            logger.warning(f"⚠️ Nie udało się wczytać indeksu {path}: {e}")
+    if index is None or index.use_bloom != use_bloom:
+        index = KnownListingIndex(use_bloom=use_bloom)
+
+    if from_database:
+        index.load_from_database()
+
+    with _index_lock:
+        _index = index
+    return index
+
+
+def save_known_index(path: Optional[Path] = None):
+    """Utrwala globalny indeks na dysku (błędy zapisu nie przerywają scrapowania)"""
+    try:
+        get_known_index().save(Path(path or KNOWN_INDEX_PATH))
+    except Exception as e:
+        logger.warning(f"⚠️ Nie udało się zapisać indeksu znanych ogłoszeń: {e}")
+
+
+def remember_saved_listing(listing: Dict):
+    """Dopisuje zapisane ogłoszenie do globalnego indeksu"""
+    get_known_index().add_listing(listing)
@@ -0,0 +1,219 @@
+#!/usr/bin/env python3
+"""
+ASYNCHRONICZNY SILNIK POBIERANIA STRON (ASYNCIO + AIOHTTP)
+Utrzymuje setki równoległych żądań w locie w jednej pętli zdarzeń działającej
+w tle, pod globalnym limiterem tempa per host. Wyniki są zwracane strumieniowo
+w kolejności ukończenia, więc przepustowość ogranicza limit tempa, a nie liczba wątków.
+"""
+import asyncio
+import atexit
+import logging
+import threading
+import time
+from concurrent.futures import Future, as_completed
+from typing import Callable, Dict, Iterable, Iterator, NamedTuple, Optional
+
+try:
+    import aiohttp
+    AIOHTTP_AVAILABLE = True
+except ImportError:
+    aiohttp = None
+    AIOHTTP_AVAILABLE = False
+
+from src.fetching.rate_limiter import wait_for_slot_async, report_rate_limited, parse_retry_after
+from src.fetching.html_archive import archive_page, replay_page, is_replay_mode, ArchiveMissError
+
+logger = logging.getLogger(__name__)
+
+# Konfiguracja silnika
+MAX_IN_FLIGHT = 200              # Maksymalna liczba żądań w locie
+MAX_RETRIES = 2                  # Ponowienia dla błędów sieci / 429 / 5xx
+RETRY_STATUS_CODES = (429, 500, 502, 503, 504)
+CONNECTION_TIMEOUT = 10
+READ_TIMEOUT = 20
+
+
+class FetchResult(NamedTuple):
+    """Wynik pobrania pojedynczego URL"""
+    url: str
+    status: Optional[int]
+    text: Optional[str]
+    error: Optional[str]
+    elapsed: float                 # Czas sieci ostatniej próby (bez kolejki, limitera, backoffu i archiwum)
+    body: Optional[bytes] = None   # Surowe bajty odpowiedzi (np. dla puli procesów parsujących)
+
+    @property
+    def ok(self) -> bool:
+        return self.status == 200 and self.text is not None
+
+
+class AsyncFetcher:
+    """
+    Silnik pobierania stron oparty o asyncio
+
+    Pętla zdarzeń działa w osobnym wątku, więc z silnika można korzystać
+    ze zwykłego (synchronicznego) kodu scrapera przez submit() / fetch_many().
+    """
+
+    def __init__(self,
+                 max_in_flight: int = MAX_IN_FLIGHT,
+                 headers_factory: Optional[Callable[[], Dict[str, str]]] = None):
+        self.max_in_flight = max_in_flight
+        self.headers_factory = headers_factory
+
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._session = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._start_lock = threading.Lock()
+        self.stats = {"requests": 0, "errors": 0, "retries": 0}
+
+    def _ensure_started(self):
+        """Uruchamia pętlę zdarzeń i sesję aiohttp przy pierwszym użyciu"""
+        if self._loop is not None:
+            return
+        with self._start_lock:
+            if self._loop is not None:
+                return
+            if not AIOHTTP_AVAILABLE:
+                raise ImportError("aiohttp nie jest zainstalowany")
+
+            loop = asyncio.new_event_loop()
+            thread = threading.Thread(target=loop.run_forever, name="AsyncFetcher", daemon=True)
+            thread.start()
+            asyncio.run_coroutine_threadsafe(self._open_session(), loop).result()
+            self._thread = thread
+            self._loop = loop
+            logger.debug(f"⚡ Uruchomiono silnik asyncio ({self.max_in_flight} w locie)")
+
+    async def _open_session(self):
+        connector = aiohttp.TCPConnector(
+            limit=self.max_in_flight,
+            ttl_dns_cache=300,
+            use_dns_cache=True,
+        )
+        timeout = aiohttp.ClientTimeout(
+            total=CONNECTION_TIMEOUT + READ_TIMEOUT,
+            connect=CONNECTION_TIMEOUT,
+            sock_read=READ_TIMEOUT
+        )
+        self._session = aiohttp.ClientSession(connector=connector, timeout=timeout)
+        self._semaphore = asyncio.Semaphore(self.max_in_flight)
+
+    async def _fetch(self, url: str) -> FetchResult:
+        status = None
+        error = None
+        elapsed = 0.0
+
+        if is_replay_mode():
+            try:
+                return FetchResult(url, 200, replay_page(url), None, elapsed)
+            except ArchiveMissError as e:
+                return FetchResult(url, None, None, str(e), elapsed)
+
+        async with self._semaphore:
+            for attempt in range(MAX_RETRIES + 1):
+                await wait_for_slot_async(url)
+                headers = self.headers_factory() if self.headers_factory else None
+                # Pomiar od zdobycia slotu i tokenu - kontroler AIMD ocenia serwer, nie własne kolejki
+                start = time.monotonic()
+                try:
+                    self.stats["requests"] += 1
+                    async with self._session.get(url, headers=headers) as response:
+                        status = response.status
+                        if status == 200:
+                            body = await response.read()
+                            text = await response.text()
+                            elapsed = time.monotonic() - start
+                            # Zapis do archiwum poza pętlą zdarzeń (kompresja + dysk)
+                            await asyncio.get_running_loop().run_in_executor(None, archive_page, url, text)
+                            return FetchResult(url, status, text, None, elapsed, body)
+                        error = f"HTTP {status}"
+                        if status == 429:
+                            # Limiter wstrzyma cały host - kolejna próba poczeka na token
+                            report_rate_limited(url, parse_retry_after(response.headers.get("Retry-After")))
+                        elif status not in RETRY_STATUS_CODES:
+                            break
+                except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                    error = str(e) or e.__class__.__name__
+                elapsed = time.monotonic() - start
+
+                if attempt < MAX_RETRIES:
+                    self.stats["retries"] += 1
+                    if status != 429:
+                        await asyncio.sleep(2 ** attempt)
+
+        self.stats["errors"] += 1
+        logger.debug(f"⚠️ Nieudane pobranie {url}: {error}")
+        return FetchResult(url, status, None, error, elapsed)
+
+    def submit(self, url: str) -> Future:
+        """
+        Zleca pobranie URL
+
+        Returns:
+            concurrent.futures.Future: Future z FetchResult
+        """
+        self._ensure_started()
+        return asyncio.run_coroutine_threadsafe(self._fetch(url), self._loop)
+
+    def fetch_many(self, urls: Iterable[str]) -> Iterator[FetchResult]:
+        """
+        Pobiera wiele URL równolegle i zwraca wyniki w kolejności ukończenia
+
+        Args:
+            urls: Adresy do pobrania
+
+        Yields:
+            FetchResult: Wynik każdego pobrania, gdy tylko jest gotowy
+        """
+        futures = [self.submit(url) for url in urls]
+        for future in as_completed(futures):
+            yield future.result()
+
+    def close(self):
+        """Zamyka sesję aiohttp i zatrzymuje pętlę zdarzeń"""
+        with self._start_lock:
+            loop, self._loop = self._loop, None
+            thread, self._thread = self._thread, None
+        if loop is None:
+            return
+        try:
+            asyncio.run_coroutine_threadsafe(self._session.close(), loop).result(timeout=10)
+        except Exception as e:
+            logger.debug(f"⚠️ Błąd zamykania sesji aiohttp: {e}")
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join(timeout=10)
+        loop.close()
+        logger.debug(f"⚡ Statystyki silnika asyncio: {self.stats}")
+
+
+# Globalny silnik współdzielony przez cały proces
+_fetcher: Optional[AsyncFetcher] = None
+_fetcher_lock = threading.Lock()
+
+
+def get_async_fetcher(headers_factory: Optional[Callable[[], Dict[str, str]]] = None) -> AsyncFetcher:
+    """
+    Zwraca globalny silnik pobierania (tworzy go przy pierwszym użyciu)
+
+    Args:
+        headers_factory: Funkcja zwracająca nagłówki dla każdego żądania
+    """
+    global _fetcher
+    with _fetcher_lock:
+        if _fetcher is None:
+            _fetcher = AsyncFetcher(headers_factory=headers_factory)
+        return _fetcher
+
+
+def shutdown_async_fetcher():
+    """Zamyka globalny silnik pobierania"""
+    global _fetcher
+    with _fetcher_lock:
+        fetcher, _fetcher = _fetcher, None
+    if fetcher is not None:
+        fetcher.close()
+
+
+atexit.register(shutdown_async_fetcher)
@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""
+ADAPTACYJNA WSPÓŁBIEŻNOŚĆ (AIMD) DLA SCRAPOWANIA SZCZEGÓŁÓW
+Kontroler obserwuje czas odpowiedzi, kody HTTP i sygnały anti-bot, po czym
+zwiększa liczbę równoległych pobrań addytywnie, gdy wszystko działa, oraz
+zmniejsza ją multiplikatywnie przy kłopotach - tak jak kontrola przeciążenia TCP.
+"""
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+# Konfiguracja kontrolera
+MIN_CONCURRENCY = 1
+MAX_CONCURRENCY = 16
+INCREASE_STEP = 1                 # Wzrost limitu po każdej "rundzie" udanych pobrań
+DECREASE_FACTOR = 0.5             # Mnożnik limitu po sygnale kłopotów
+LATENCY_THRESHOLD_SECONDS = 15.0  # Średni czas pobrania uznawany za przeciążenie
+LATENCY_EWMA_ALPHA = 0.2
+DECREASE_COOLDOWN_SECONDS = 10.0  # Jedna redukcja na okno - seria błędów to jeden sygnał
+
+# Kody HTTP i fragmenty komunikatów oznaczające przeciążenie lub blokadę
+TROUBLE_STATUS_CODES = (403, 429, 500, 502, 503, 504)
+BLOCKING_SIGNALS = ("403", "forbidden", "blocked", "robot", "captcha")
+
+
+def is_blocking_signal(message: Optional[str]) -> bool:
+    """Sprawdza czy komunikat błędu wygląda na blokadę anti-bot"""
+    if not message:
+        return False
+    message = message.lower()
+    return any(signal in message for signal in BLOCKING_SIGNALS)
+
+
+class AdaptiveConcurrencyController:
+    """
+    Thread-safe kontroler AIMD ograniczający liczbę pobrań w locie
+
+    Wątki zajmują slot przez slot(); kod bez wątków (np. okno silnika asyncio)
+    odczytuje bieżący `limit` i raportuje wyniki przez record().
+    """
+
+    def __init__(self,
+                 initial: int = 4,
+                 min_limit: int = MIN_CONCURRENCY,
+                 max_limit: int = MAX_CONCURRENCY,
+                 on_change: Optional[Callable[[int], None]] = None):
+        self.min_limit = max(1, min_limit)
+        self.max_limit = max(self.min_limit, max_limit)
+        self._limit = min(max(initial, self.min_limit), self.max_limit)
+        self._on_change = on_change
+
+        self._in_flight = 0
+        self._successes = 0
+        self._latency_ewma: Optional[float] = None
+        self._last_decrease = 0.0
+        self._condition = threading.Condition()
+        self.stats = {"increases": 0, "decreases": 0, "successes": 0, "failures": 0, "peak": self._limit}
+
+    @property
+    def limit(self) -> int:
+        return self._limit
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    @contextmanager
+    def slot(self):
+        """
+        Zajmuje slot współbieżności (czeka, gdy w locie jest już `limit` pobrań)
+
+        Przykład:
+            with controller.slot():
+                result = fetch(url)
+        """
+        with self._condition:
+            while self._in_flight >= self._limit:
+                self._condition.wait()
+            self._in_flight += 1
+        try:
+            yield
+        finally:
+            with self._condition:
+                self._in_flight -= 1
+                self._condition.notify()
+
+    def record(self, latency: Optional[float] = None, status: Optional[int] = None,
+               error: Optional[str] = None):
+        """
+        Raportuje wynik pojedynczego pobrania
+
+        Args:
+            latency: Czas pobrania w sekundach
+            status: Kod HTTP (jeśli znany)
+            error: Komunikat błędu (sprawdzany pod kątem sygnałów anti-bot)
+        """
+        if latency is not None:
+            with self._condition:
+                if self._latency_ewma is None:
+                    self._latency_ewma = latency
+                else:
+                    self._latency_ewma += LATENCY_EWMA_ALPHA * (latency - self._latency_ewma)
+                slow = self._latency_ewma > LATENCY_THRESHOLD_SECONDS
+
+        if status in TROUBLE_STATUS_CODES:
+            self.decrease(f"HTTP {status}")
+        elif is_blocking_signal(error):
+            self.decrease(f"sygnał blokady: {error[:60]}")
+        elif error:
+            with self._condition:
+                self.stats["failures"] += 1
+        elif latency is not None and slow:
+            self.decrease(f"średni czas {self._latency_ewma:.1f}s")
+        else:
+            self._increase()
+
+    def _increase(self):
+        """Addytywny wzrost: +INCREASE_STEP po `limit` kolejnych sukcesach"""
+        new_limit = None
+        with self._condition:
+            self.stats["successes"] += 1
+            self._successes += 1
+            if self._successes >= self._limit and self._limit < self.max_limit:
+                self._successes = 0
+                self._limit = min(self.max_limit, self._limit + INCREASE_STEP)
+                self.stats["increases"] += 1
+                self.stats["peak"] = max(self.stats["peak"], self._limit)
+                new_limit = self._limit
+                self._condition.notify_all()
+        if new_limit is not None:
+            logger.debug(f"📈 Współbieżność szczegółów: {new_limit}")
+            self._notify(new_limit)
+
+    def decrease(self, reason: str):
+        """Multiplikatywny spadek limitu (najwyżej raz na DECREASE_COOLDOWN_SECONDS)"""
+        new_limit = None
+        with self._condition:
+            self.stats["failures"] += 1
+            self._successes = 0
+            now = time.monotonic()
+            if now - self._last_decrease >= DECREASE_COOLDOWN_SECONDS:
+                self._last_decrease = now
+                reduced = max(self.min_limit, int(self._limit * DECREASE_FACTOR))
+                if reduced != self._limit:
+                    self._limit = reduced
+                    self.stats["decreases"] += 1
+                    new_limit = reduced
+                # Po redukcji mierzymy czas odpowiedzi od nowa
+                self._latency_ewma = None
+        if new_limit is not None:
+            logger.warning(f"📉 Współbieżność szczegółów: {new_limit} ({reason})")
+            self._notify(new_limit)
+
+    def _notify(self, new_limit: int):
+        if self._on_change:
+            try:
+                self._on_change(new_limit)
+            except Exception as e:
+                logger.debug(f"⚠️ Błąd callbacku zmiany współbieżności: {e}")
@@ -0,0 +1,286 @@
+#!/usr/bin/env python3
+"""
+PULA WEBDRIVERÓW - WIELOKROTNE UŻYCIE PRZEGLĄDAREK CHROME
+Utrzymuje pulę uruchomionych przeglądarek współdzieloną przez wątki scrapera,
+zamiast startować nowy Chrome dla każdego pobieranego URL
+"""
+import atexit
+import logging
+import queue
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Optional
+
+# psutil jest opcjonalny - bez niego recykling po pamięci jest wyłączony
+try:
+    import psutil
+    PSUTIL_AVAILABLE = True
+except ImportError:
+    psutil = None
+    PSUTIL_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+# Konfiguracja puli
+DRIVER_POOL_SIZE = 4              # Maksymalna liczba równocześnie uruchomionych przeglądarek
+MAX_PAGES_PER_DRIVER = 50         # Recykling przeglądarki po N załadowanych stronach
+MAX_DRIVER_MEMORY_MB = 1024       # Recykling po przekroczeniu pamięci (Chrome + procesy potomne)
+DRIVER_CHECKOUT_TIMEOUT = 180     # Maksymalny czas oczekiwania na wolną przeglądarkę (s)
+
+
+class PooledDriver:
+    """WebDriver wraz z metadanymi potrzebnymi do recyklingu"""
+
+    def __init__(self, driver):
+        self.driver = driver
+        self.pages_loaded = 0
+        self.created_at = time.time()
+        self.broken = False
+
+
+class WebDriverPool:
+    """
+    Thread-safe pula przeglądarek Selenium
+
+    Przeglądarki są tworzone leniwie (do `size` sztuk), sprawdzane przed
+    każdym wypożyczeniem i wymieniane po `max_pages_per_driver` stronach,
+    po przekroczeniu limitu pamięci lub po błędzie w trakcie użycia.
+    """
+
+    def __init__(self,
+                 driver_factory: Callable,
+                 size: int = DRIVER_POOL_SIZE,
+                 max_pages_per_driver: int = MAX_PAGES_PER_DRIVER,
+                 max_memory_mb: Optional[float] = MAX_DRIVER_MEMORY_MB):
+        self._driver_factory = driver_factory
+        self.size = max(1, size)
+        self.max_pages_per_driver = max_pages_per_driver
+        self.max_memory_mb = max_memory_mb
+
+        # LIFO - wypożyczamy ostatnio używaną ("najcieplejszą") przeglądarkę
+        self._idle = queue.LifoQueue()
+        self._lock = threading.Lock()
+        self._alive = 0
+        self._closed = False
+        self.stats = {"created": 0, "recycled": 0, "health_failures": 0, "checkouts": 0}
+
+    def _spawn(self) -> PooledDriver:
+        """Uruchamia nową przeglądarkę (slot w `_alive` musi być już zarezerwowany)"""
+        try:
+            driver = self._driver_factory()
+        except BaseException:
+            with self._lock:
+                self._alive -= 1
+            raise
+
+        with self._lock:
+            self.stats["created"] += 1
+        logger.debug(f"🌐 Uruchomiono nową przeglądarkę w puli ({self._alive}/{self.size})")
+        return PooledDriver(driver)
+
+    def _discard(self, pooled: PooledDriver, reason: str):
+        """Zamyka przeglądarkę i zwalnia jej slot w puli"""
+        logger.debug(f"♻️ Zamykam przeglądarkę z puli ({reason}, stron: {pooled.pages_loaded})")
+        try:
+            pooled.driver.quit()
+        except Exception as e:
+            logger.debug(f"⚠️ Błąd zamykania przeglądarki: {e}")
+        with self._lock:
+            self._alive -= 1
+            self.stats["recycled"] += 1
+
+    def _is_healthy(self, pooled: PooledDriver) -> bool:
+        """Sprawdza czy przeglądarka odpowiada"""
+        try:
+            return pooled.driver.execute_script("return 1") == 1
+        except Exception:
+            return False
+
+    def _memory_mb(self, pooled: PooledDriver) -> Optional[float]:
+        """Zużycie pamięci chromedrivera i wszystkich procesów Chrome (MB)"""
+        if not PSUTIL_AVAILABLE:
+            return None
+        try:
+            process = psutil.Process(pooled.driver.service.process.pid)
+            processes = [process] + process.children(recursive=True)
+            return sum(p.memory_info().rss for p in processes) / (1024 * 1024)
+        except Exception:
+            return None
+
+    def _recycle_reason(self, pooled: PooledDriver) -> Optional[str]:
+        """Zwraca powód recyklingu lub None jeśli przeglądarka może wrócić do puli"""
+        if self._closed:
+            return "pula zamknięta"
+        if pooled.broken:
+            return "błąd podczas użycia"
+        if self._alive > self.size:
+            return "zmniejszono pulę"
+        if self.max_pages_per_driver and pooled.pages_loaded >= self.max_pages_per_driver:
+            return f"limit {self.max_pages_per_driver} stron"
+        if self.max_memory_mb:
+            memory = self._memory_mb(pooled)
+            if memory is not None and memory > self.max_memory_mb:
+                return f"pamięć {memory:.0f} MB > {self.max_memory_mb} MB"
+        return None
+
+    def acquire(self, timeout: float = DRIVER_CHECKOUT_TIMEOUT) -> PooledDriver:
+        """
+        Wypożycza przeglądarkę z puli
+
+        Args:
+            timeout: Maksymalny czas oczekiwania na wolną przeglądarkę
+
+        Returns:
+            PooledDriver: Sprawna przeglądarka (należy oddać przez release())
+        """
+        if self._closed:
+            raise RuntimeError("Pula przeglądarek jest zamknięta")
+
+        deadline = time.monotonic() + timeout
+        while True:
+            try:
+                pooled = self._idle.get_nowait()
+            except queue.Empty:
+                with self._lock:
+                    can_spawn = self._alive < self.size
+                    if can_spawn:
+                        self._alive += 1
+                if can_spawn:
+                    pooled = self._spawn()
+                    with self._lock:
+                        self.stats["checkouts"] += 1
+                    return pooled
+
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise TimeoutError(f"Brak wolnej przeglądarki w puli po {timeout}s")
+                try:
+                    pooled = self._idle.get(timeout=remaining)
+                except queue.Empty:
+                    raise TimeoutError(f"Brak wolnej przeglądarki w puli po {timeout}s")
+
+            if self._is_healthy(pooled):
+                with self._lock:
+                    self.stats["checkouts"] += 1
+                return pooled
+
+            with self._lock:
+                self.stats["health_failures"] += 1
+            self._discard(pooled, "nieudany health check")
+
+    def release(self, pooled: PooledDriver):
+        """Oddaje przeglądarkę do puli lub zamyka ją jeśli wymaga recyklingu"""
+        reason = self._recycle_reason(pooled)
+        if reason:
+            self._discard(pooled, reason)
+        else:
+            self._idle.put(pooled)
+
+    @contextmanager
+    def driver(self, timeout: float = DRIVER_CHECKOUT_TIMEOUT):
+        """
+        Context manager wypożyczający przeglądarkę
+
+        Przykład:
+            with pool.driver() as driver:
+                driver.get(url)
+        """
+        pooled = self.acquire(timeout)
+        try:
+            yield pooled.driver
+        except BaseException:
+            # Stan przeglądarki po błędzie jest nieznany - nie oddajemy jej do puli
+            pooled.broken = True
+            raise
+        finally:
+            pooled.pages_loaded += 1
+            self.release(pooled)
+
+    def resize(self, size: int):
+        """Zmienia rozmiar puli (nadmiarowe przeglądarki są zamykane przy zwrocie)"""
+        size = max(1, size)
+        if size != self.size:
+            logger.info(f"🌐 Rozmiar puli przeglądarek: {self.size} → {size}")
+            self.size = size
+        while self._alive > self.size:
+            try:
+                pooled = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            self._discard(pooled, "zmniejszono pulę")
+
+    def close(self):
+        """Zamyka wszystkie bezczynne przeglądarki; wypożyczone zostaną zamknięte przy zwrocie"""
+        self._closed = True
+        while True:
+            try:
+                pooled = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            self._discard(pooled, "zamknięcie puli")
+        logger.debug(f"🌐 Statystyki puli przeglądarek: {self.stats}")
+
+
+# Globalna pula współdzielona przez cały proces
+_pool: Optional[WebDriverPool] = None
+_pool_lock = threading.Lock()
+
+
+def get_driver_pool(driver_factory: Callable) -> WebDriverPool:
+    """
+    Zwraca globalną pulę przeglądarek (tworzy ją przy pierwszym użyciu)
+
+    Args:
+        driver_factory: Funkcja tworząca nowy WebDriver
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is None or _pool._closed:
+            _pool = WebDriverPool(driver_factory,
+                                  size=DRIVER_POOL_SIZE,
+                                  max_pages_per_driver=MAX_PAGES_PER_DRIVER,
+                                  max_memory_mb=MAX_DRIVER_MEMORY_MB)
+        return _pool
+
+
+def configure_driver_pool(size: Optional[int] = None,
+                          max_pages_per_driver: Optional[int] = None,
+                          max_memory_mb: Optional[float] = None):
+    """
+    Ustawia parametry globalnej puli (przed lub w trakcie jej użycia)
+
+    Args:
+        size: Liczba przeglądarek (zwykle = liczba wątków scrapera)
+        max_pages_per_driver: Recykling po N stronach
+        max_memory_mb: Recykling po przekroczeniu pamięci
+    """
+    global DRIVER_POOL_SIZE, MAX_PAGES_PER_DRIVER, MAX_DRIVER_MEMORY_MB
+    with _pool_lock:
+        if size is not None:
+            DRIVER_POOL_SIZE = size
+        if max_pages_per_driver is not None:
+            MAX_PAGES_PER_DRIVER = max_pages_per_driver
+        if max_memory_mb is not None:
+            MAX_DRIVER_MEMORY_MB = max_memory_mb
+        pool = _pool
+
+    if pool is not None and not pool._closed:
+        if max_pages_per_driver is not None:
+            pool.max_pages_per_driver = max_pages_per_driver
+        if max_memory_mb is not None:
+            pool.max_memory_mb = max_memory_mb
+        if size is not None:
+            pool.resize(size)
+
+
+def shutdown_driver_pool():
+    """Zamyka globalną pulę przeglądarek"""
+    global _pool
+    with _pool_lock:
+        pool, _pool = _pool, None
+    if pool is not None:
+        pool.close()
+
+
+atexit.register(shutdown_driver_pool)
@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+"""
+ARCHIWUM SUROWEGO HTML - CONTENT-ADDRESSED, SKOMPRESOWANE
+Każda pobrana strona (wyniki i ogłoszenia) trafia do archiwum na dysku:
+treść jest zapisywana raz pod swoim skrótem SHA-256 (gzip), a indeks
+dopisuje (URL, czas pobrania, skrót). W trybie replay wszystkie ścieżki
+pobierania czytają strony z archiwum - bez żadnego ruchu sieciowego.
+"""
+import gzip
+import hashlib
+import json
+import logging
+import os
+import threading
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Konfiguracja archiwum
+ARCHIVE_ENABLED = os.getenv("HTML_ARCHIVE_ENABLED", "1") != "0"
+ARCHIVE_DIR = Path(os.getenv("HTML_ARCHIVE_DIR", str(Path.home() / ".otodom_archive")))
+COMPRESSION_LEVEL = 6
+
+
+class ArchiveMissError(LookupError):
+    """Strony nie ma w archiwum (tryb replay nie sięga do sieci)"""
+
+
+class HtmlArchive:
+    """
+    Archiwum stron HTML
+
+    Układ katalogu:
+        objects/ab/abcdef....html.gz   - treść strony (nazwa = SHA-256 treści)
+        index.jsonl                    - {"url", "fetched_at", "sha256", "size"} na linię
+    """
+
+    def __init__(self, root: Path = ARCHIVE_DIR):
+        self.root = Path(root)
+        self.objects_dir = self.root / "objects"
+        self.index_path = self.root / "index.jsonl"
+        self._lock = threading.Lock()
+        self._url_index: Optional[Dict[str, List[Tuple[str, str]]]] = None
+        self.stats = {"stored": 0, "deduplicated": 0, "replayed": 0, "missed": 0}
+
+    def _object_path(self, digest: str) -> Path:
+        return self.objects_dir / digest[:2] / f"{digest}.html.gz"
+
+    def store(self, url: str, html: str, fetched_at: Optional[str] = None) -> str:
+        """
+        Zapisuje pobraną stronę
+
+        Args:
+            url: Adres strony
+            html: Treść strony
+            fetched_at: Czas pobrania (ISO 8601, domyślnie teraz, UTC)
+
+        Returns:
+            str: Skrót SHA-256 treści
+        """
+        data = html.encode("utf-8")
+        digest = hashlib.sha256(data).hexdigest()
+        fetched_at = fetched_at or datetime.now(timezone.utc).isoformat(timespec="seconds")
+
+        path = self._object_path(digest)
+        if path.exists():
+            self.stats["deduplicated"] += 1
+        else:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = path.with_suffix(f".tmp{threading.get_ident()}")
+            with open(tmp_path, "wb") as f:
+                f.write(gzip.compress(data, COMPRESSION_LEVEL))
+            os.replace(tmp_path, path)
+            self.stats["stored"] += 1
+
+        entry = {"url": url, "fetched_at": fetched_at, "sha256": digest, "size": len(data)}
+        with self._lock:
+            with open(self.index_path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+            if self._url_index is not None:
+                self._url_index.setdefault(url, []).append((fetched_at, digest))
+        return digest
+
+    def load(self, digest: str) -> str:
+        """Czyta treść strony po skrócie"""
+        with open(self._object_path(digest), "rb") as f:
+            return gzip.decompress(f.read()).decode("utf-8")
+
+    def iter_entries(self) -> Iterator[Dict]:
+        """Iteruje po wpisach indeksu (w kolejności zapisu)"""
+        if not self.index_path.exists():
+            return
+        with open(self.index_path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    yield json.loads(line)
+                except ValueError:
+                    continue  # Urwana ostatnia linia po przerwaniu procesu
+
+    def _load_url_index(self) -> Dict[str, List[Tuple[str, str]]]:
+        with self._lock:
+            if self._url_index is None:
+                url_index: Dict[str, List[Tuple[str, str]]] = {}
+                for entry in self.iter_entries():
+                    url_index.setdefault(entry["url"], []).append((entry["fetched_at"], entry["sha256"]))
+                self._url_index = url_index
+                logger.info(f"🗄️ Wczytano indeks archiwum HTML: {len(url_index)} adresów")
+            return self._url_index
+
+    def latest(self, url: str, before: Optional[str] = None) -> Optional[str]:
+        """
+        Zwraca najnowszą zarchiwizowaną wersję strony
+
+        Args:
+            url: Adres strony
+            before: Tylko wersje pobrane przed tym czasem (ISO 8601)
+
+        Returns:
+            Optional[str]: Treść strony lub None jeśli jej nie ma w archiwum
+        """
+        versions = self._load_url_index().get(url, [])
+        if before:
+            versions = [v for v in versions if v[0] < before]
+        if not versions:
+            return None
+        # Przy równym czasie pobrania wygrywa wpis dopisany później
+        _, digest = max(reversed(versions), key=lambda version: version[0])
+        return self.load(digest)
+
+
+# Globalne archiwum i tryb replay
+_archive: Optional[HtmlArchive] = None
+_archive_lock = threading.Lock()
+_replay_mode = False
+_replay_before: Optional[str] = None
+
+
+def get_html_archive() -> HtmlArchive:
+    """Zwraca globalne archiwum (tworzy je przy pierwszym użyciu)"""
+    global _archive
+    with _archive_lock:
+        if _archive is None:
+            _archive = HtmlArchive(ARCHIVE_DIR)
+        return _archive
+
+
+def configure_html_archive(root: Optional[str] = None, enabled: Optional[bool] = None):
+    """
+    Ustawia katalog archiwum i/lub włącza/wyłącza archiwizację
+
+    Args:
+        root: Katalog archiwum
+        enabled: Czy zapisywać pobierane strony
+    """
+    global _archive, ARCHIVE_DIR, ARCHIVE_ENABLED
+    with _archive_lock:
+        if root is not None:
+            ARCHIVE_DIR = Path(root)
+            _archive = None
+        if enabled is not None:
+            ARCHIVE_ENABLED = enabled
+
+
+def enable_replay_mode(before: Optional[str] = None):
+    """
+    Włącza tryb replay: strony są czytane wyłącznie z archiwum
+
+    Args:
+        before: Odtwarzaj stan sprzed tego czasu (ISO 8601), domyślnie najnowszy
+    """
+    global _replay_mode, _replay_before
+    _replay_mode = True
+    _replay_before = before
+    logger.info(f"🗄️ Tryb replay - strony z archiwum {ARCHIVE_DIR} (bez sieci)")
+
+
+def is_replay_mode() -> bool:
+    return _replay_mode
+
+
+def archive_page(url: str, html: Optional[str]):
+    """Zapisuje pobraną stronę do archiwum (błędy zapisu nie przerywają scrapowania)"""
+    if not ARCHIVE_ENABLED or _replay_mode or not html:
+        return
+    try:
+        get_html_archive().store(url, html)
+    except Exception as e:
+        logger.debug(f"⚠️ Nie udało się zarchiwizować {url}: {e}")
+
+
+def replay_page(url: str) -> str:
+    """
+    Zwraca stronę z archiwum (tryb replay)
+
+    Raises:
+        ArchiveMissError: Strony nie ma w archiwum
+    """
+    archive = get_html_archive()
+    html = archive.latest(url, before=_replay_before)
+    if html is None:
+        archive.stats["missed"] += 1
+        raise ArchiveMissError(f"Brak strony w archiwum: {url}")
+    archive.stats["replayed"] += 1
+    return html
@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""
+WSPÓLNA SESJA HTTP - POOLING POŁĄCZEŃ I KEEP-ALIVE
+Jedna sesja requests na cały proces: połączenia TCP+TLS do tego samego hosta
+są utrzymywane i wielokrotnie używane zamiast otwierania nowych przy każdym
+requests.get(). Zawiera adaptery z retry oraz obsługę kompresji gzip/brotli.
+"""
+import logging
+import threading
+import time
+from typing import Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from src.fetching.rate_limiter import wait_for_slot, report_rate_limited, parse_retry_after
+
+# Brotli jest opcjonalne - urllib3 dekoduje "br" automatycznie, jeśli biblioteka jest dostępna
+try:
+    import brotli  # noqa: F401
+    BROTLI_AVAILABLE = True
+except ImportError:
+    try:
+        import brotlicffi  # noqa: F401
+        BROTLI_AVAILABLE = True
+    except ImportError:
+        BROTLI_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+# Rozmiary puli połączeń per host (pool_maxsize = max równoczesnych połączeń do hosta)
+HOST_POOL_SIZES = {
+    "https://www.otodom.pl/": 32,
+    "https://nominatim.openstreetmap.org/": 4,
+}
+DEFAULT_POOL_CONNECTIONS = 10
+DEFAULT_POOL_MAXSIZE = 10
+
+# Retry na poziomie adaptera (błędy połączenia i odpowiedzi 5xx).
+# 429 obsługuje globalny limiter - wstrzymuje cały host, a nie tylko jeden wątek
+RETRY_TOTAL = 3
+RETRY_BACKOFF_FACTOR = 0.5
+RETRY_STATUS_CODES = (500, 502, 503, 504)
+
+DEFAULT_TIMEOUT = 10
+
+ACCEPT_ENCODING = "gzip, deflate, br" if BROTLI_AVAILABLE else "gzip, deflate"
+
+_session: Optional[requests.Session] = None
+_session_lock = threading.Lock()
+
+# Czas sieci ostatniego żądania w bieżącym wątku (dla kontrolera AIMD)
+_network_time = threading.local()
+
+
+def record_network_time(seconds: float):
+    """Zapamiętuje czas samego żądania sieciowego (bez czekania na token i backoffu)"""
+    _network_time.seconds = seconds
+
+
+def reset_network_time():
+    """Czyści pomiar bieżącego wątku przed serią pobrań"""
+    _network_time.seconds = None
+
+
+def last_network_time() -> Optional[float]:
+    """Czas sieci ostatniego żądania w bieżącym wątku (None, gdy nie było żądania)"""
+    return getattr(_network_time, "seconds", None)
+
+
+def _build_retry() -> Retry:
+    """Polityka ponowień dla adapterów HTTP"""
+    return Retry(
+        total=RETRY_TOTAL,
+        connect=RETRY_TOTAL,
+        read=RETRY_TOTAL,
+        status=RETRY_TOTAL,
+        backoff_factor=RETRY_BACKOFF_FACTOR,
+        status_forcelist=RETRY_STATUS_CODES,
+        allowed_methods=frozenset({"GET", "HEAD"}),
+        respect_retry_after_header=True,
+        raise_on_status=False,
+    )
+
+
+def create_http_session() -> requests.Session:
+    """
+    Tworzy sesję z adapterami dopasowanymi do hostów, z których korzysta scraper
+
+    Returns:
+        requests.Session: Skonfigurowana sesja
+    """
+    session = requests.Session()
+    session.headers.update({
+        "Accept-Encoding": ACCEPT_ENCODING,
+        "Connection": "keep-alive",
+    })
+
+    default_adapter = HTTPAdapter(
+        pool_connections=DEFAULT_POOL_CONNECTIONS,
+        pool_maxsize=DEFAULT_POOL_MAXSIZE,
+        max_retries=_build_retry(),
+    )
+    session.mount("https://", default_adapter)
+    session.mount("http://", default_adapter)
+
+    # Dłuższy prefiks ma pierwszeństwo - hosty scrapera dostają własne pule
+    for prefix, pool_size in HOST_POOL_SIZES.items():
+        session.mount(prefix, HTTPAdapter(
+            pool_connections=1,
+            pool_maxsize=pool_size,
+            pool_block=True,
+            max_retries=_build_retry(),
+        ))
+
+    logger.debug(f"🔌 Utworzono wspólną sesję HTTP (kompresja: {ACCEPT_ENCODING})")
+    return session
+
+
+def get_http_session() -> requests.Session:
+    """Zwraca wspólną dla procesu sesję HTTP (tworzy ją przy pierwszym użyciu)"""
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                _session = create_http_session()
+    return _session
+
+
+def http_get(url: str, timeout: float = DEFAULT_TIMEOUT, **kwargs) -> requests.Response:
+    """
+    GET przez wspólną sesję (odpowiednik requests.get z reużyciem połączeń)
+    
+    Przed wysłaniem czeka na token z globalnego limitera hosta; odpowiedź 429
+    wstrzymuje cały host na czas z nagłówka Retry-After.
+
+    Args:
+        url: Adres URL
+        timeout: Timeout w sekundach
+        **kwargs: Pozostałe argumenty requests (headers, params, ...)
+
+    Returns:
+        requests.Response: Odpowiedź serwera
+    """
+    wait_for_slot(url)
+    start = time.monotonic()
+    try:
+        response = get_http_session().get(url, timeout=timeout, **kwargs)
+    finally:
+        record_network_time(time.monotonic() - start)
+    if response.status_code == 429:
+        report_rate_limited(url, parse_retry_after(response.headers.get("Retry-After")))
+    return response
+
+
+def close_http_session():
+    """Zamyka wspólną sesję i wszystkie utrzymywane połączenia"""
+    global _session
+    with _session_lock:
+        session, _session = _session, None
+    if session is not None:
+        session.close()
@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+"""
+GLOBALNY LIMITER TEMPA ŻĄDAŃ - TOKEN BUCKET PER HOST
+Jeden limiter na proces, z którym konsultuje się każda ścieżka pobierania
+(requests, Selenium, silnik asyncio, geocodery). Zamiast niezależnych
+losowych sleepów w każdym wątku żądania startują dokładnie w dozwolonym
+tempie, z jitterem i z respektowaniem 429 / Retry-After.
+"""
+import asyncio
+import logging
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from typing import Dict, Optional, Tuple
+from urllib.parse import urlsplit
+
+logger = logging.getLogger(__name__)
+
+# Limity per host: (żądań na sekundę, burst)
+HOST_LIMITS: Dict[str, Tuple[float, int]] = {
+    "www.otodom.pl": (2.0, 4),
+    "nominatim.openstreetmap.org": (1.0, 1),   # Polityka Nominatim: max 1 req/s
+}
+DEFAULT_REQUESTS_PER_SECOND = 2.0
+DEFAULT_BURST = 2
+JITTER = 0.2                    # Rozrzut odstępów ±20% (średnie tempo bez zmian)
+DEFAULT_RETRY_AFTER = 30.0      # Wstrzymanie po 429 bez nagłówka Retry-After (s)
+MAX_RETRY_AFTER = 600.0         # Górny limit wstrzymania hosta (s)
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket dla jednego hosta
+
+    Zaimplementowany jako GCRA (teoretyczny czas następnego tokenu), więc
+    rezerwacja slotu jest O(1), a czekanie odbywa się poza blokadą - zarówno
+    w wątkach (acquire), jak i w pętli asyncio (acquire_async).
+    """
+
+    def __init__(self, rate: float, burst: int = 1, jitter: float = JITTER):
+        self.rate = rate
+        self.burst = max(1, burst)
+        self.jitter = jitter
+        self._next_slot = 0.0          # Teoretyczny czas wydania kolejnego tokenu
+        self._blocked_until = 0.0      # Wstrzymanie po 429 / Retry-After
+        self._lock = threading.Lock()
+        self.stats = {"acquired": 0, "waited_seconds": 0.0, "penalties": 0}
+
+    def _reserve(self) -> float:
+        """Rezerwuje token i zwraca czas oczekiwania na niego (s)"""
+        with self._lock:
+            now = time.monotonic()
+            if not self.rate:
+                wait = max(0.0, self._blocked_until - now)
+            else:
+                interval = 1.0 / self.rate
+                if self.jitter:
+                    interval *= random.uniform(1.0 - self.jitter, 1.0 + self.jitter)
+
+                # Pełny bucket pozwala wystartować `burst` żądaniom od razu
+                slot = max(self._next_slot, now, self._blocked_until)
+                tolerance = (self.burst - 1) / self.rate
+                start_at = max(now, slot - tolerance, self._blocked_until)
+                self._next_slot = slot + interval
+                wait = start_at - now
+
+            self.stats["acquired"] += 1
+            self.stats["waited_seconds"] += wait
+            return wait
+
+    def acquire(self):
+        """Blokuje wątek do momentu uzyskania tokenu"""
+        wait = self._reserve()
+        if wait > 0:
+            time.sleep(wait)
+
+    async def acquire_async(self):
+        """Odpowiednik acquire() dla kodu asyncio"""
+        wait = self._reserve()
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+    def penalize(self, retry_after: Optional[float] = None):
+        """
+        Wstrzymuje host po odpowiedzi 429/503
+
+        Args:
+            retry_after: Czas wstrzymania z nagłówka Retry-After (s)
+        """
+        delay = min(retry_after if retry_after is not None else DEFAULT_RETRY_AFTER, MAX_RETRY_AFTER)
+        with self._lock:
+            self._blocked_until = max(self._blocked_until, time.monotonic() + delay)
+            self.stats["penalties"] += 1
+        return delay
+
+
+class RateLimiter:
+    """Rejestr token bucketów - osobny bucket dla każdego hosta"""
+
+    def __init__(self):
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._lock = threading.Lock()
+
+    def bucket(self, url_or_host: str) -> TokenBucket:
+        """Zwraca bucket hosta (tworzy go przy pierwszym użyciu)"""
+        host = _host_of(url_or_host)
+        bucket = self._buckets.get(host)
+        if bucket is None:
+            with self._lock:
+                bucket = self._buckets.get(host)
+                if bucket is None:
+                    rate, burst = HOST_LIMITS.get(host, (DEFAULT_REQUESTS_PER_SECOND, DEFAULT_BURST))
+                    bucket = TokenBucket(rate, burst)
+                    self._buckets[host] = bucket
+        return bucket
+
+    def configure(self, host: str, requests_per_second: Optional[float] = None,
+                  burst: Optional[int] = None):
+        """Zmienia limit hosta (również dla już utworzonego bucketu)"""
+        host = _host_of(host)
+        rate, current_burst = HOST_LIMITS.get(host, (DEFAULT_REQUESTS_PER_SECOND, DEFAULT_BURST))
+        HOST_LIMITS[host] = (
+            requests_per_second if requests_per_second is not None else rate,
+            burst if burst is not None else current_burst,
+        )
+        with self._lock:
+            bucket = self._buckets.get(host)
+        if bucket is not None:
+            bucket.rate, bucket.burst = HOST_LIMITS[host][0], max(1, HOST_LIMITS[host][1])
+        logger.info(f"🚦 Limit dla {host}: {HOST_LIMITS[host][0]} req/s (burst {HOST_LIMITS[host][1]})")
+
+
+def _host_of(url_or_host: str) -> str:
+    """Wyciąga nazwę hosta z URL (lub zwraca podany host)"""
+    if "://" in url_or_host:
+        return (urlsplit(url_or_host).hostname or "").lower()
+    return url_or_host.lower()
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """
+    Parsuje nagłówek Retry-After (liczba sekund lub data HTTP)
+
+    Returns:
+        Optional[float]: Liczba sekund lub None gdy nagłówek jest pusty/niepoprawny
+    """
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+# Globalny limiter współdzielony przez cały proces
+_limiter = RateLimiter()
+
+
+def get_rate_limiter() -> RateLimiter:
+    """Zwraca globalny limiter tempa"""
+    return _limiter
+
+
+def wait_for_slot(url: str):
+    """Czeka na token dla hosta podanego URL (kod wątkowy)"""
+    _limiter.bucket(url).acquire()
+
+
+async def wait_for_slot_async(url: str):
+    """Czeka na token dla hosta podanego URL (kod asyncio)"""
+    await _limiter.bucket(url).acquire_async()
+
+
+def report_rate_limited(url: str, retry_after: Optional[float] = None):
+    """
+    Zgłasza odpowiedź 429 (lub inny sygnał przeciążenia) - wstrzymuje cały host
+
+    Args:
+        url: URL, dla którego host odpowiedział odmową
+        retry_after: Czas wstrzymania w sekundach (np. z parse_retry_after)
+    """
+    delay = _limiter.bucket(url).penalize(retry_after)
+    logger.warning(f"🚦 {_host_of(url)} ogranicza tempo - wstrzymuję żądania na {delay:.0f}s")
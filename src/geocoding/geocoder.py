@@ -14,6 +14,8 @@ from typing import Dict, List, Optional, Tuple
 sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
 
 from mysql_utils import get_mysql_connection
+from src.fetching.http_session import http_get
+from src.fetching.rate_limiter import get_rate_limiter
 
 # Konfiguracja logowania
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -21,7 +23,7 @@ logger = logging.getLogger(__name__)
 
 # Konfiguracja geocodingu - ZOPTYMALIZOWANA
 NOMINATIM_BASE_URL = "https://nominatim.openstreetmap.org/search"
-DELAY_BETWEEN_REQUESTS = 1  # Zmniejszone z 1.1s
+# Tempo zapytań (1 req/s wg polityki Nominatim) pilnuje globalny limiter w http_get
 MAX_RETRIES = 2  # Zmniejszone z 3 dla szybkości
 BATCH_SIZE = 100  # Zwiększone z 50
 
@@ -100,7 +102,7 @@ def geocode_address_improved(query: str, fallback_query: str = None) -> Optional
     for attempt in range(MAX_RETRIES):
         try:
             logger.debug(f"Geocoding attempt {attempt + 1}: {query}")
-            response = requests.get(NOMINATIM_BASE_URL, params=params, headers=headers, timeout=10)
+            response = http_get(NOMINATIM_BASE_URL, params=params, headers=headers, timeout=10)
             response.raise_for_status()
             
             data = response.json()
@@ -131,12 +133,11 @@ def geocode_address_improved(query: str, fallback_query: str = None) -> Optional
     # Próba 2: Fallback query (jeśli podane)
     if fallback_query and fallback_query != query:
         logger.debug(f"Próba fallback: {fallback_query}")
-        time.sleep(DELAY_BETWEEN_REQUESTS)
         
         params['q'] = fallback_query
         
         try:
-            response = requests.get(NOMINATIM_BASE_URL, params=params, headers=headers, timeout=10)
+            response = http_get(NOMINATIM_BASE_URL, params=params, headers=headers, timeout=10)
             response.raise_for_status()
             
             data = response.json()
@@ -360,19 +361,11 @@ def process_geocoding_batch_improved(addresses: List[Dict]) -> Dict[str, int]:
                     logger.warning(f"⚠️ {i+j}/{len(geocoding_tasks)} - Brak współrzędnych dla ID {address_id}")
                 
                 stats["processed"] += 1
-                
-                # Opóźnienie między requestami (zmniejszone)
-                if j < len(group):
-                    time.sleep(DELAY_BETWEEN_REQUESTS)
                     
             except Exception as e:
                 batch_results.append((address_id, None))
                 stats["failed"] += 1
                 logger.error(f"❌ Błąd przetwarzania nieruchomości ID {address_id}: {e}")
-        
-        # Krótkie opóźnienie między grupami
-        if i + group_size < len(geocoding_tasks):
-            time.sleep(0.5)
     
     # Batch update wszystkich wyników na raz
     if batch_results:
@@ -395,7 +388,7 @@ def update_all_coordinates_improved(batch_size: int = BATCH_SIZE, max_addresses:
     print(f"📊 Parametry:")
     print(f"   • Rozmiar batcha: {batch_size}")
     print(f"   • Maksymalne adresy: {max_addresses or 'wszystkie'}")
-    print(f"   • Opóźnienie między requestami: {DELAY_BETWEEN_REQUESTS}s")
+    print(f"   • Limit tempa Nominatim: {get_rate_limiter().bucket(NOMINATIM_BASE_URL).rate} req/s")
     print(f"   • Maksymalne retry: {MAX_RETRIES}")
     print(f"   • Uproszczone zapytania: TAK")
     print(f"   • Fallback queries: TAK")
@@ -467,10 +460,6 @@ def update_all_coordinates_improved(batch_size: int = BATCH_SIZE, max_addresses:
             break
         
         batch_number += 1
-        
-        # Zmniejszone opóźnienie między batchami
-        print(f"⏳ Opóźnienie 2 sekundy przed następnym batchem...")
-        time.sleep(2)
     
     # Podsumowanie końcowe z wydajnością
     total_time = time.time() - start_time
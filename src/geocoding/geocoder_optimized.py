@@ -17,6 +17,7 @@ import json
 sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
 
 from mysql_utils import get_mysql_connection
+from src.fetching.rate_limiter import get_rate_limiter, wait_for_slot_async, report_rate_limited, parse_retry_after
 
 # Konfiguracja logowania
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -24,7 +25,6 @@ logger = logging.getLogger(__name__)
 
 # Konfiguracja geocodingu
 NOMINATIM_BASE_URL = "https://nominatim.openstreetmap.org/search"
-DELAY_BETWEEN_REQUESTS = 0.5  # Zmniejszone opóźnienie dla async
 MAX_RETRIES = 2  # Zmniejszone retry dla szybkości
 MAX_CONCURRENT_REQUESTS = 5  # Maksymalna liczba równoczesnych requestów
 BATCH_SIZE = 100  # Większy batch size
@@ -131,7 +131,11 @@ class OptimizedGeocoder:
             # Próba 1: Główne zapytanie
             for attempt in range(MAX_RETRIES):
                 try:
+                    await wait_for_slot_async(NOMINATIM_BASE_URL)
                     async with self.session.get(NOMINATIM_BASE_URL, params=params) as response:
+                        if response.status == 429:
+                            report_rate_limited(NOMINATIM_BASE_URL, parse_retry_after(response.headers.get("Retry-After")))
+                            continue
                         if response.status == 200:
                             data = await response.json()
                             
@@ -162,8 +166,11 @@ class OptimizedGeocoder:
                 params['q'] = fallback_query
                 
                 try:
+                    await wait_for_slot_async(NOMINATIM_BASE_URL)
                     async with self.session.get(NOMINATIM_BASE_URL, params=params) as response:
-                        if response.status == 200:
+                        if response.status == 429:
+                            report_rate_limited(NOMINATIM_BASE_URL, parse_retry_after(response.headers.get("Retry-After")))
+                        elif response.status == 200:
                             data = await response.json()
                             
                             if data and len(data) > 0:
@@ -178,9 +185,6 @@ class OptimizedGeocoder:
                 except Exception as e:
                     logger.error(f"Błąd fallback geocodingu: {e}")
             
-            # Opóźnienie między requestami
-            await asyncio.sleep(DELAY_BETWEEN_REQUESTS)
-            
             logger.warning(f"Brak wyników geocodingu dla: {query}")
             return None
     
@@ -327,7 +331,7 @@ async def run_optimized_geocoding(max_addresses: int = None, batch_size: int = B
     print(f"   • Rozmiar batcha: {batch_size}")
     print(f"   • Maksymalne adresy: {max_addresses or 'wszystkie'}")
     print(f"   • Równoczesne requesty: {MAX_CONCURRENT_REQUESTS}")
-    print(f"   • Opóźnienie: {DELAY_BETWEEN_REQUESTS}s")
+    print(f"   • Limit tempa: {get_rate_limiter().bucket(NOMINATIM_BASE_URL).rate} req/s")
     print("="*80)
     
     total_stats = {
@@ -392,9 +396,6 @@ async def run_optimized_geocoding(max_addresses: int = None, batch_size: int = B
                 break
             
             batch_number += 1
-            
-            # Krótkie opóźnienie między batchami
-            await asyncio.sleep(1)
     
     # Podsumowanie końcowe
     total_time = time.time() - start_time
@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+"""
+PARSER SEKCJI SZCZEGÓŁÓW OGŁOSZENIA (AdDetails) - TABELA PÓL
+Jedna deklaratywna lista pól (etykiety → funkcja parsująca wartość) zamiast
+łańcuchów if/elif powielonych w parserze kart i stron ogłoszeń. Etykiety są
+normalizowane i rozwiązywane do pola raz na proces (cache), a kontener
+szczegółów jest przechodzony jednokrotnie.
+"""
+import re
+from functools import lru_cache
+import os
+import sys
+from typing import Callable, Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from src.parsers.keyword_matcher import KeywordMatcher
+
+# Selektory sekcji szczegółów Otodom
+DETAILS_CONTAINER_SELECTOR = '[data-sentry-component="AdDetailsBase"]'
+DETAIL_ITEM_ATTRS = {"data-sentry-source-file": "AdDetailItem.tsx"}
+DETAIL_ITEM_CLASS = "css-1xw0jqp"
+DETAIL_TEXT_CLASS = "esen0m92"
+FEATURE_SPAN_SELECTOR = "span.css-axw7ok.esen0m94"
+
+# Mapowanie rodzaju zabudowy na wartości ENUM z bazy
+BUILDING_TYPE_KEYWORDS = {
+    "blok": "blok",
+    "kamienica": "kamienica",
+    "apartamentowiec": "apartamentowiec",
+    "dom wielorodzinny": "dom wielorodzinny",
+    "wielka płyta": "wielka płyta",
+}
+
+# Mapowanie stanu wykończenia na standard_of_finish (tinyint)
+FINISH_KEYWORDS = {
+    "do zamieszkania": 1,
+    "gotowe do zamieszkania": 1,
+    "developerski": 2,
+    "deweloperski": 2,
+    "do wykończenia": 3,
+    "do remontu": 4,
+    "surowy otwarty": 5,
+    "surowy zamknięty": 6,
+}
+
+
+class FieldSpec(NamedTuple):
+    """Pole sekcji szczegółów: etykiety (znormalizowane) i parser wartości"""
+    name: str
+    labels: Tuple[str, ...]
+    parse: Optional[Callable[[str], Dict]]   # None = pole obsługiwane gdzie indziej
+
+
+def normalize_text(text: Optional[str]) -> str:
+    """Małe litery, pojedyncze spacje, bez dwukropka na końcu etykiety"""
+    return " ".join((text or "").split()).lower().rstrip(":").strip()
+
+
+def extract_numeric_value(text: str) -> float:
+    """Wydobywa wartość numeryczną z tekstu"""
+    if not text:
+        return None
+
+    # Znajdź pierwszą liczbę w tekście
+    match = re.search(r'(\d+(?:[,.])\d+|\d+)', text.replace(' ', ''))
+    if match:
+        value_str = match.group(1).replace(',', '.')
+        try:
+            return float(value_str)
+        except ValueError:
+            pass
+    return None
+
+
+def _parse_floor(value: str) -> Dict:
+    # Format: "3/4" -> floor=3, total_floors=4
+    if '/' not in value:
+        return {}
+    parts = value.split('/')
+    try:
+        return {"floor": int(parts[0].strip()), "total_floors": int(parts[1].strip())}
+    except (ValueError, IndexError):
+        return {}
+
+
+def _parse_year(value: str) -> Dict:
+    try:
+        year = int(value.strip())
+    except ValueError:
+        return {}
+    return {"year_of_construction": year} if 1800 <= year <= 2030 else {}  # Walidacja rozsądnych lat
+
+
+def _parse_elevator(value: str) -> Dict:
+    return {"has_elevator": 'tak' in value or 'yes' in value}
+
+
+def _parse_building_type(value: str) -> Dict:
+    for keyword, building_type in BUILDING_TYPE_KEYWORDS.items():
+        if keyword in value:
+            return {"building_type": building_type}
+    return {"building_type": "inny"}
+
+
+def _parse_finish(value: str) -> Dict:
+    for keyword, finish in FINISH_KEYWORDS.items():
+        if keyword in value:
+            return {"standard_of_finish": finish}
+    return {}
+
+
+def _parse_rent(value: str) -> Dict:
+    rent_value = extract_numeric_value(value)
+    return {"rent_amount": rent_value} if rent_value and rent_value > 0 else {}
+
+
+def _parse_market(value: str) -> Dict:
+    if 'pierwotny' in value:
+        return {"market": "pierwotny"}
+    if 'wtórny' in value:
+        return {"market": "wtórny"}
+    return {}
+
+
+# Kolejność ma znaczenie przy dopasowaniu podciągu (jak w dawnym łańcuchu if/elif)
+DETAIL_FIELDS: List[FieldSpec] = [
+    FieldSpec("area", ("powierzchnia",), None),          # Z karty / strony wyników
+    FieldSpec("rooms", ("liczba pokoi",), None),
+    FieldSpec("floor", ("piętro",), _parse_floor),
+    FieldSpec("year_of_construction", ("rok budowy",), _parse_year),
+    FieldSpec("has_elevator", ("winda",), _parse_elevator),
+    FieldSpec("building_type", ("rodzaj zabudowy",), _parse_building_type),
+    FieldSpec("standard_of_finish", ("stan wykończenia",), _parse_finish),
+    FieldSpec("heating_type", ("ogrzewanie",), lambda value: {"heating_type": value}),
+    FieldSpec("rent_amount", ("czynsz",), _parse_rent),
+    FieldSpec("market", ("rynek",), _parse_market),
+]
+
+# Cechy z listy "Informacje dodatkowe" (pierwsze pasujące słowo kluczowe wygrywa)
+FEATURE_FLAGS: List[Tuple[str, Tuple[str, ...]]] = [
+    ("has_balcony", ("balkon",)),
+    ("has_garage", ("garaż", "parking")),
+    ("has_garden", ("ogród", "działka")),
+    ("has_basement", ("piwnica",)),
+    ("has_separate_kitchen", ("oddzielna kuchnia",)),
+    ("has_elevator", ("winda",)),
+    ("has_dishwasher", ("zmywarka",)),
+    ("has_fridge", ("lodówka",)),
+    ("has_oven", ("piekarnik",)),
+]
+
+FEATURE_FLAG_MATCHER = KeywordMatcher(dict(FEATURE_FLAGS))
+
+# Tablica dyspozycji: znormalizowana etykieta → pole
+_LABEL_TABLE: Dict[str, FieldSpec] = {label: spec for spec in DETAIL_FIELDS for label in spec.labels}
+
+
+@lru_cache(maxsize=1024)
+def resolve_label(label: str) -> Optional[FieldSpec]:
+    """Pole dla znormalizowanej etykiety: dokładne trafienie, potem podciąg (wynik w cache)"""
+    spec = _LABEL_TABLE.get(label)
+    if spec is not None:
+        return spec
+    for spec in DETAIL_FIELDS:
+        if any(keyword in label for keyword in spec.labels):
+            return spec
+    return None
+
+
+@lru_cache(maxsize=1024)
+def resolve_feature(text: str) -> Optional[str]:
+    """Flaga boolean dla znormalizowanego tekstu cechy (wynik w cache)"""
+    return FEATURE_FLAG_MATCHER.first(text)
+
+
+def iter_detail_items(details_container) -> Iterator[Tuple[str, str]]:
+    """Pary (etykieta, wartość) z sekcji szczegółów - znormalizowane, jednym przejściem"""
+    for item in details_container.find_all(attrs=DETAIL_ITEM_ATTRS, class_=DETAIL_ITEM_CLASS):
+        texts = item.find_all("p", class_=DETAIL_TEXT_CLASS, limit=2)
+        if len(texts) == 2:
+            yield normalize_text(texts[0].get_text()), normalize_text(texts[1].get_text())
+
+
+def extract_ad_details(details_container) -> Dict:
+    """
+    Parsuje sekcję szczegółów (pary etykieta-wartość i "Informacje dodatkowe")
+
+    Args:
+        details_container: Element BeautifulSoup sekcji AdDetails (karta lub strona ogłoszenia)
+
+    Returns:
+        Dict: Tylko znalezione pola (floor, total_floors, year_of_construction, building_type,
+              standard_of_finish, heating_type, rent_amount, market, has_* = True/False)
+    """
+    details = {}
+    for label, value in iter_detail_items(details_container):
+        spec = resolve_label(label)
+        if spec is not None and spec.parse is not None:
+            details.update(spec.parse(value))
+
+    for span in details_container.select(FEATURE_SPAN_SELECTOR):
+        flag = resolve_feature(normalize_text(span.get_text()))
+        if flag:
+            details[flag] = True
+    return details
@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+PARSER STRONY OGŁOSZENIA (ŚCIEŻKA DOM)
+Mapuje wyrenderowaną stronę ogłoszenia na szczegóły (te same klucze co
+parse_ad_page dla __NEXT_DATA__). Moduł nie zależy od warstwy pobierania,
+więc może działać w procesach puli parsującej (zob. parse_pool).
+"""
+import logging
+import os
+import re
+import sys
+from typing import Dict
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from src.parsers.ad_details_parser import DETAILS_CONTAINER_SELECTOR, FEATURE_SPAN_SELECTOR, extract_ad_details
+from src.parsers.html_parser import AD_DESCRIPTION_DATA_CY, AD_DETAILS_FALLBACK_CLASS
+from src.parsers.keyword_matcher import KeywordMatcher
+from src.parsers.otodom_json_parser import description_features
+from src.parsers.selector_registry import selector_chain
+
+logger = logging.getLogger(__name__)
+
+# Łańcuchy selektorów (kolejność = priorytet; martwe spadają na koniec - zob. selector_registry)
+AD_DETAILS_SELECTORS = selector_chain("ad.details", [DETAILS_CONTAINER_SELECTOR, f'.{AD_DETAILS_FALLBACK_CLASS}'])
+AD_ID_SELECTORS = selector_chain("ad.id", [
+    'p.e1izz2zk2.css-htq2ld',
+    "p:-soup-contains('ID:')",
+    "[data-cy*='id']",
+    "*:-soup-contains('ID:')",
+])
+AD_ID_PATTERN = re.compile(r'ID:\s*(\d+)')
+ACCORDION_SELECTOR = '[data-isopen="false"] .n-accordionitem-content, [data-isopen="true"] .n-accordionitem-content'
+
+# Cechy z akordeonów: (pole, wartość) - pierwsze pasujące wygrywa (jak dawny łańcuch elif)
+EQUIPMENT_KEYWORDS = {
+    ('has_dishwasher', True): ('zmywarka',),
+    ('has_fridge', True): ('lodówka',),
+    ('has_oven', True): ('piekarnik',),
+    ('security_features', 'drzwi_antywlamaniowe'): ('antywłamaniowe',),
+    ('security_features', 'domofon'): ('domofon', 'wideofon'),
+    ('media_features', 'internet'): ('internet',),
+    ('media_features', 'tv_kablowa'): ('telewizja kablowa',),
+    ('media_features', 'telefon'): ('telefon',),
+}
+
+EQUIPMENT_MATCHER = KeywordMatcher(EQUIPMENT_KEYWORDS)
+
+
+def parse_ad_page_dom(soup) -> Dict:
+    """
+    Parsuje szczegóły z wyrenderowanej strony ogłoszenia
+
+    Args:
+        soup: BeautifulSoup strony (zwykle sparsowany z filtrem AD_PAGE_ONLY)
+
+    Returns:
+        Dict: Szczegółowe dane z ogłoszenia
+    """
+    # Struktura wynikowa
+    detailed_data = {
+        "year_of_construction": None,
+        "building_type": None,
+        "floor": None,
+        "total_floors": None,
+        "standard_of_finish": None,
+        "heating_type": None,
+        "rent_amount": None,
+        "has_balcony": False,
+        "has_garage": False,
+        "has_garden": False,
+        "has_elevator": False,
+        "has_basement": False,
+        "has_separate_kitchen": False,
+        "has_dishwasher": False,
+        "has_fridge": False,
+        "has_oven": False,
+        "security_features": [],
+        "media_features": []
+    }
+
+    # Znajdź sekcję AdDetails (fallback - cała strona)
+    details_container = AD_DETAILS_SELECTORS.select_one(soup) or soup
+
+    # Pary klucz-wartość i cechy z "Informacje dodatkowe" - jedno przejście, tabela pól
+    detailed_data.update(extract_ad_details(details_container))
+
+    # Pobierz ID ogłoszenia z sekcji opisu
+    try:
+        listing_id = _extract_listing_id(soup)
+        if listing_id:
+            detailed_data['listing_id'] = listing_id
+            logger.debug(f"✅ Pobrano ID ogłoszenia: {listing_id}")
+    except Exception as e:
+        logger.warning(f"⚠️ Nie udało się pobrać ID ogłoszenia: {e}")
+
+    # Parsuj sekcje rozwijane (Wyposażenie, Zabezpieczenia, Media)
+    parse_equipment_sections(soup, detailed_data)
+
+    # Cechy wspomniane w pełnym opisie ogłoszenia
+    description = soup.find(attrs={"data-cy": AD_DESCRIPTION_DATA_CY})
+    if description:
+        for field in description_features(description.get_text(" ")):
+            detailed_data[field] = True
+
+    return detailed_data
+
+
+def _extract_listing_id(soup):
+    """ID ogłoszenia (np. z "ID: 66708040") - pierwszy element łańcucha z pasującym tekstem"""
+    id_element = AD_ID_SELECTORS.select_one(soup, accept=lambda element: AD_ID_PATTERN.search(element.get_text()))
+    return AD_ID_PATTERN.search(id_element.get_text()).group(1) if id_element else None
+
+
+def parse_equipment_sections(soup, detailed_data: Dict):
+    """
+    Parsuje sekcje wyposażenia, zabezpieczeń i mediów z rozwijanych accordionów
+
+    Args:
+        soup: BeautifulSoup object strony
+        detailed_data: Słownik do aktualizacji danymi
+    """
+    try:
+        for section in soup.select(ACCORDION_SELECTOR):
+            for span in section.select(FEATURE_SPAN_SELECTOR):
+                match = EQUIPMENT_MATCHER.first(span.get_text(" "))
+                if match is None:
+                    continue
+                field, value = match
+                if value is True:
+                    detailed_data[field] = True
+                else:
+                    detailed_data.setdefault(field, []).append(value)
+
+    except Exception as e:
+        logger.debug(f"⚠️ Błąd parsowania sekcji wyposażenia: {e}")
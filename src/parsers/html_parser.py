@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+WARSTWA PARSOWANIA HTML - SZYBKI BACKEND I CZĘŚCIOWE PARSOWANIE
+Buduje drzewo BeautifulSoup najszybszym dostępnym parserem (lxml, a bez niego
+html.parser) i - gdy wywołujący wie, czego szuka - tylko z potrzebnych
+poddrzew strony (SoupStrainer) zamiast całego dokumentu.
+"""
+import logging
+from typing import Optional, Union
+
+from bs4 import BeautifulSoup, SoupStrainer
+
+try:
+    import lxml  # noqa: F401
+    LXML_AVAILABLE = True
+except ImportError:
+    LXML_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+PARSER_BACKEND = "lxml" if LXML_AVAILABLE else "html.parser"
+
+# Atrybuty i klasy elementów czytanych ze strony ogłoszenia (ścieżka DOM)
+AD_DETAILS_COMPONENT = "AdDetailsBase"
+AD_DETAILS_FALLBACK_CLASS = "css-8mnxk5"
+AD_ID_CLASS = "e1izz2zk2"
+AD_DESCRIPTION_DATA_CY = "adPageAdDescription"
+
+
+def _is_ad_page_tag(name: str, attrs: dict) -> bool:
+    """
+    Elementy strony ogłoszenia potrzebne parse_ad_page_dom:
+    kontener szczegółów, akordeony wyposażenia, akapity (ID ogłoszenia),
+    opis ogłoszenia i blok __NEXT_DATA__. Pasujący element zachowuje całe poddrzewo.
+    """
+    if attrs.get("data-sentry-component") == AD_DETAILS_COMPONENT:
+        return True
+    if "data-isopen" in attrs:
+        return True
+    data_cy = attrs.get("data-cy") or ""
+    if "id" in data_cy or data_cy == AD_DESCRIPTION_DATA_CY:
+        return True
+    classes = attrs.get("class") or ""
+    if not isinstance(classes, str):
+        classes = " ".join(classes)
+    if AD_DETAILS_FALLBACK_CLASS in classes.split():
+        return True
+    if name == "p":
+        return True
+    return name == "script" and attrs.get("id") == "__NEXT_DATA__"
+
+
+class PredicateStrainer(SoupStrainer):
+    """
+    SoupStrainer wybierający elementy funkcją (nazwa, atrybuty) -> bool
+
+    Pozwala łączyć warunki na różnych atrybutach (OR), czego zwykły
+    SoupStrainer nie potrafi. Działa z bs4 < 4.13 (search_tag)
+    i z nowszym API filtrów (allow_tag_creation).
+    """
+
+    def __init__(self, predicate):
+        super().__init__()
+        self._predicate = predicate
+
+    def search_tag(self, markup_name=None, markup_attrs={}):
+        return self._predicate(markup_name, dict(markup_attrs or {}))
+
+    def allow_tag_creation(self, nsprefix, name, attrs):
+        return self._predicate(name, dict(attrs or {}))
+
+    def allow_string_creation(self, string):
+        # Teksty poza wybranymi elementami są pomijane
+        return False
+
+
+# Gotowe filtry częściowego parsowania
+NEXT_DATA_ONLY = SoupStrainer("script", id="__NEXT_DATA__")
+AD_PAGE_ONLY = PredicateStrainer(_is_ad_page_tag)
+
+
+def make_soup(markup: Union[str, bytes], parse_only: Optional[SoupStrainer] = None) -> BeautifulSoup:
+    """
+    Parsuje HTML najszybszym dostępnym backendem
+
+    Args:
+        markup: Surowy HTML
+        parse_only: Filtr SoupStrainer - budowane są tylko pasujące poddrzewa
+                    (None = cały dokument)
+
+    Returns:
+        BeautifulSoup: Sparsowana strona (lub jej fragmenty)
+    """
+    return BeautifulSoup(markup, PARSER_BACKEND, parse_only=parse_only)
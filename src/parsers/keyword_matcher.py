@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+WIELOWZORCOWE DOPASOWANIE SŁÓW KLUCZOWYCH (AHO-CORASICK)
+Rejestr "etykieta → słowa kluczowe" jest kompilowany raz do jednego
+automatu, który znajduje wszystkie trafienia w jednym liniowym przejściu
+po tekście - zamiast osobnego `słowo in tekst` dla każdego słowa każdej
+cechy. Dzięki temu opłaca się dopasowywać także pełne opisy ogłoszeń.
+
+Backend: pyahocorasick (automat w C, jedno przejście niezależnie od liczby
+słów). Bez niego rejestr jest przeszukiwany wyszukiwaniem podciągów w C
+(str.find) - w CPythonie szybszym od alternatywy w `re` nawet dla długich
+opisów - z pomijaniem słów, których etykiety już trafiono.
+"""
+import logging
+from typing import Dict, Hashable, Iterable, List, Optional, Set, Tuple
+
+try:
+    import ahocorasick
+    AHOCORASICK_AVAILABLE = True
+except ImportError:
+    AHOCORASICK_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+# Zaprzeczenia przed słowem kluczowym ("bez windy", "brak balkonu") - dla długich tekstów
+DESCRIPTION_NEGATIONS = ("bez ", "brak ", "nie ma ")
+NEGATION_WINDOW = 8   # Ile znaków przed trafieniem sprawdzać
+
+
+class KeywordMatcher:
+    """
+    Skompilowany rejestr słów kluczowych
+
+    Kolejność etykiet w rejestrze to ich priorytet (first() zwraca
+    najwcześniejszą trafioną - jak dawne łańcuchy if/elif).
+    """
+
+    def __init__(self, registry: Dict[Hashable, Iterable[str]], negations: Tuple[str, ...] = ()):
+        """
+        Args:
+            registry: Etykieta → słowa kluczowe (małe litery)
+            negations: Przedrostki unieważniające trafienie (np. "bez ")
+        """
+        self.labels: List[Hashable] = list(registry)
+        self._priority = {label: i for i, label in enumerate(self.labels)}
+        self.negations = negations
+
+        keyword_labels: Dict[str, List[Hashable]] = {}
+        for label, keywords in registry.items():
+            for keyword in keywords:
+                keyword_labels.setdefault(keyword.lower(), []).append(label)
+        self._keyword_labels = {keyword: tuple(labels) for keyword, labels in keyword_labels.items()}
+
+        self._automaton = None
+        if AHOCORASICK_AVAILABLE:
+            self._automaton = ahocorasick.Automaton()
+            for keyword in self._keyword_labels:
+                self._automaton.add_word(keyword, keyword)
+            self._automaton.make_automaton()
+
+    def _negated(self, text: str, start: int) -> bool:
+        window = text[max(0, start - NEGATION_WINDOW):start]
+        return any(window.endswith(negation) for negation in self.negations)
+
+    def _keyword_position(self, text: str, keyword: str) -> int:
+        """Pierwsze niezaprzeczone wystąpienie słowa (-1 gdy brak)"""
+        start = text.find(keyword)
+        while start != -1 and self._negated(text, start):
+            start = text.find(keyword, start + 1)
+        return start
+
+    def find(self, text: Optional[str]) -> Set[Hashable]:
+        """Wszystkie etykiety trafione w tekście"""
+        found = set()
+        if not text or not self._keyword_labels:
+            return found
+        text = text.lower()
+
+        if self._automaton is not None:
+            for end, keyword in self._automaton.iter(text):
+                if self.negations and self._negated(text, end - len(keyword) + 1):
+                    continue
+                found.update(self._keyword_labels[keyword])
+                if len(found) == len(self.labels):
+                    break
+            return found
+
+        for keyword, labels in self._keyword_labels.items():
+            if found.issuperset(labels):
+                continue
+            if self.negations:
+                if self._keyword_position(text, keyword) == -1:
+                    continue
+            elif keyword not in text:
+                continue
+            found.update(labels)
+        return found
+
+    def find_ordered(self, text: Optional[str]) -> List[Hashable]:
+        """Trafione etykiety w kolejności rejestru"""
+        return sorted(self.find(text), key=self._priority.__getitem__)
+
+    def first(self, text: Optional[str]) -> Optional[Hashable]:
+        """Trafiona etykieta o najwyższym priorytecie (lub None)"""
+        found = self.find(text)
+        return min(found, key=self._priority.__getitem__) if found else None
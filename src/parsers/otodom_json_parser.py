@@ -0,0 +1,401 @@
+#!/usr/bin/env python3
+"""
+PARSER DANYCH NEXT.JS OTODOM.PL
+Otodom jest aplikacją Next.js - zarówno strony wyników, jak i strony ogłoszeń
+zawierają komplet danych w bloku <script id="__NEXT_DATA__">. Ten moduł mapuje
+ten JSON bezpośrednio na strukturę ogłoszenia używaną przez scraper,
+bez renderowania strony w przeglądarce.
+"""
+import json
+import logging
+import os
+import re
+import sys
+from typing import Dict, List, Optional
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from src.parsers.keyword_matcher import KeywordMatcher, DESCRIPTION_NEGATIONS
+
+logger = logging.getLogger(__name__)
+
+OTODOM_AD_URL = "https://www.otodom.pl/pl/oferta/{slug}"
+
+# Liczba pokoi / piętro w wynikach wyszukiwania zapisane są jako enumy
+NUMBER_WORDS = {
+    "ONE": 1, "TWO": 2, "THREE": 3, "FOUR": 4, "FIVE": 5,
+    "SIX": 6, "SEVEN": 7, "EIGHT": 8, "NINE": 9, "TEN": 10,
+    "MORE": 11,
+}
+
+FLOOR_WORDS = {
+    "GROUND": 0, "GROUND_FLOOR": 0, "FIRST": 1, "SECOND": 2, "THIRD": 3, "FOURTH": 4, "FIFTH": 5,
+    "SIXTH": 6, "SEVENTH": 7, "EIGHTH": 8, "NINTH": 9, "TENTH": 10, "ABOVE_TENTH": 11,
+}
+
+# Mapowanie kluczy Otodom na wartości ENUM z bazy (building_type)
+BUILDING_TYPE_MAPPING = {
+    "block": "blok",
+    "tenement": "kamienica",
+    "apartment": "apartamentowiec",
+    "house": "dom",
+    "detached": "dom",
+    "semi_detached": "dom",
+    "ribbon": "dom",
+}
+
+# Mapowanie stanu wykończenia na standard_of_finish (tinyint) - zgodne z parserem DOM
+FINISH_STANDARD_MAPPING = {
+    "ready_to_use": 1,
+    "to_completion": 3,
+    "to_renovation": 4,
+}
+
+MARKET_MAPPING = {
+    "primary": "pierwotny",
+    "secondary": "wtórny",
+}
+
+# Cechy z list "features" (polskie etykiety) -> pola boolean
+FEATURE_KEYWORDS = {
+    "has_balcony": ("balkon", "taras", "loggia"),
+    "has_garage": ("garaż", "miejsce parkingowe"),
+    "has_garden": ("ogród", "ogródek"),
+    "has_elevator": ("winda",),
+    "has_basement": ("piwnica",),
+    "has_separate_kitchen": ("oddzielna kuchnia",),
+    "has_dishwasher": ("zmywarka",),
+    "has_fridge": ("lodówka",),
+    "has_oven": ("piekarnik",),
+}
+
+# Klucze ze słownika "target" (kody Otodom) -> pola boolean
+TARGET_FEATURE_CODES = {
+    "has_balcony": ("balcony", "terrace"),
+    "has_garage": ("garage",),
+    "has_garden": ("garden",),
+    "has_elevator": ("lift",),
+    "has_basement": ("basement",),
+    "has_separate_kitchen": ("separate_kitchen",),
+    "has_dishwasher": ("dishwasher",),
+    "has_fridge": ("fridge",),
+    "has_oven": ("oven",),
+}
+
+SECURITY_KEYWORDS = {
+    "drzwi_antywlamaniowe": ("antywłamaniowe",),
+    "domofon": ("domofon", "wideofon"),
+}
+
+MEDIA_KEYWORDS = {
+    "internet": ("internet",),
+    "tv_kablowa": ("telewizja kablowa",),
+    "telefon": ("telefon",),
+}
+
+# Skompilowane raz - jedno przejście po tekście zamiast skanu każdego słowa
+FEATURE_MATCHER = KeywordMatcher(FEATURE_KEYWORDS)
+SECURITY_MATCHER = KeywordMatcher(SECURITY_KEYWORDS)
+MEDIA_MATCHER = KeywordMatcher(MEDIA_KEYWORDS)
+# Opis ogłoszenia to swobodny tekst - "bez windy" nie oznacza windy
+DESCRIPTION_MATCHER = KeywordMatcher(FEATURE_KEYWORDS, negations=DESCRIPTION_NEGATIONS)
+
+_HTML_TAG_RE = re.compile(r"<[^>]+>")
+
+_NEXT_DATA_RE = re.compile(
+    r'<script[^>]*id="__NEXT_DATA__"[^>]*>(.*?)</script>', re.DOTALL
+)
+
+
+def extract_next_data(source) -> Optional[Dict]:
+    """
+    Wyciąga i dekoduje blok __NEXT_DATA__ ze strony
+
+    Args:
+        source: BeautifulSoup strony lub surowy HTML (str)
+
+    Returns:
+        Dict: Zdekodowany JSON lub None jeśli strona go nie zawiera
+    """
+    if source is None:
+        return None
+
+    try:
+        if isinstance(source, str):
+            match = _NEXT_DATA_RE.search(source)
+            raw = match.group(1) if match else None
+        else:
+            script = source.find("script", id="__NEXT_DATA__")
+            raw = script.string if script else None
+
+        if not raw:
+            return None
+        return json.loads(raw)
+    except (ValueError, TypeError) as e:
+        logger.debug(f"⚠️ Nie udało się zdekodować __NEXT_DATA__: {e}")
+        return None
+
+
+def _page_props(next_data: Dict) -> Dict:
+    return (next_data or {}).get("props", {}).get("pageProps", {}) or {}
+
+
+def _to_float(value) -> Optional[float]:
+    if value is None or value == "":
+        return None
+    try:
+        return float(str(value).replace(",", ".").replace(" ", ""))
+    except ValueError:
+        return None
+
+
+def _to_int(value) -> Optional[int]:
+    number = _to_float(value)
+    return int(number) if number is not None else None
+
+
+def _enum_number(value, mapping: Dict[str, int]) -> Optional[int]:
+    """Zamienia enum ("THREE", "floor_3") lub liczbę na int"""
+    if value is None:
+        return None
+    if isinstance(value, (int, float)):
+        return int(value)
+    text = str(value).strip()
+    if text.upper() in mapping:
+        return mapping[text.upper()]
+    match = re.search(r"(\d+)", text)
+    if match:
+        return int(match.group(1))
+    return None
+
+
+def _first(value):
+    """Wartości w "target" bywają listami jednoelementowymi"""
+    if isinstance(value, list):
+        return value[0] if value else None
+    return value
+
+
+def build_address_raw(location: Dict) -> str:
+    """
+    Składa adres w formacie znanym z kart ogłoszeń:
+    "ul. Kanarkowa, Gutkowo, Olsztyn, warmińsko-mazurskie"
+    """
+    if not location:
+        return ""
+
+    parts = []
+    address = location.get("address") or {}
+
+    street = address.get("street") or {}
+    street_name = (street.get("name") or "").strip()
+    if street_name:
+        number = (street.get("number") or "").strip()
+        parts.append(f"{street_name} {number}".strip())
+
+    # reverseGeocoding.locations idzie od województwa do najmniejszej jednostki
+    geo_locations = (location.get("reverseGeocoding") or {}).get("locations") or []
+    names = [loc.get("name") or loc.get("fullName") for loc in geo_locations]
+    names = [name for name in names if name]
+    if names:
+        for name in reversed(names):
+            if name not in parts:
+                parts.append(name)
+    else:
+        for key in ("district", "city", "province"):
+            name = (address.get(key) or {}).get("name")
+            if name and name not in parts:
+                parts.append(name)
+
+    return ", ".join(parts)
+
+
+def _match_keywords(texts: List[str], matcher: KeywordMatcher) -> List[str]:
+    # Osobne linie - słowo kluczowe nie może się skleić z dwóch etykiet
+    return matcher.find_ordered("\n".join(texts))
+
+
+def description_features(description: Optional[str]) -> List[str]:
+    """
+    Pola boolean wspomniane w opisie ogłoszenia (HTML lub tekst)
+
+    Returns:
+        List[str]: Pola has_* do ustawienia na True (zaprzeczone wzmianki pomijane)
+    """
+    if not description:
+        return []
+    return DESCRIPTION_MATCHER.find_ordered(_HTML_TAG_RE.sub(" ", str(description)))
+
+
+def parse_search_page(next_data: Dict) -> Optional[Dict]:
+    """
+    Parsuje stronę wyników wyszukiwania
+
+    Args:
+        next_data: Zdekodowany __NEXT_DATA__ strony wyników
+
+    Returns:
+        Dict: {"items": [surowe ogłoszenia], "total_items": int, "total_pages": int,
+               "items_per_page": int} lub None jeśli JSON nie zawiera wyników
+    """
+    data = _page_props(next_data).get("data") or {}
+    search_ads = data.get("searchAds")
+    if not isinstance(search_ads, dict):
+        return None
+
+    pagination = search_ads.get("pagination") or {}
+    return {
+        "items": search_ads.get("items") or [],
+        "total_items": _to_int(pagination.get("totalItems")),
+        "total_pages": _to_int(pagination.get("totalPages")),
+        "items_per_page": _to_int(pagination.get("itemsPerPage")),
+    }
+
+
+def map_search_item(item: Dict) -> Optional[Dict]:
+    """
+    Mapuje pojedyncze ogłoszenie z wyników wyszukiwania na pola karty ogłoszenia
+
+    Returns:
+        Dict: Podstawowe pola (url, title_raw, address_raw, price, area, rooms, floor,
+              listing_id, listing_date) lub None dla niepełnego wpisu
+    """
+    slug = item.get("slug")
+    title = (item.get("title") or "").strip()
+    if not slug and not title:
+        return None
+
+    price = (item.get("totalPrice") or {}).get("value")
+    rooms = _enum_number(item.get("roomsNumber"), NUMBER_WORDS)
+
+    return {
+        "url": OTODOM_AD_URL.format(slug=slug) if slug else "",
+        "listing_id": str(item["id"]) if item.get("id") else None,
+        "title_raw": title,
+        "address_raw": build_address_raw(item.get("location") or {}),
+        "price": _to_float(price),
+        "area": _to_float(item.get("areaInSquareMeters")),
+        "rooms": rooms if rooms and rooms > 0 else None,
+        "floor": _enum_number(item.get("floorNumber"), FLOOR_WORDS),
+        "listing_date": (item.get("dateCreated") or "")[:10] or None,
+    }
+
+
+def parse_ad_page(next_data: Dict) -> Optional[Dict]:
+    """
+    Mapuje dane strony ogłoszenia na szczegóły (te same klucze co scrape_individual_listing)
+
+    Args:
+        next_data: Zdekodowany __NEXT_DATA__ strony ogłoszenia
+
+    Returns:
+        Dict: Szczegółowe dane ogłoszenia lub None jeśli JSON nie zawiera ogłoszenia
+    """
+    ad = _page_props(next_data).get("ad")
+    if not isinstance(ad, dict) or not ad.get("id"):
+        return None
+
+    characteristics = {}
+    for characteristic in ad.get("characteristics") or []:
+        key = characteristic.get("key")
+        if key:
+            characteristics[key] = characteristic
+
+    def char_value(key):
+        return (characteristics.get(key) or {}).get("value")
+
+    target = ad.get("target") or {}
+
+    detailed_data = {
+        "listing_id": str(ad["id"]),
+        "year_of_construction": None,
+        "building_type": None,
+        "floor": None,
+        "total_floors": None,
+        "standard_of_finish": None,
+        "heating_type": None,
+        "rent_amount": None,
+        "has_balcony": False,
+        "has_garage": False,
+        "has_garden": False,
+        "has_elevator": False,
+        "has_basement": False,
+        "has_separate_kitchen": False,
+        "has_dishwasher": False,
+        "has_fridge": False,
+        "has_oven": False,
+        "security_features": [],
+        "media_features": [],
+    }
+
+    # Rok budowy
+    year = _to_int(char_value("build_year") or _first(target.get("Build_year")))
+    if year and 1800 <= year <= 2030:
+        detailed_data["year_of_construction"] = year
+
+    # Piętro: "floor_3" / "ground_floor"
+    floor_raw = char_value("floor_no") or _first(target.get("Floor_no"))
+    detailed_data["floor"] = _enum_number(floor_raw, FLOOR_WORDS)
+    detailed_data["total_floors"] = _to_int(
+        char_value("building_floors_num") or _first(target.get("Building_floors_num"))
+    )
+
+    # Typ budynku i stan wykończenia
+    building_type = char_value("building_type") or _first(target.get("Building_type"))
+    if building_type:
+        detailed_data["building_type"] = BUILDING_TYPE_MAPPING.get(str(building_type).lower(), "inny")
+
+    finish = char_value("construction_status") or _first(target.get("Construction_status"))
+    if finish:
+        detailed_data["standard_of_finish"] = FINISH_STANDARD_MAPPING.get(str(finish).lower())
+
+    # Ogrzewanie - etykieta po polsku jak w parserze DOM
+    heating = characteristics.get("heating") or {}
+    heating_label = heating.get("localizedValue") or heating.get("value") or _first(target.get("Heating"))
+    if heating_label:
+        detailed_data["heating_type"] = str(heating_label).lower()
+
+    rent = _to_float(char_value("rent") or target.get("Rent"))
+    if rent and rent > 0:
+        detailed_data["rent_amount"] = rent
+
+    # Rynek
+    market = char_value("market") or ad.get("market") or target.get("MarketType")
+    if market:
+        mapped_market = MARKET_MAPPING.get(str(market).lower())
+        if mapped_market:
+            detailed_data["market"] = mapped_market
+
+    # Cechy - z polskich etykiet oraz kodów w "target"
+    feature_labels = [str(f) for f in (ad.get("features") or [])]
+    for category in ad.get("featuresByCategory") or []:
+        feature_labels.extend(str(v) for v in (category.get("values") or []))
+
+    for field in _match_keywords(feature_labels, FEATURE_MATCHER):
+        detailed_data[field] = True
+    for field in description_features(ad.get("description")):
+        detailed_data[field] = True
+
+    target_codes = set()
+    for key in ("Extras_types", "Equipment_types", "Security_types", "Media_types"):
+        target_codes.update(str(code).lower() for code in (target.get(key) or []))
+    for field, codes in TARGET_FEATURE_CODES.items():
+        if any(code in target_codes for code in codes):
+            detailed_data[field] = True
+
+    detailed_data["security_features"] = _match_keywords(feature_labels, SECURITY_MATCHER)
+    detailed_data["media_features"] = _match_keywords(feature_labels, MEDIA_MATCHER)
+
+    # Współrzędne są w JSON - oszczędza to zapytanie do geocodera
+    coordinates = (ad.get("location") or {}).get("coordinates") or {}
+    latitude = _to_float(coordinates.get("latitude"))
+    longitude = _to_float(coordinates.get("longitude"))
+    if latitude and longitude:
+        detailed_data["latitude"] = latitude
+        detailed_data["longitude"] = longitude
+
+    created_at = ad.get("createdAt") or ad.get("dateCreated")
+    if created_at:
+        detailed_data["listing_date"] = str(created_at)[:10]
+
+    return detailed_data
@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+"""
+PULA PROCESÓW PARSUJĄCYCH
+Parsowanie stron ogłoszeń (json.loads __NEXT_DATA__, drzewo BeautifulSoup)
+jest ograniczone przez CPU - w wątkach I/O GIL szereguje je między workerami,
+a zajęty parser opóźnia kolejne pobrania. Pobierające wątki i silnik asyncio
+przekazują tu tylko surowy HTML, a wracają zwięzłe słowniki szczegółów, więc
+przepustowość parsowania rośnie z liczbą rdzeni niezależnie od współbieżności pobrań.
+"""
+import atexit
+import logging
+import multiprocessing
+import os
+import sys
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Callable, Dict, Optional, Union
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from src.parsers.ad_page_parser import parse_ad_page_dom
+from src.parsers.html_parser import AD_PAGE_ONLY, make_soup
+from src.parsers.otodom_json_parser import extract_next_data, parse_ad_page
+from src.parsers.selector_registry import drain_selector_deltas, merge_selector_deltas
+
+logger = logging.getLogger(__name__)
+
+# Konfiguracja puli (0 = parsowanie w wątku wywołującym, bez procesów)
+PARSE_WORKERS = int(os.getenv("PARSE_WORKERS", str(os.cpu_count() or 1)))
+# forkserver/spawn - fork procesu z działającymi wątkami (pętla asyncio, pula wątków) grozi zakleszczeniem
+PARSE_START_METHOD = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+
+
+def parse_ad_html(html: Union[bytes, str], parse_json: bool = True, parse_dom: bool = False) -> Optional[Dict]:
+    """
+    Parsuje surowy HTML strony ogłoszenia (funkcja procesu roboczego)
+
+    Args:
+        html: HTML strony (bajty z sieci lub tekst)
+        parse_json: Czy czytać szczegóły z __NEXT_DATA__
+        parse_dom: Czy parsować wyrenderowany DOM (gdy JSON niedostępny lub wyłączony)
+
+    Returns:
+        Dict: Szczegółowe dane ogłoszenia lub None
+    """
+    if not html:
+        return None
+    if isinstance(html, bytes):
+        html = html.decode("utf-8", errors="replace")
+    if parse_json:
+        detailed_data = parse_ad_page(extract_next_data(html))
+        if detailed_data:
+            return detailed_data
+    if parse_dom:
+        return parse_ad_page_dom(make_soup(html, AD_PAGE_ONLY))
+    return None
+
+
+def _call_with_selector_stats(fn: Callable, *args):
+    """Wywołuje fn w procesie roboczym i dołącza przyrosty statystyk selektorów"""
+    return fn(*args), drain_selector_deltas()
+
+
+def _merge_result(worker_future: Future, future: Future):
+    """Przenosi wynik z procesu roboczego, scalając statystyki selektorów w procesie głównym"""
+    if not future.set_running_or_notify_cancel():
+        return
+    try:
+        result, deltas = worker_future.result()
+    except BaseException as e:
+        future.set_exception(e)
+        return
+    merge_selector_deltas(deltas)
+    future.set_result(result)
+
+
+class ParsePool:
+    """
+    Pula procesów dla parsowania stron
+
+    Procesy startują leniwie przy pierwszym zleceniu. Przy zerowej liczbie
+    workerów albo awarii puli zlecenie wykonuje się w wątku wywołującym.
+    """
+
+    def __init__(self, workers: int = PARSE_WORKERS):
+        self.workers = workers
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+        self.stats = {"submitted": 0, "inline": 0, "restarts": 0}
+
+    def _ensure_started(self) -> Optional[ProcessPoolExecutor]:
+        with self._lock:
+            if self._executor is None and self.workers > 0:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers, mp_context=multiprocessing.get_context(PARSE_START_METHOD))
+                logger.info(f"🧮 Pula parsowania: {self.workers} procesów ({PARSE_START_METHOD})")
+            return self._executor
+
+    def submit(self, fn: Callable, *args) -> Future:
+        """
+        Zleca parsowanie (fn musi być funkcją modułu - przekazywana do procesu przez pickle)
+
+        Returns:
+            concurrent.futures.Future: Future z wynikiem fn(*args)
+        """
+        executor = self._ensure_started()
+        if executor is not None:
+            try:
+                worker_future = executor.submit(_call_with_selector_stats, fn, *args)
+                self.stats["submitted"] += 1
+                future = Future()
+                worker_future.add_done_callback(lambda done: _merge_result(done, future))
+                return future
+            except BrokenProcessPool:
+                # Proces roboczy padł (np. OOM) - następne zlecenia dostaną nową pulę
+                logger.warning("⚠️ Pula parsowania uszkodzona - restart, to zlecenie parsuję w wątku")
+                self._reset(executor)
+            except RuntimeError:
+                # Pula zamknięta przy wyjściu z programu
+                pass
+
+        future = Future()
+        self.stats["inline"] += 1
+        try:
+            future.set_result(fn(*args))
+        except Exception as e:
+            future.set_exception(e)
+        return future
+
+    def parse(self, fn: Callable, *args):
+        """Zleca parsowanie i czeka na wynik (wątek I/O zwalnia GIL na czas parsowania)"""
+        try:
+            return self.submit(fn, *args).result()
+        except BrokenProcessPool:
+            logger.warning("⚠️ Proces parsujący padł w trakcie zlecenia - parsuję w wątku")
+            self._reset(self._executor)
+            return fn(*args)
+
+    def _reset(self, executor: Optional[ProcessPoolExecutor]):
+        with self._lock:
+            if executor is None or self._executor is not executor:
+                return
+            self._executor = None
+            self.stats["restarts"] += 1
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    def close(self):
+        """Zamyka procesy robocze"""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True, cancel_futures=True)
+            logger.debug(f"🧮 Statystyki puli parsowania: {self.stats}")
+
+
+# Globalna pula współdzielona przez cały proces
+_pool: Optional[ParsePool] = None
+_pool_lock = threading.Lock()
+
+
+def get_parse_pool() -> ParsePool:
+    """Zwraca globalną pulę parsowania (tworzy ją przy pierwszym użyciu)"""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ParsePool(PARSE_WORKERS)
+        return _pool
+
+
+def configure_parse_pool(workers: Optional[int] = None):
+    """
+    Ustawia liczbę procesów parsujących (przed pierwszym użyciem puli)
+
+    Args:
+        workers: Liczba procesów (0 = parsowanie w wątkach I/O)
+    """
+    global PARSE_WORKERS
+    with _pool_lock:
+        if workers is not None:
+            PARSE_WORKERS = workers
+            if _pool is not None and _pool._executor is None:
+                _pool.workers = workers
+
+
+def shutdown_parse_pool():
+    """Zamyka globalną pulę parsowania"""
+    global _pool
+    with _pool_lock:
+        pool, _pool = _pool, None
+    if pool is not None:
+        pool.close()
+
+
+atexit.register(shutdown_parse_pool)
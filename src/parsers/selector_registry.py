@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+"""
+REJESTR SELEKTORÓW Z ADAPTACYJNĄ KOLEJNOŚCIĄ
+Pola kart i stron ogłoszeń są szukane łańcuchem selektorów zapasowych.
+Gdy Otodom zmieni hash klasy CSS, martwy selektor z początku łańcucha
+kosztowałby nieudane wyszukiwanie przy każdej karcie. Łańcuch liczy
+trafienia każdego selektora w bieżącym przebiegu, przesuwa martwe na koniec
+(żywe zachowują zadeklarowany priorytet - ogólny fallback typu "a" nie wyprzedza
+dokładnego selektora) i raportuje, które selektory przestały działać.
+
+Łańcuchy stron ogłoszeń działają w procesach puli parsującej: każdy proces
+adaptuje własną kopię, a przyrosty statystyk wracają z wynikiem parsowania
+(drain_selector_deltas) i są scalane w procesie głównym (merge_selector_deltas),
+więc raport obejmuje wszystkie łańcuchy.
+"""
+import logging
+import threading
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Konfiguracja adaptacji
+MIN_SAMPLES = 50         # Od tylu prób statystyki selektora są wiarygodne
+DEMOTE_HIT_RATE = 0.01   # Selektor trafiający rzadziej trafia na koniec łańcucha
+PROBE_INTERVAL = 1000    # Co tyle wyszukań pełna kolejność zadeklarowana (wykrycie powrotu selektora)
+
+
+class SelectorChain:
+    """
+    Łańcuch selektorów jednego pola (np. tytuł karty)
+
+    select_one() zwraca pierwszy element pasujący do selektora w bieżącej
+    kolejności; statystyki (próby, trafienia) są liczone per selektor.
+    """
+
+    def __init__(self, name: str, selectors: Sequence[str]):
+        """
+        Args:
+            name: Nazwa pola w raporcie (np. "card.title")
+            selectors: Selektory CSS w kolejności priorytetu
+        """
+        self.name = name
+        self.selectors = tuple(selectors)
+        self._attempts = [0] * len(self.selectors)
+        self._hits = [0] * len(self.selectors)
+        self._order = list(range(len(self.selectors)))
+        self._declared = tuple(self._order)
+        self._lookups = 0
+        # Przyrosty od ostatniego drain_delta() (przekazywane z procesów parsujących)
+        self._pending_lookups = 0
+        self._pending_attempts = [0] * len(self.selectors)
+        self._pending_hits = [0] * len(self.selectors)
+        self._lock = threading.Lock()
+
+    def select_one(self, element, accept: Optional[Callable] = None):
+        """
+        Pierwszy element pasujący do łańcucha
+
+        Args:
+            element: Element BeautifulSoup (karta, strona)
+            accept: Dodatkowy warunek dla znalezionego elementu (np. tekst zawiera "ID:")
+
+        Returns:
+            Element lub None
+        """
+        with self._lock:
+            self._lookups += 1
+            self._pending_lookups += 1
+            probe = self._lookups % PROBE_INTERVAL == 0
+        order = self._declared if probe else self._order
+        for index in order:
+            found = element.select_one(self.selectors[index])
+            if found is not None and (accept is None or accept(found)):
+                self._record(index, True)
+                return found
+            self._record(index, False)
+        return None
+
+    def _demoted(self, index: int) -> bool:
+        attempts = self._attempts[index]
+        return attempts >= MIN_SAMPLES and self._hits[index] / attempts < DEMOTE_HIT_RATE
+
+    def _record(self, index: int, hit: bool):
+        with self._lock:
+            if hit and self._demoted(index):
+                # Selektor znów działa (np. wycofana zmiana strony) - wraca na swoje miejsce
+                self._attempts[index] = self._hits[index] = 0
+                self._reorder()
+            self._attempts[index] += 1
+            self._pending_attempts[index] += 1
+            if hit:
+                self._hits[index] += 1
+                self._pending_hits[index] += 1
+            if self._attempts[index] % MIN_SAMPLES == 0:
+                self._reorder()
+
+    def _reorder(self):
+        order = sorted(self._declared, key=lambda index: (self._demoted(index), index))
+        if order != self._order:
+            self._order = order
+            logger.info(f"🔀 Selektory '{self.name}': kolejność "
+                        f"{' > '.join(self.selectors[index] for index in order)}")
+
+    def drain_delta(self) -> Optional[Tuple[int, List[int], List[int]]]:
+        """Przyrosty (wyszukania, próby, trafienia) od poprzedniego wywołania; None gdy brak"""
+        with self._lock:
+            if not self._pending_lookups:
+                return None
+            delta = (self._pending_lookups, self._pending_attempts, self._pending_hits)
+            self._pending_lookups = 0
+            self._pending_attempts = [0] * len(self.selectors)
+            self._pending_hits = [0] * len(self.selectors)
+            return delta
+
+    def merge_delta(self, lookups: int, attempts: Sequence[int], hits: Sequence[int]):
+        """Dolicza przyrosty z innego procesu (np. procesu puli parsującej)"""
+        with self._lock:
+            self._lookups += lookups
+            for index, (tried, hit) in enumerate(zip(attempts, hits)):
+                self._attempts[index] += tried
+                self._hits[index] += hit
+            self._reorder()
+
+    def report(self) -> List[Dict]:
+        """Statystyki selektorów w kolejności zadeklarowanej"""
+        with self._lock:
+            return [{
+                "selector": selector,
+                "attempts": self._attempts[index],
+                "hits": self._hits[index],
+                "hit_rate": self._hits[index] / self._attempts[index] if self._attempts[index] else None,
+                "dead": self._attempts[index] >= MIN_SAMPLES and not self._hits[index],
+            } for index, selector in enumerate(self.selectors)]
+
+
+# Globalny rejestr łańcuchów (nazwa → łańcuch)
+_chains: Dict[str, SelectorChain] = {}
+_chains_lock = threading.Lock()
+
+
+def selector_chain(name: str, selectors: Sequence[str]) -> SelectorChain:
+    """Zwraca łańcuch o danej nazwie (tworzy go przy pierwszym użyciu)"""
+    with _chains_lock:
+        chain = _chains.get(name)
+        if chain is None:
+            chain = _chains[name] = SelectorChain(name, selectors)
+        return chain
+
+
+def drain_selector_deltas() -> Dict[str, Tuple[int, List[int], List[int]]]:
+    """Przyrosty statystyk wszystkich łańcuchów (proces parsujący → proces główny)"""
+    with _chains_lock:
+        chains = list(_chains.values())
+    deltas = {}
+    for chain in chains:
+        delta = chain.drain_delta()
+        if delta is not None:
+            deltas[chain.name] = delta
+    return deltas
+
+
+def merge_selector_deltas(deltas: Dict[str, Tuple[int, List[int], List[int]]]):
+    """Scala przyrosty z drain_selector_deltas() w łańcuchach tego procesu"""
+    for name, (lookups, attempts, hits) in deltas.items():
+        with _chains_lock:
+            chain = _chains.get(name)
+        if chain is None or len(attempts) != len(chain.selectors):
+            logger.debug(f"⚠️ Pominięto statystyki nieznanego łańcucha selektorów '{name}'")
+            continue
+        chain.merge_delta(lookups, attempts, hits)
+
+
+def selector_report() -> Dict[str, List[Dict]]:
+    """Statystyki wszystkich używanych łańcuchów"""
+    with _chains_lock:
+        chains = list(_chains.values())
+    return {chain.name: chain.report() for chain in chains if chain._lookups}
+
+
+def log_selector_report():
+    """Loguje skuteczność selektorów; martwe selektory jako ostrzeżenie"""
+    for name, stats in selector_report().items():
+        summary = ", ".join(f"{s['selector']} {s['hits']}/{s['attempts']}" for s in stats if s["attempts"])
+        logger.info(f"🎯 Selektory '{name}': {summary}")
+        dead = [s["selector"] for s in stats if s["dead"]]
+        if dead:
+            logger.warning(f"💀 Martwe selektory '{name}' (0 trafień w ≥{MIN_SAMPLES} próbach): {', '.join(dead)}")
@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+BUDŻET CZASU CRAWLU (--deadline)
+Crawl uruchamiany w CI ma twardy limit czasu - po jego przekroczeniu proces
+jest zabijany razem z niezapisanymi ogłoszeniami. CrawlDeadline mierzy
+rzeczywisty koszt ogłoszenia (odstęp między ukończonymi ogłoszeniami przy
+bieżącej współbieżności), szacuje pozostałą pracę z łącznej liczby wyników
+i decyduje, kiedy przestać stronicować i kiedy przestać pobierać szczegóły,
+żeby zostawić czas rezerwy na opróżnienie potoku i zapis do bazy.
+"""
+import logging
+import threading
+import time
+from typing import Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+# Konfiguracja budżetu
+DEFAULT_DRAIN_RESERVE_SECONDS = 600.0   # Czas zostawiany na dokończenie pobrań, zapis i statystyki
+COST_EWMA_ALPHA = 0.05                  # Wygładzanie kosztu ogłoszenia
+MIN_COST_SAMPLES = 10                   # Od tylu ukończonych ogłoszeń koszt jest wiarygodny
+REPORT_INTERVAL_SECONDS = 300.0         # Co ile raportować prognozę w logu
+
+
+class CrawlDeadline:
+    """
+    Budżet czasu jednego przebiegu crawlu
+
+    Dwa progi:
+        - paging_closed(): nowe strony wyników nie zmieszczą się w budżecie
+          (zaległa praca × koszt ogłoszenia >= pozostały czas) - koniec paginacji
+        - expired(): skończył się czas na pracę - nie zlecamy nowych pobrań,
+          tylko kończymy te w locie (rezerwa na zapis zostaje nietknięta)
+
+    Priorytety: nowe ogłoszenia przed zmienionymi (zob. stream_listing_details) -
+    zmienione czekają, aż zabraknie nowych, więc przy wyczerpaniu budżetu
+    odpadają jako pierwsze.
+    """
+
+    def __init__(self, budget_seconds: float, reserve_seconds: float = DEFAULT_DRAIN_RESERVE_SECONDS,
+                 clock: Callable[[], float] = time.monotonic):
+        """
+        Args:
+            budget_seconds: Całkowity budżet czasu liczony od teraz
+            reserve_seconds: Rezerwa na opróżnienie potoku i zapis do bazy
+            clock: Źródło czasu (monotoniczne)
+        """
+        self._clock = clock
+        self.started = clock()
+        self.deadline = self.started + budget_seconds
+        self.reserve_seconds = min(reserve_seconds, budget_seconds / 2)
+        self._lock = threading.Lock()
+        self._last_completion: Optional[float] = None
+        self._cost: Optional[float] = None
+        self._last_report = self.started
+        self.total_results: Optional[int] = None
+        self.backlog = 0                 # Ogłoszenia czekające na pobranie lub w locie
+        self.paging_stopped = False      # Paginacja zakończona przez budżet (crawl niekompletny)
+        self.stats = {"completed": 0, "fetched": 0, "cards": 0, "dropped": 0, "deferred": 0}
+
+    @classmethod
+    def from_minutes(cls, minutes: float, reserve_minutes: Optional[float] = None) -> "CrawlDeadline":
+        reserve = DEFAULT_DRAIN_RESERVE_SECONDS if reserve_minutes is None else reserve_minutes * 60
+        return cls(minutes * 60, reserve)
+
+    # --- Czas ------------------------------------------------------------
+
+    def remaining(self) -> float:
+        """Czas na pracę (s) - bez rezerwy na zapis"""
+        return self.deadline - self.reserve_seconds - self._clock()
+
+    def expired(self) -> bool:
+        """Czy czas na pracę minął (zostaje tylko rezerwa)"""
+        return self.remaining() <= 0
+
+    @property
+    def cost_per_listing(self) -> Optional[float]:
+        """Zmierzony koszt ogłoszenia (s) przy bieżącej współbieżności"""
+        if self.stats["completed"] < MIN_COST_SAMPLES:
+            return None
+        return self._cost
+
+    def affordable_listings(self) -> Optional[int]:
+        """Ile ogłoszeń zmieści się jeszcze w budżecie"""
+        cost = self.cost_per_listing
+        if not cost:
+            return None
+        return max(0, int(self.remaining() / cost))
+
+    def paging_closed(self) -> bool:
+        """Czy przestać pobierać kolejne strony wyników"""
+        if self.expired():
+            return True
+        affordable = self.affordable_listings()
+        return affordable is not None and self.backlog >= affordable
+
+    # --- Pomiary ---------------------------------------------------------
+
+    def set_total_results(self, total_results: Optional[int]):
+        """Łączna liczba wyników wyszukiwania (z __NEXT_DATA__ albo tekstu 'N wyników')"""
+        if not total_results or self.total_results:
+            return
+        self.total_results = total_results
+        logger.info(f"⏱️ Budżet crawlu: {self.remaining() / 60:.0f} min pracy "
+                    f"(+{self.reserve_seconds / 60:.0f} min rezerwy), wyników do przejrzenia: {total_results}")
+
+    def observe_cards(self, count: int, to_fetch: int):
+        """Strona wyników: count kart, z czego to_fetch wymaga pobrania szczegółów"""
+        with self._lock:
+            self.stats["cards"] += count
+            self.stats["fetched"] += to_fetch
+
+    def observe_completion(self):
+        """Ukończone ogłoszenie - aktualizuje koszt (EWMA odstępu między ukończeniami)"""
+        now = self._clock()
+        with self._lock:
+            if self._last_completion is not None:
+                interval = now - self._last_completion
+                self._cost = interval if self._cost is None else (
+                    COST_EWMA_ALPHA * interval + (1 - COST_EWMA_ALPHA) * self._cost)
+            self._last_completion = now
+            self.stats["completed"] += 1
+            report = now - self._last_report >= REPORT_INTERVAL_SECONDS
+            if report:
+                self._last_report = now
+        if report:
+            self.log_forecast()
+
+    def forecast(self) -> Dict[str, Optional[float]]:
+        """Prognoza: pozostała praca (ogłoszenia, s) i przewidywane pokrycie wyników"""
+        cost = self.cost_per_listing
+        remaining_work = self.backlog
+        if self.total_results and self.stats["cards"]:
+            fetch_ratio = self.stats["fetched"] / self.stats["cards"]
+            remaining_work += max(0, self.total_results - self.stats["cards"]) * fetch_ratio
+        needed = remaining_work * cost if cost else None
+        coverage = None
+        if needed is not None:
+            coverage = 1.0 if needed <= self.remaining() else max(0.0, self.remaining() / needed)
+        return {"remaining_listings": remaining_work, "needed_seconds": needed, "coverage": coverage}
+
+    def log_forecast(self):
+        forecast = self.forecast()
+        cost = self.cost_per_listing
+        if cost is None:
+            return
+        coverage = forecast["coverage"]
+        logger.info(f"⏱️ Budżet: zostało {self.remaining() / 60:.0f} min, koszt {cost:.2f} s/ogłoszenie, "
+                    f"do zrobienia ~{forecast['remaining_listings']:.0f} ogłoszeń "
+                    f"(~{forecast['needed_seconds'] / 60:.0f} min)"
+                    + (f", prognoza pokrycia {coverage * 100:.0f}%" if coverage is not None else ""))
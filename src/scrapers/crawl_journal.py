@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+"""
+DZIENNIK CRAWLU (WRITE-AHEAD) - WZNOWIENIE PO AWARII BEZ STRAT
+Append-only plik JSONL z każdym ukończonym ogłoszeniem (dane po pobraniu
+szczegółów), każdą przekazaną stroną wyników (lista jej URL-i) i każdym
+zapisem batcha do bazy. Po restarcie dziennik jest odtwarzany: ogłoszenia
+pobrane, ale niezapisane, wracają do zapisu bez ponownego pobierania, a crawl
+rusza od pierwszej niedokończonej strony, pomijając ogłoszenia już ukończone.
+"""
+import json
+import logging
+import os
+import sys
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+# Dodaj główny katalog do ścieżki
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from src.scrapers.listing import Listing
+
+logger = logging.getLogger(__name__)
+
+# Konfiguracja dziennika
+JOURNAL_ENABLED = os.getenv("CRAWL_JOURNAL_ENABLED", "1") != "0"
+DEFAULT_JOURNAL_PATH = Path(os.getenv("CRAWL_JOURNAL_PATH", str(Path.home() / ".otodom_journal.jsonl")))
+JOURNAL_VERSION = 1
+
+# Rodzaje wpisów
+RECORD_RUN = "run"          # Nagłówek: parametry przebiegu
+RECORD_PAGE = "page"        # Strona wyników przekazana do pobierania (URL-e jej kart)
+RECORD_LISTING = "listing"  # Ukończone ogłoszenie (z pobranymi szczegółami)
+RECORD_FLUSH = "flush"      # URL-e zapisane w bazie
+
+
+class CrawlJournal:
+    """
+    Dziennik write-ahead jednego przebiegu crawlu
+
+    Każdy wpis jest dopisywany jedną linią i od razu opróżniany do systemu
+    (przeżywa awarię procesu); wpisy stron i zapisów do bazy są dodatkowo
+    fsync-owane (przeżywają awarię maszyny). Urwana ostatnia linia jest przy
+    odtwarzaniu pomijana.
+    """
+
+    def __init__(self, path: Path = DEFAULT_JOURNAL_PATH, run_key: str = "", resume: bool = True):
+        """
+        Args:
+            path: Plik dziennika
+            run_key: Klucz przebiegu (np. URL wyników + tryb); dziennik innego przebiegu jest porzucany
+            resume: Czy odtworzyć niedokończony dziennik (False = zacznij od nowa)
+        """
+        self.path = Path(path)
+        self.run_key = run_key
+        self._lock = threading.Lock()
+        self._pages: Dict[int, List[str]] = {}
+        self._pending: Dict[str, Dict] = {}   # Ukończone, jeszcze niezapisane w bazie
+        self._flushed: Set[str] = set()
+        self.completed = False                # Paginacja doszła do końca
+        self.stats = {"replayed": 0, "skipped": 0, "recorded": 0, "flushed": 0}
+
+        if resume and self.path.exists():
+            self._replay()
+        self._compact()
+
+    # --- Odtwarzanie -----------------------------------------------------
+
+    def _replay(self):
+        """Wczytuje stan z dziennika (jeśli dotyczy tego samego przebiegu)"""
+        records = list(self._read_records())
+        if not records or records[0].get("t") != RECORD_RUN or records[0].get("key") != self.run_key:
+            if records:
+                logger.info(f"📓 Dziennik {self.path} dotyczy innego przebiegu - zaczynam od nowa")
+            return
+
+        for record in records[1:]:
+            kind = record.get("t")
+            if kind == RECORD_PAGE:
+                self._pages[record["page"]] = record["urls"]
+            elif kind == RECORD_LISTING:
+                listing = record["listing"]
+                self._pending[listing["url"]] = listing
+            elif kind == RECORD_FLUSH:
+                for url in record["urls"]:
+                    self._pending.pop(url, None)
+                    self._flushed.add(url)
+
+        self.stats["replayed"] = len(self._pending)
+        logger.info(f"📓 Wznowienie z dziennika: {len(self._pages)} stron, {len(self._flushed)} ogłoszeń w bazie, "
+                    f"{len(self._pending)} pobranych do zapisu, start od strony {self.resume_page()}")
+
+    def _read_records(self) -> Iterator[Dict]:
+        with open(self.path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError:
+                    # Urwany wpis z chwili awarii - wszystko wcześniej jest kompletne
+                    logger.warning(f"⚠️ Pomijam uszkodzony wpis dziennika {self.path}")
+                    break
+
+    def _compact(self):
+        """Przepisuje dziennik do minimalnego stanu (atomowo) i otwiera go do dopisywania"""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix(self.path.suffix + ".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(self._encode({"t": RECORD_RUN, "key": self.run_key, "v": JOURNAL_VERSION,
+                                  "started_at": datetime.now().isoformat(timespec="seconds")}))
+            for page, urls in sorted(self._pages.items()):
+                f.write(self._encode({"t": RECORD_PAGE, "page": page, "urls": urls}))
+            if self._flushed:
+                f.write(self._encode({"t": RECORD_FLUSH, "urls": sorted(self._flushed)}))
+            for listing in self._pending.values():
+                f.write(self._encode({"t": RECORD_LISTING, "listing": listing}))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.path)
+        self._file = open(self.path, "a", encoding="utf-8")
+
+    @staticmethod
+    def _encode(record: Dict) -> str:
+        return json.dumps(record, ensure_ascii=False, default=str, separators=(",", ":")) + "\n"
+
+    def _append(self, record: Dict, sync: bool = False):
+        with self._lock:
+            if self._file.closed:
+                return
+            self._file.write(self._encode(record))
+            self._file.flush()
+            if sync:
+                os.fsync(self._file.fileno())
+
+    # --- Stan wznowienia -------------------------------------------------
+
+    def is_done(self, url: Optional[str]) -> bool:
+        """Czy ogłoszenie zostało już ukończone (pobrane lub zapisane w bazie)"""
+        return bool(url) and (url in self._pending or url in self._flushed)
+
+    def resume_page(self) -> int:
+        """Pierwsza strona wyników z nieukończonymi ogłoszeniami (lub następna po ostatniej)"""
+        for page, urls in sorted(self._pages.items()):
+            if not all(self.is_done(url) for url in urls if url):
+                return page
+        return max(self._pages) + 1 if self._pages else 1
+
+    def pending_listings(self) -> List[Listing]:
+        """Ogłoszenia pobrane przed awarią, ale niezapisane w bazie"""
+        return [Listing(listing) for listing in self._pending.values()]
+
+    # --- Zapis -----------------------------------------------------------
+
+    def record_page(self, page: int, page_listings: Iterable[Dict]):
+        """Strona wyników przekazana do pobierania szczegółów"""
+        urls = [listing.get("url") for listing in page_listings if listing.get("url")]
+        self._pages[page] = urls
+        self._append({"t": RECORD_PAGE, "page": page, "urls": urls}, sync=True)
+
+    def record_listing(self, listing: Dict):
+        """Ogłoszenie ukończone (szczegóły pobrane) - jeszcze nie w bazie"""
+        url = listing.get("url")
+        if not url or url in self._flushed:
+            return
+        record = dict(listing)
+        self._pending[url] = record
+        self.stats["recorded"] += 1
+        self._append({"t": RECORD_LISTING, "listing": record})
+
+    def record_flush(self, listings: Iterable[Dict]):
+        """Batch ogłoszeń zapisany w bazie"""
+        urls = [listing.get("url") for listing in listings if listing.get("url")]
+        if not urls:
+            return
+        for url in urls:
+            self._pending.pop(url, None)
+            self._flushed.add(url)
+        self.stats["flushed"] += len(urls)
+        self._append({"t": RECORD_FLUSH, "urls": urls}, sync=True)
+
+    def filter_pages(self, pages: Iterator[Tuple[int, List[Dict]]]) -> Iterator[Tuple[int, List[Dict]]]:
+        """Zapisuje strony w dzienniku i usuwa z nich ogłoszenia ukończone przed wznowieniem"""
+        try:
+            for page, page_listings in pages:
+                self.record_page(page, page_listings)
+                remaining = [listing for listing in page_listings if not self.is_done(listing.get("url"))]
+                self.stats["skipped"] += len(page_listings) - len(remaining)
+                yield page, remaining
+            self.completed = True
+        finally:
+            pages.close()
+
+    def is_finished(self) -> bool:
+        """Czy przebieg doszedł do końca, a każde ogłoszenie z każdej strony jest w bazie"""
+        return (self.completed and not self._pending
+                and all(url in self._flushed for urls in self._pages.values() for url in urls))
+
+    def close(self):
+        """Zamyka dziennik; dziennik zakończonego przebiegu jest usuwany"""
+        with self._lock:
+            if not self._file.closed:
+                self._file.close()
+        if self.is_finished():
+            try:
+                self.path.unlink()
+            except FileNotFoundError:
+                pass
+            logger.info(f"📓 Przebieg zakończony - dziennik {self.path} usunięty")
+        elif self._pending:
+            logger.info(f"📓 Dziennik {self.path}: {len(self._pending)} ogłoszeń czeka na zapis przy wznowieniu")
@@ -0,0 +1,232 @@
+#!/usr/bin/env python3
+"""
+REKORD OGŁOSZENIA (Listing)
+Zwarty, typowany rekord zamiast ~45-kluczowego słownika: pola w __slots__,
+wartości normalizowane raz przy przypisaniu (float/int, kategorie jako
+internowane napisy, cechy has_* w jednej masce bitowej). Rekord zachowuje
+interfejs słownika (get, [], update, copy, in), więc potok scrapera, dziennik
+i zapis do bazy działają bez zmian; na krawędziach (JSON, kolejka zadań)
+zamieniany jest na zwykły dict przez to_dict().
+"""
+import sys
+from collections.abc import MutableMapping
+from typing import Any, Callable, Dict, Iterator, Optional, Tuple
+
+
+def _to_float(value) -> Optional[float]:
+    if value is None or value == "":
+        return None
+    try:
+        return float(str(value).replace(",", ".").replace(" ", "")) if isinstance(value, str) else float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _to_int(value) -> Optional[int]:
+    number = _to_float(value)
+    return int(number) if number is not None else None
+
+
+def _to_text(value) -> Optional[str]:
+    return value if value is None or isinstance(value, str) else str(value)
+
+
+def _to_category(value) -> Optional[str]:
+    # Kilka wartości powtarzanych w tysiącach ogłoszeń - jedna kopia napisu w pamięci
+    return sys.intern(value) if isinstance(value, str) else _to_text(value)
+
+
+def _to_list(value) -> Optional[list]:
+    if value is None:
+        return None
+    return value if isinstance(value, list) else list(value)
+
+
+TEXT_FIELDS = ("url", "listing_id", "title_raw", "address_raw", "street", "listing_date", "card_fingerprint")
+CATEGORY_FIELDS = ("city", "district", "province", "market", "building_type", "heating_type",
+                   "source", "card_status")
+FLOAT_FIELDS = ("price", "area", "latitude", "longitude", "rent_amount")
+INT_FIELDS = ("rooms", "floor", "total_floors", "year_of_construction", "standard_of_finish",
+              "source_page", "source_position",
+              "distance_to_city_center", "distance_to_nearest_lake", "distance_to_university",
+              "distance_to_nearest_public_transport", "distance_to_nearest_school",
+              "distance_to_nearest_kindergarten", "distance_to_nearest_supermarket")
+LIST_FIELDS = ("security_features", "media_features")
+
+# Cechy boolean - bity maski (kolejność = numer bitu)
+FLAG_FIELDS = ("has_balcony", "has_garage", "has_garden", "has_elevator", "has_basement",
+               "has_separate_kitchen", "has_dishwasher", "has_fridge", "has_oven")
+
+_COERCERS: Dict[str, Callable[[Any], Any]] = {}
+for _fields, _coerce in ((TEXT_FIELDS, _to_text), (CATEGORY_FIELDS, _to_category), (FLOAT_FIELDS, _to_float),
+                         (INT_FIELDS, _to_int), (LIST_FIELDS, _to_list)):
+    _COERCERS.update(dict.fromkeys(_fields, _coerce))
+
+SLOT_FIELDS: Tuple[str, ...] = tuple(_COERCERS)
+_FLAG_BITS = {field: 1 << i for i, field in enumerate(FLAG_FIELDS)}
+
+# Kolumny tabeli ogłoszeń w kolejności zapisu (save_listing)
+DB_COLUMNS = (
+    "url", "listing_id", "title_raw", "address_raw",
+    "price", "area", "rooms",
+    "market", "listing_date",
+    "city", "district", "street", "province", "latitude", "longitude",
+) + FLAG_FIELDS + (
+    "year_of_construction", "building_type", "floor", "total_floors", "standard_of_finish",
+    "heating_type", "rent_amount",
+    "distance_to_city_center", "distance_to_nearest_lake", "distance_to_university",
+    "distance_to_nearest_public_transport", "distance_to_nearest_school",
+    "distance_to_nearest_kindergarten", "distance_to_nearest_supermarket",
+    "security_features", "media_features",
+    "source", "source_page", "source_position",
+    "card_fingerprint",
+)
+DEFAULT_SOURCE = "otodom.pl"
+
+
+class Listing(MutableMapping):
+    """
+    Ogłoszenie nieruchomości o stałym zestawie pól
+
+    Nieustawione pole zachowuje się jak brakujący klucz słownika (KeyError,
+    get() zwraca domyślną wartość). Klucze spoza schematu trafiają do
+    pomocniczego słownika _extra (tworzonego dopiero przy pierwszym użyciu).
+    """
+
+    __slots__ = SLOT_FIELDS + ("_flags", "_flags_set", "_extra")
+
+    def __init__(self, data=None, **fields):
+        self._flags = 0        # Wartości cech has_*
+        self._flags_set = 0    # Które cechy has_* są ustawione
+        self._extra: Optional[Dict[str, Any]] = None
+        if data:
+            self.update(data)
+        if fields:
+            self.update(fields)
+
+    # --- Interfejs słownika ----------------------------------------------
+
+    def __getitem__(self, key: str):
+        bit = _FLAG_BITS.get(key)
+        if bit is not None:
+            if self._flags_set & bit:
+                return bool(self._flags & bit)
+            raise KeyError(key)
+        if key in _COERCERS:
+            try:
+                return getattr(self, key)
+            except AttributeError:
+                raise KeyError(key) from None
+        if self._extra is not None and key in self._extra:
+            return self._extra[key]
+        raise KeyError(key)
+
+    def get(self, key: str, default=None):
+        bit = _FLAG_BITS.get(key)
+        if bit is not None:
+            return bool(self._flags & bit) if self._flags_set & bit else default
+        if key in _COERCERS:
+            return getattr(self, key, default)
+        return self._extra.get(key, default) if self._extra is not None else default
+
+    def __setitem__(self, key: str, value):
+        bit = _FLAG_BITS.get(key)
+        if bit is not None:
+            self._flags_set |= bit
+            if value:
+                self._flags |= bit
+            else:
+                self._flags &= ~bit
+            return
+        coerce = _COERCERS.get(key)
+        if coerce is not None:
+            setattr(self, key, coerce(value))
+            return
+        if self._extra is None:
+            self._extra = {}
+        self._extra[key] = value
+
+    def __delitem__(self, key: str):
+        bit = _FLAG_BITS.get(key)
+        if bit is not None:
+            if not self._flags_set & bit:
+                raise KeyError(key)
+            self._flags_set &= ~bit
+            self._flags &= ~bit
+        elif key in _COERCERS:
+            try:
+                delattr(self, key)
+            except AttributeError:
+                raise KeyError(key) from None
+        elif self._extra is not None and key in self._extra:
+            del self._extra[key]
+        else:
+            raise KeyError(key)
+
+    def __contains__(self, key) -> bool:
+        bit = _FLAG_BITS.get(key)
+        if bit is not None:
+            return bool(self._flags_set & bit)
+        if key in _COERCERS:
+            return hasattr(self, key)
+        return self._extra is not None and key in self._extra
+
+    def __iter__(self) -> Iterator[str]:
+        for field in SLOT_FIELDS:
+            if hasattr(self, field):
+                yield field
+        for field, bit in _FLAG_BITS.items():
+            if self._flags_set & bit:
+                yield field
+        if self._extra:
+            yield from list(self._extra)
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+    def __repr__(self) -> str:
+        return f"Listing({self.to_dict()!r})"
+
+    def __getstate__(self):
+        return self.to_dict()
+
+    def __setstate__(self, state: Dict):
+        self.__init__(state)
+
+    # --- Konwersje na krawędziach ----------------------------------------
+
+    def copy(self) -> "Listing":
+        """Płytka kopia (jak dict.copy)"""
+        clone = Listing.__new__(Listing)
+        for field in SLOT_FIELDS:
+            try:
+                setattr(clone, field, getattr(self, field))
+            except AttributeError:
+                pass
+        clone._flags = self._flags
+        clone._flags_set = self._flags_set
+        clone._extra = dict(self._extra) if self._extra else None
+        return clone
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Zwykły słownik (JSON, kolejka zadań, dziennik)"""
+        return {key: self[key] for key in self}
+
+    @classmethod
+    def from_dict(cls, data) -> "Listing":
+        return data if isinstance(data, cls) else cls(data)
+
+    def db_row(self) -> Dict[str, Any]:
+        """
+        Wartości kolumn tabeli ogłoszeń (typy już znormalizowane)
+
+        Returns:
+            Dict: Kolumna → wartość; cechy has_* jako 0/1, listy bez serializacji
+        """
+        row = {}
+        for column in DB_COLUMNS:
+            bit = _FLAG_BITS.get(column)
+            row[column] = (1 if self._flags & bit else 0) if bit is not None else getattr(self, column, None)
+        if row["source"] is None:
+            row["source"] = DEFAULT_SOURCE
+        return row
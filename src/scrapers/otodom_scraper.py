@@ -8,18 +8,39 @@ import logging
 import sys
 import os
 import re
-from typing import List, Dict, Optional, Callable
+from typing import List, Dict, Optional, Callable, Iterator, Tuple, Union
 import json
 from pathlib import Path
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures import ThreadPoolExecutor, Future, wait, FIRST_COMPLETED
+from collections import deque
+import queue
 import threading
 import time
-import random
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
 
 # Dodaj główny katalog do ścieżki
 sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
 
-from utils import get_soup, random_delay, clean_text, extract_price
+from utils import get_soup, get_html, clean_text, extract_price, build_request_headers
+from src.fetching.driver_pool import configure_driver_pool
+from src.fetching.async_fetcher import get_async_fetcher, AIOHTTP_AVAILABLE
+from src.fetching.rate_limiter import get_rate_limiter
+from src.fetching.http_session import reset_network_time, last_network_time
+from src.fetching.concurrency import AdaptiveConcurrencyController, MAX_CONCURRENCY, is_blocking_signal
+from src.parsers.otodom_json_parser import extract_next_data, parse_search_page, map_search_item
+from src.parsers.html_parser import NEXT_DATA_ONLY
+from src.parsers.keyword_matcher import KeywordMatcher
+from src.parsers.parse_pool import get_parse_pool, parse_ad_html
+from src.parsers.selector_registry import selector_chain
+from src.parsers.ad_details_parser import (
+    DETAILS_CONTAINER_SELECTOR, extract_ad_details, extract_numeric_value
+)
+from src.deduplication.known_index import (
+    KnownListingIndex, get_known_index, card_fingerprint, CARD_UNCHANGED, CARD_CHANGED
+)
+from src.scrapers.crawl_journal import CrawlJournal
+from src.scrapers.crawl_deadline import CrawlDeadline
+from src.scrapers.listing import Listing
 
 # Import geocodingu 
 try:
@@ -41,35 +62,77 @@ _progress_lock = threading.Lock()
 _progress_counter = {"current": 0, "total": 0}
 
 DEFAULT_BASE_URL = "https://www.otodom.pl/pl/wyniki/sprzedaz/mieszkanie/cala-polska"
+DEFAULT_CHECKPOINT_FILE = Path.home() / ".otodom_progress.json"
+
+# Potok stron wyników: ile stron producent może wyprzedzić pobieranie szczegółów
+RESULTS_PREFETCH_PAGES = 2
+QUEUE_POLL_SECONDS = 0.5
+END_OF_PAGES = object()  # Znacznik końca stron w kolejce producenta
+
+# Crawl przyrostowy: sortowanie od najnowszych i stop po K stronach samych znanych ogłoszeń
+NEWEST_FIRST_PARAMS = {"by": "LATEST", "direction": "DESC"}
+INCREMENTAL_STOP_AFTER_KNOWN_PAGES = 3
+
+# Łączna liczba wyników w tekście strony (np. "12 345 wyników" - spacje tysięcy)
+TOTAL_RESULTS_PATTERN = re.compile(r'(\d{1,3}(?:[ \u00a0]\d{3})+|\d+)\s*wynik')
+RESULTS_PER_PAGE = 24
+
+# Znana liczba stron: kolejne strony wyników pobierane równolegle (pod wspólnym limitem tempa hosta)
+RESULTS_FETCH_WORKERS = 4
+RESULTS_FETCH_WINDOW = 4   # Ile stron naprzód względem oddanej konsumentowi
 
-def scrape_listing_details_thread_safe(listing_data: Dict, enable_geocoding: bool = False) -> Dict:
+# Kody HTTP ostateczne dla strony ogłoszenia (usunięte/błędny URL) - bez fallbacku
+# (403 może być blokadą anti-bot, 408/429 są przejściowe - te idą do Selenium)
+GONE_STATUS_CODES = frozenset(range(400, 500)) - {403, 408, 429}
+
+# Wstrzymanie hosta w limiterze po błędach pobierania stron wyników (s)
+TEMPORARY_ERROR_BACKOFF_SECONDS = 10
+ERROR_BACKOFF_SECONDS = 5
+
+def scrape_listing_details_thread_safe(listing_data: Dict, enable_geocoding: bool = False,
+                                       prefer_json: bool = True, parsed: Optional[Dict] = None,
+                                       controller: Optional[AdaptiveConcurrencyController] = None) -> Dict:
     """
     Thread-safe wrapper dla scrapowania szczegółów pojedynczego ogłoszenia
     
     Args:
         listing_data: Podstawowe dane ogłoszenia z URL
         enable_geocoding: Czy pobierać współrzędne geograficzne
+        prefer_json: Czy najpierw próbować szybkiej ścieżki __NEXT_DATA__ (bez Selenium)
+        parsed: Szczegóły ze strony pobranej przez silnik asyncio i sparsowanej w puli procesów
+                ({} = strona bez danych JSON lub nieudane pobranie HTTP - od razu Selenium)
+        controller: Kontroler AIMD - pobieranie zajmuje jego slot i raportuje wynik
     
     Returns:
         Dict: Ogłoszenie z pobranymi szczegółami
     """
     try:
-        # Dodaj random delay żeby nie przeciążać serwera
-        time.sleep(random.uniform(0.5, 2.0))
-        
         url = listing_data.get("url")
         if not url:
             return listing_data
-            
-        # Pobierz szczegóły
-        detailed_data = scrape_individual_listing(url)
+        
+        # Tempo żądań pilnuje globalny limiter - bez dodatkowych sleepów w wątku
+        detailed_data = parsed or None
+        
+        # Pobierz szczegóły (Selenium/DOM jako fallback gdy JSON nie wystarczył)
+        if not detailed_data:
+            if controller:
+                with controller.slot():
+                    # Kontroler ocenia serwer: czas samego żądania, bez limitera, backoffu i parsowania
+                    reset_network_time()
+                    detailed_data = scrape_individual_listing(url, prefer_json=prefer_json and parsed is None)
+                    controller.record(last_network_time(),
+                                      error=None if detailed_data else "brak szczegółów")
+            else:
+                detailed_data = scrape_individual_listing(url, prefer_json=prefer_json and parsed is None)
         
         # Połącz z podstawowymi danymi
         if detailed_data:
             listing_data.update(detailed_data)
         
-        # GEOCODING: Pobierz współrzędne jeśli włączone
-        if enable_geocoding and GEOCODING_AVAILABLE:
+        # GEOCODING: Pobierz współrzędne jeśli włączone (JSON ogłoszenia zwykle już je zawiera)
+        has_coordinates = listing_data.get('latitude') and listing_data.get('longitude')
+        if enable_geocoding and GEOCODING_AVAILABLE and not has_coordinates:
             try:
                 # Zbuduj zapytanie geocodingu z dostępnych danych
                 address_data = {
@@ -91,9 +154,6 @@ def scrape_listing_details_thread_safe(listing_data: Dict, enable_geocoding: boo
                     else:
                         logger.debug(f"⚠️ Brak współrzędnych dla: {geocoding_query}")
                         
-                # Dodaj opóźnienie dla geocodingu
-                time.sleep(1.0)
-                        
             except Exception as e:
                 logger.error(f"❌ Błąd geocodingu: {e}")
             
@@ -111,91 +171,327 @@ def scrape_listing_details_thread_safe(listing_data: Dict, enable_geocoding: boo
         logger.error(f"❌ Błąd w wątku dla {listing_data.get('url', 'unknown')}: {e}")
         return listing_data
 
-def extract_numeric_value(text: str) -> float:
-    """Wydobywa wartość numeryczną z tekstu"""
-    if not text:
-        return None
+def stream_listing_details(source: Union[List[Dict], queue.Queue], executor: ThreadPoolExecutor,
+                           enable_geocoding: bool = False, prefer_json: bool = True,
+                           controller: Optional[AdaptiveConcurrencyController] = None,
+                           known_index: Optional[KnownListingIndex] = None,
+                           deadline: Optional[CrawlDeadline] = None) -> Iterator[Dict]:
+    """
+    Pobiera szczegóły ogłoszeń i zwraca je w kolejności ukończenia
     
-    # Znajdź pierwszą liczbę w tekście
-    match = re.search(r'(\d+(?:[,.])\d+|\d+)', text.replace(' ', ''))
-    if match:
-        value_str = match.group(1).replace(',', '.')
-        try:
-            return float(value_str)
-        except ValueError:
-            pass
-    return None
-
-def extract_boolean_features(text: str) -> Dict[str, bool]:
-    """Wydobywa cechy boolean z tekstu (balkon, garaż, ogród, winda)"""
-    text_lower = text.lower()
+    Przy dostępnym aiohttp strony ogłoszeń pobiera silnik asyncio (wiele żądań
+    w locie pod wspólnym limitem tempa), a wątki executora tylko parsują JSON,
+    uruchamiają fallback Selenium i geocoding. Bez aiohttp całe ogłoszenie
+    obsługuje wątek, jak dotychczas. Liczbę pobrań w locie wyznacza kontroler AIMD,
+    a okno jest dopełniane na bieżąco - także ogłoszeniami z kolejnych stron.
     
-    return {
-        "has_balcony": any(word in text_lower for word in ['balkon', 'taras', 'loggia']),
-        "has_garage": any(word in text_lower for word in ['garaż', 'parking', 'miejsce parkingowe']),
-        "has_garden": any(word in text_lower for word in ['ogród', 'ogródek', 'działka']),
-        "has_elevator": any(word in text_lower for word in ['winda', 'elevator', 'ascensor'])
-    }
+    Args:
+        source: Lista ogłoszeń albo kolejka list (stron) zakończona znacznikiem END_OF_PAGES
+        executor: Pula wątków do przetwarzania ogłoszeń
+        enable_geocoding: Czy pobierać współrzędne geograficzne
+        prefer_json: Czy używać szybkiej ścieżki __NEXT_DATA__
+        controller: Kontroler adaptacyjnej współbieżności (None = bez limitu)
+        known_index: Indeks ogłoszeń już zapisanych w bazie - szczegóły są pobierane
+                     tylko dla nowych ogłoszeń i kart, które się zmieniły
+        deadline: Budżet czasu - nowe ogłoszenia są pobierane przed zmienionymi, a po
+                  wyczerpaniu budżetu kończone są tylko pobrania w locie (reszta zostaje
+                  na następny przebieg)
+    
+    Yields:
+        Dict: Ogłoszenie uzupełnione o szczegóły
+    """
+    if isinstance(source, queue.Queue):
+        page_queue = source
+    else:
+        page_queue = queue.Queue()
+        page_queue.put(list(source))
+        page_queue.put(END_OF_PAGES)
+    
+    fetcher = get_async_fetcher(headers_factory=build_request_headers) if prefer_json and AIOHTTP_AVAILABLE else None
+    pending = deque()
+    deferred = deque()  # Zmienione ogłoszenia - przy budżecie czasu po nowych
+    in_flight = {}
+    finished = False
+    
+    while True:
+        window = controller.limit if controller else float("inf")
+        
+        if deadline is not None:
+            deadline.backlog = len(pending) + len(deferred) + len(in_flight)
+            if deadline.expired() and (pending or deferred or not finished):
+                # Koniec budżetu: bez nowych pobrań, tylko dokończenie tych w locie
+                dropped = len(pending) + len(deferred)
+                deadline.stats["dropped"] += dropped
+                logger.warning(f"⏱️ Budżet czasu wyczerpany - kończę {len(in_flight)} pobrań w locie, "
+                               f"{dropped} ogłoszeń zostaje na następny przebieg")
+                pending.clear()
+                deferred.clear()
+                finished = True
+        
+        # Dobierz kolejne strony, gdy okno nie jest pełne (czekaj tylko gdy nie ma nic do roboty)
+        while not finished and len(pending) < window:
+            idle = not pending and not deferred and not in_flight
+            try:
+                item = page_queue.get(timeout=QUEUE_POLL_SECONDS) if idle else page_queue.get_nowait()
+            except queue.Empty:
+                if idle:
+                    continue
+                break
+            if item is END_OF_PAGES:
+                finished = True
+            else:
+                pending.extend(item)
+        
+        # Dopełnij okno pobrań (przy budżecie czasu: zmienione dopiero, gdy brak nowych)
+        while (pending or deferred) and len(in_flight) < window:
+            was_deferred = not pending
+            listing = deferred.popleft() if was_deferred else pending.popleft()
+            if not listing.get("url"):
+                yield listing
+                continue
+            if known_index is not None and not was_deferred:
+                if "card_status" not in listing:
+                    # Tryb przyrostowy ustala status już w _stop_at_known_pages
+                    listing["card_status"] = known_index.card_status(listing)
+                if deadline is not None:
+                    deadline.observe_cards(1, listing["card_status"] != CARD_UNCHANGED)
+                if listing["card_status"] == CARD_UNCHANGED:
+                    # Ogłoszenie jest już w bazie i karta się nie zmieniła - szkoda na nie pobrania strony
+                    yield listing
+                    continue
+                if deadline is not None and listing["card_status"] == CARD_CHANGED:
+                    deadline.stats["deferred"] += 1
+                    deferred.append(listing)
+                    continue
+            future = _submit_listing_details(listing, executor, fetcher, enable_geocoding, prefer_json, controller)
+            in_flight[future] = listing
+        
+        if not in_flight:
+            if finished and not pending and not deferred:
+                break
+            continue
+        
+        # Oddawaj gotowe ogłoszenia od razu, nie czekając na resztę strony
+        done, _ = wait(list(in_flight), timeout=QUEUE_POLL_SECONDS, return_when=FIRST_COMPLETED)
+        for future in done:
+            if deadline is not None:
+                deadline.observe_completion()
+            yield _listing_from_future(future, in_flight.pop(future))
 
-def determine_market_type(text: str, url: str) -> str:
-    """Określa typ rynku (pierwotny/wtórny) na podstawie tekstu i URL"""
-    text_lower = text.lower()
-    url_lower = url.lower()
+def _submit_listing_details(listing: Dict, executor: ThreadPoolExecutor, fetcher,
+                            enable_geocoding: bool, prefer_json: bool,
+                            controller: Optional[AdaptiveConcurrencyController]) -> Future:
+    """
+    Zleca pobranie szczegółów jednego ogłoszenia
+    
+    Z silnikiem asyncio: pobranie strony w pętli zdarzeń, parsowanie surowego HTML
+    w puli procesów, a po nim przetwarzanie w executorze - etapy połączone w jeden Future.
+    """
+    if fetcher is None:
+        return executor.submit(scrape_listing_details_thread_safe, listing.copy(),
+                               enable_geocoding, prefer_json, None, controller)
+    
+    job = Future()
+    
+    def on_processed(process_future: Future):
+        try:
+            job.set_result(process_future.result())
+        except Exception as e:
+            job.set_exception(e)
+    
+    def process(parsed: Optional[Dict]):
+        executor.submit(scrape_listing_details_thread_safe, listing.copy(),
+                        enable_geocoding, prefer_json, parsed, controller).add_done_callback(on_processed)
     
-    # Słowa kluczowe dla rynku pierwotnego
-    primary_keywords = [
-        'nowe', 'nowy', 'deweloper', 'inwestycja', 'przedsprzedaż', 
+    def on_parsed(parse_future: Future):
+        try:
+            try:
+                parsed = parse_future.result()
+            except Exception as e:
+                logger.debug(f"⚠️ Błąd parsowania {listing['url']}: {e}")
+                parsed = None
+            process(parsed or {})
+        except Exception as e:
+            job.set_exception(e)
+    
+    def on_fetched(fetch_future: Future):
+        try:
+            result = fetch_future.result()
+            if controller:
+                controller.record(result.elapsed, result.status, result.error)
+            if not result.ok:
+                if result.status in GONE_STATUS_CODES:
+                    # Ogłoszenie usunięte - fallback pobrałby ponownie to samo
+                    logger.debug(f"⚠️ Ogłoszenie niedostępne {result.url} ({result.error}) - bez szczegółów")
+                    job.set_result(listing.copy())
+                    return
+                # HTTP (z ponowieniami) już zawiódł - od razu Selenium, bez powtórki ścieżki JSON
+                logger.debug(f"⚠️ Silnik asyncio nie pobrał {result.url} ({result.error}) - fallback do Selenium")
+                process({})
+                return
+            # Do procesu parsującego trafiają surowe bajty, wraca zwięzły słownik szczegółów
+            get_parse_pool().submit(parse_ad_html, result.body or result.text).add_done_callback(on_parsed)
+        except Exception as e:
+            job.set_exception(e)
+    
+    fetcher.submit(listing["url"]).add_done_callback(on_fetched)
+    return job
+
+def _listing_from_future(future, original_listing: Dict) -> Dict:
+    """Wynik zadania szczegółów lub podstawowe dane ogłoszenia przy błędzie"""
+    try:
+        return future.result(timeout=60)  # 60s timeout per listing
+    except Exception as e:
+        logger.error(f"❌ Błąd w wątku dla {original_listing.get('url', 'unknown')}: {e}")
+        # Dodaj podstawowe dane bez szczegółów
+        return original_listing
+
+# Rejestry słów kluczowych (etykieta → słowa) - kompilowane raz do jednego automatu
+CARD_FEATURE_KEYWORDS = {
+    "has_balcony": ('balkon', 'taras', 'loggia'),
+    "has_garage": ('garaż', 'parking', 'miejsce parkingowe'),
+    "has_garden": ('ogród', 'ogródek', 'działka'),
+    "has_elevator": ('winda', 'elevator', 'ascensor'),
+}
+
+# Kolejność = priorytet: rynek pierwotny wygrywa, gdy trafią oba
+MARKET_KEYWORDS = {
+    'pierwotny': (
+        'nowe', 'nowy', 'deweloper', 'inwestycja', 'przedsprzedaż',
         'nowa inwestycja', 'od developera', 'stan deweloperski',
         'pierwszy właściciel', 'pierwotny'
-    ]
-    
-    # Słowa kluczowe dla rynku wtórnego
-    secondary_keywords = [
+    ),
+    'wtórny': (
         'wtórny', 'używane', 'do remontu', 'po remoncie',
         'mieszkanie własnościowe', 'z drugiej ręki'
-    ]
-    
-    # Sprawdź rynek pierwotny
-    if any(keyword in text_lower for keyword in primary_keywords):
-        return 'pierwotny'
+    ),
+}
+
+CARD_FEATURE_MATCHER = KeywordMatcher(CARD_FEATURE_KEYWORDS)
+MARKET_MATCHER = KeywordMatcher(MARKET_KEYWORDS)
+
+def extract_boolean_features(text: str) -> Dict[str, bool]:
+    """Wydobywa cechy boolean z tekstu (balkon, garaż, ogród, winda)"""
+    found = CARD_FEATURE_MATCHER.find(text)
+    return {field: field in found for field in CARD_FEATURE_KEYWORDS}
+
+def determine_market_type(text: str, url: str) -> str:
+    """Określa typ rynku (pierwotny/wtórny) na podstawie tekstu i URL"""
+    # Domyślnie przyjmij rynek wtórny (częściej występuje)
+    return MARKET_MATCHER.first(text) or 'wtórny'
+
+def build_results_page_url(base_url: str, page: int = 1, newest_first: bool = False) -> str:
+    """
+    Buduje URL strony wyników (zachowuje parametry filtrów z base_url)
     
-    # Sprawdź rynek wtórny
-    if any(keyword in text_lower for keyword in secondary_keywords):
-        return 'wtórny'
+    Args:
+        base_url: Podstawowy URL do strony wyników (może zawierać filtry w query)
+        page: Numer strony (1 = bez parametru page)
+        newest_first: Czy dodać sortowanie od najnowszych ogłoszeń
     
-    # Domyślnie przyjmij rynek wtórny (częściej występuje)
-    return 'wtórny'
+    Returns:
+        str: URL strony wyników
+    """
+    parts = urlsplit(base_url)
+    params = dict(parse_qsl(parts.query))
+    params["viewType"] = "listing"
+    if newest_first:
+        params.update(NEWEST_FIRST_PARAMS)
+    if page > 1:
+        params["page"] = str(page)
+    else:
+        params.pop("page", None)
+    return urlunsplit(parts._replace(query=urlencode(params)))
 
-def get_otodom_listings(base_url: str = DEFAULT_BASE_URL,
-                        max_pages: Optional[int] = 0,
-                        scrape_details: bool = True,
-                        batch_size: int = 100,
-                        batch_callback: Optional[Callable[[List[Dict]], None]] = None,
-                        resume: bool = False,
-                        max_workers: int = 4,
-                        enable_geocoding: bool = True) -> List[Dict]:
+def iter_results_pages(base_url: str = DEFAULT_BASE_URL,
+                       max_pages: Optional[int] = 0,
+                       resume: bool = False,
+                       prefer_json: bool = True,
+                       newest_first: bool = False,
+                       checkpoint_file: Optional[Path] = None,
+                       start_page: Optional[int] = None,
+                       deadline: Optional[CrawlDeadline] = None) -> Iterator[Tuple[int, List[Dict]]]:
     """
-    Pobiera ogłoszenia z Otodom.pl z opcjonalnym scrapingiem szczegółów
+    Przechodzi kolejne strony wyników i zwraca podstawowe dane ogłoszeń
+    
+    Pierwsza strona podaje liczbę wyników i stron (__NEXT_DATA__ albo tekst
+    "N wyników"), więc lista stron jest znana z góry: paginacja kończy się na
+    ostatniej stronie bez sondowania dalszych, a kolejne strony JSON są
+    pobierane równolegle (okno RESULTS_FETCH_WINDOW) i oddawane po kolei.
     
     Args:
         base_url: Podstawowy URL do strony wyników
-        max_pages: (opcjonalnie) maksymalna liczba stron do przeskanowania. 
-                   Jeśli None lub <=0, scraper będzie przechodził kolejne strony 
-                   aż do wykrycia ostatniej (brak ogłoszeń lub brak przycisku "Następna strona").
-        scrape_details: Czy wchodzić w szczegóły każdego ogłoszenia
-        batch_size: Rozmiar batcha do zapisu do bazy
-        batch_callback: Funkcja do zapisu batcha do bazy
-        resume: Czy kontynuować od ostatniego punktu zapisu (domyślnie wyłączone)
-        max_workers: Liczba wątków do wielowątkowego scrapowania szczegółów (domyślnie 4)
-        enable_geocoding: Czy pobierać współrzędne geograficzne podczas scrapowania (domyślnie False)
+        max_pages: Maksymalna liczba stron (None lub <=0 = wszystkie)
+        resume: Czy kontynuować od ostatniego punktu zapisu
+        prefer_json: Czy czytać dane z osadzonego JSON __NEXT_DATA__
+        newest_first: Czy sortować wyniki od najnowszych ogłoszeń
+        checkpoint_file: Plik checkpointów (domyślnie DEFAULT_CHECKPOINT_FILE; osobny np. dla shardu)
+        start_page: Strona startowa (np. z dziennika crawlu); ma pierwszeństwo przed checkpointem
+        deadline: Budżet czasu - dostaje łączną liczbę wyników i kończy paginację, gdy
+                  zaległa praca nie zmieści się w pozostałym czasie
     
-    Returns:
-        List[Dict]: Lista ogłoszeń
+    Yields:
+        Tuple[int, List[Dict]]: Numer strony i ogłoszenia z jej kart
     """
-    listings = []
+    prefetcher = ResultsPagePrefetcher(base_url, newest_first)
+    try:
+        yield from _paginate_results(prefetcher, base_url, max_pages=max_pages, resume=resume,
+                                     prefer_json=prefer_json, newest_first=newest_first,
+                                     checkpoint_file=checkpoint_file, start_page=start_page, deadline=deadline)
+    finally:
+        prefetcher.close()
+
+class ResultsPagePrefetcher:
+    """
+    Równoległe pobieranie stron wyników JSON o znanych numerach
+    
+    Strony są zlecane w oknie RESULTS_FETCH_WINDOW przed bieżącą, a wyniki
+    odbierane po kolei - tempo wyznacza wspólny limiter hosta, a nie
+    szeregowa zależność strona po stronie.
+    """
+    
+    def __init__(self, base_url: str, newest_first: bool = False,
+                 workers: int = RESULTS_FETCH_WORKERS, window: int = RESULTS_FETCH_WINDOW):
+        self.base_url = base_url
+        self.newest_first = newest_first
+        self.workers = workers
+        self.window = window
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._futures: Dict[int, Future] = {}
     
+    def get(self, page: int, last_page: int) -> Optional[Dict]:
+        """Wynik scrape_results_page_json dla strony page (zleca też kolejne do last_page)"""
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="OtodomResults")
+        for stale in [p for p in self._futures if p < page]:
+            self._futures.pop(stale).cancel()
+        for ahead in range(page, min(page + self.window, last_page) + 1):
+            if ahead not in self._futures:
+                url = build_results_page_url(self.base_url, ahead, self.newest_first)
+                self._futures[ahead] = self._executor.submit(scrape_results_page_json, url)
+        return self._futures.pop(page).result()
+    
+    def close(self):
+        """Anuluje niepobrane strony (np. po przerwaniu paginacji)"""
+        for future in self._futures.values():
+            future.cancel()
+        self._futures.clear()
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+def _paginate_results(prefetcher: "ResultsPagePrefetcher",
+                       base_url: str = DEFAULT_BASE_URL,
+                       max_pages: Optional[int] = 0,
+                       resume: bool = False,
+                       prefer_json: bool = True,
+                       newest_first: bool = False,
+                       checkpoint_file: Optional[Path] = None,
+                       start_page: Optional[int] = None,
+                       deadline: Optional[CrawlDeadline] = None) -> Iterator[Tuple[int, List[Dict]]]:
+    """Pętla paginacji dla iter_results_pages (strony o znanych numerach przez prefetcher)"""
     # Plik z checkpointami (np. ~/.otodom_progress.json)
-    progress_file = Path.home() / ".otodom_progress.json"
+    progress_file = Path(checkpoint_file or DEFAULT_CHECKPOINT_FILE)
     if resume and progress_file.exists():
         try:
             progress_data = json.loads(progress_file.read_text(encoding="utf-8"))
@@ -205,208 +501,208 @@ def get_otodom_listings(base_url: str = DEFAULT_BASE_URL,
         progress_data = {}
 
     progress_key = base_url
-    start_page = int(progress_data.get(progress_key, 1))
+    start_page = start_page or int(progress_data.get(progress_key, 1))
 
     page = start_page
+    total_pages = None  # Znana z pierwszej strony liczba stron wyników
+    stopped_by_deadline = False
     while True:
         # Sprawdź limit jeśli podano dodatnią liczbę stron
         if max_pages is not None and max_pages > 0 and page > max_pages:
             logger.info("🏁 Osiągnięto maksymalną liczbę stron określoną przez użytkownika")
             break
-        
+    
+        if deadline is not None and deadline.paging_closed():
+            logger.info(f"⏱️ Kolejne strony nie zmieszczą się w budżecie czasu - koniec paginacji przed stroną {page}")
+            stopped_by_deadline = deadline.paging_stopped = True
+            break
+    
+        if total_pages and page > total_pages:
+            logger.info(f"🏁 Osiągnięto ostatnią stronę wyników ({total_pages})")
+            break
+    
         try:
             # Konstruuj URL z parametrami
-            if page == 1:
-                url = f"{base_url}?viewType=listing"
-            else:
-                url = f"{base_url}?viewType=listing&page={page}"
-                
+            url = build_results_page_url(base_url, page, newest_first)
+            
             logger.info(f"🏠 Scrapuję Otodom.pl - strona {page}")
             logger.info(f"🔗 URL: {url}")
+        
+            # SZYBKA ŚCIEŻKA: dane z __NEXT_DATA__ przez zwykłe HTTP (bez przeglądarki);
+            # przy znanej liczbie stron - z równoległego prefetchera
+            if prefer_json and total_pages:
+                last_page = min(total_pages, max_pages) if max_pages and max_pages > 0 else total_pages
+                search_page = prefetcher.get(page, last_page)
+            else:
+                search_page = scrape_results_page_json(url) if prefer_json else None
+        
+            if search_page is not None:
+                if search_page["total_pages"]:
+                    total_pages = search_page["total_pages"]
+                elif search_page["total_items"] and search_page["items_per_page"]:
+                    total_pages = -(-search_page["total_items"] // search_page["items_per_page"])
+                if deadline is not None:
+                    deadline.set_total_results(search_page["total_items"])
             
-            # Używamy Selenium dla Otodom
-            soup = get_soup(url, use_selenium=True)
+                if not search_page["items"]:
+                    logger.info(f"🏁 Brak ogłoszeń w danych JSON strony {page} - koniec wyników")
+                    break
             
-            # Selektory dla kontenerów ogłoszeń
-            offers = (soup.select("[data-cy='listing-item']") or 
-                     soup.select("article.css-136g1q2") or 
-                     soup.select("article") or
-                     soup.select(".listing-item"))
+                logger.info(f"📋 Znaleziono {len(search_page['items'])} ogłoszeń na stronie {page} (JSON)")
             
-            # POPRAWIONA LOGIKA WYKRYWANIA KOŃCA STRON
-            if not offers:
-                logger.warning(f"⚠️ Nie znaleziono ogłoszeń na stronie {page}")
-                
-                # Sprawdź czy strona załadowała się prawidłowo
-                if "otodom" not in soup.get_text().lower():
-                    logger.error("❌ Strona nie załadowała się prawidłowo - próbuję ponownie")
-                    # Dodaj krótkie opóźnienie i spróbuj ponownie
-                    time.sleep(5)
-                    continue
-                
-                # Sprawdź czy jest informacja o końcu wyników
-                page_text = soup.get_text().lower()
-                end_indicators = [
-                    "brak wyników",
-                    "nie znaleziono", 
-                    "koniec wyników",
-                    "strona nie istnieje",
-                    "404",
-                    "błąd"
-                ]
-                
-                if any(indicator in page_text for indicator in end_indicators):
-                    logger.info(f"🏁 Wykryto koniec wyników na stronie {page}")
-                    break
-                
-                # Sprawdź czy istnieją przyciski nawigacji
-                pagination_elements = soup.select("nav, .pagination, [data-cy*='pagination'], a[title*='następna'], a[title*='dalej']")
-                
-                if not pagination_elements:
-                    logger.info(f"🏁 Brak elementów paginacji na stronie {page} - koniec")
-                    break
+                page_listings = []
+                for i, item in enumerate(search_page["items"]):
+                    try:
+                        listing = parse_otodom_search_item(item)
+                        if listing:
+                            listing["source"] = "otodom.pl"
+                            listing["source_page"] = page
+                            listing["source_position"] = i + 1
+                            page_listings.append(listing)
+                    except Exception as e:
+                        logger.error(f"❌ Błąd mapowania ogłoszenia JSON {i+1}: {e}")
+            else:
+                # FALLBACK: Selenium + parsowanie DOM
+                soup = get_soup(url, use_selenium=True)
+        
+                # Selektory dla kontenerów ogłoszeń
+                offers = (soup.select("[data-cy='listing-item']") or 
+                         soup.select("article.css-136g1q2") or 
+                         soup.select("article") or
+                         soup.select(".listing-item"))
                 
-                # Jeśli nie ma wyraźnych wskaźników końca, spróbuj jeszcze kilka stron
-                if page <= 5:  # Dla pierwszych 5 stron - może być przejściowy błąd
-                    logger.warning(f"⚠️ Strona {page} pusta, ale kontynuuję (może być przejściowy błąd)")
-                    page += 1
-                    continue
-                else:
-                    logger.info(f"🏁 Brak ogłoszeń na stronie {page} - prawdopodobnie koniec wyników")
-                    break
+                # Liczba stron z tekstu "N wyników" - koniec bez sondowania stron za ostatnią
+                if not total_pages and offers:
+                    total_results = parse_total_results(soup.get_text())
+                    if total_results:
+                        total_pages = -(-total_results // RESULTS_PER_PAGE)
+                        logger.info(f"📊 {total_results} wyników - {total_pages} stron")
+                        if deadline is not None:
+                            deadline.set_total_results(total_results)
+        
+                # POPRAWIONA LOGIKA WYKRYWANIA KOŃCA STRON
+                if not offers:
+                    logger.warning(f"⚠️ Nie znaleziono ogłoszeń na stronie {page}")
             
-            logger.info(f"📋 Znaleziono {len(offers)} ogłoszeń na stronie {page}")
+                    # Sprawdź czy strona załadowała się prawidłowo
+                    if "otodom" not in soup.get_text().lower():
+                        logger.error("❌ Strona nie załadowała się prawidłowo - próbuję ponownie")
+                        # Wstrzymaj host na chwilę i spróbuj ponownie
+                        get_rate_limiter().bucket(url).penalize(ERROR_BACKOFF_SECONDS)
+                        continue
             
-            # Dodaj sprawdzenie czy liczba ogłoszeń znacznie spadła
-            if page > 3 and len(offers) < 10:  # Jeśli po 3 stronie mniej niż 10 ogłoszeń
-                logger.warning(f"⚠️ Znaczny spadek liczby ogłoszeń na stronie {page} ({len(offers)})")
-                
-                # Sprawdź czy to rzeczywiście koniec
-                total_items_text = soup.get_text()
-                if "wynik" in total_items_text.lower():
-                    # Spróbuj wyciągnąć informację o łącznej liczbie wyników
-                    import re
-                    matches = re.findall(r'(\d+)\s*wynik', total_items_text.lower())
-                    if matches:
-                        total_results = int(matches[0])
-                        expected_pages = (total_results // 24) + 1
-                        logger.info(f"📊 Znaleziono informację o {total_results} wynikach, oczekiwane strony: {expected_pages}")
-                        
-                        if page > expected_pages:
-                            logger.info(f"🏁 Przekroczono oczekiwaną liczbę stron ({page} > {expected_pages})")
-                            break
+                    # Sprawdź czy jest informacja o końcu wyników
+                    page_text = soup.get_text().lower()
+                    end_indicators = [
+                        "brak wyników",
+                        "nie znaleziono", 
+                        "koniec wyników",
+                        "strona nie istnieje",
+                        "404",
+                        "błąd"
+                    ]
             
-            # KROK 1: Sparsuj wszystkie podstawowe dane z tej strony
-            page_listings = []
-            for i, offer in enumerate(offers):
-                try:
-                    listing = parse_otodom_listing(offer)
-                    if listing:
-                        listing["source"] = "otodom.pl"
-                        listing["source_page"] = page
-                        listing["source_position"] = i + 1
-                        page_listings.append(listing)
-                        logger.debug(f"✅ Parsowano podstawowe dane {i+1}: {listing.get('title_raw', '')[:30]}...")
-                except Exception as e:
-                    logger.error(f"❌ Błąd parsowania podstawowych danych ogłoszenia {i+1}: {e}")
+                    if any(indicator in page_text for indicator in end_indicators):
+                        logger.info(f"🏁 Wykryto koniec wyników na stronie {page}")
+                        break
             
-            # KROK 2: Jeśli scrape_details=True, pobierz szczegóły WIELOWĄTKOWO
-            if scrape_details and page_listings:
-                geocoding_status = "z geocodingiem ✅" if enable_geocoding and GEOCODING_AVAILABLE else "bez geocodingu ⚠️"
-                logger.info(f"🚀 Rozpoczynam wielowątkowe pobieranie szczegółów dla {len(page_listings)} ogłoszeń ({max_workers} wątków, {geocoding_status})")
-                
-                # Ustaw licznik postępu
-                with _progress_lock:
-                    _progress_counter["current"] = 0
-                    _progress_counter["total"] = len(page_listings)
-                
-                # Użyj ThreadPoolExecutor z konfigurowalną liczbą wątków
-                with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="OtodomScraper") as executor:
-                    # Wyślij wszystkie zadania
-                    future_to_listing = {
-                        executor.submit(scrape_listing_details_thread_safe, listing.copy(), enable_geocoding): listing 
-                        for listing in page_listings
-                    }
-                    
-                    # Zbierz wyniki w miarę ich gotowości
-                    completed_listings = []
-                    for future in as_completed(future_to_listing):
-                        try:
-                            completed_listing = future.result(timeout=60)  # 60s timeout per listing
-                            completed_listings.append(completed_listing)
-                        except Exception as e:
-                            original_listing = future_to_listing[future]
-                            logger.error(f"❌ Błąd w wątku dla {original_listing.get('url', 'unknown')}: {e}")
-                            # Dodaj podstawowe dane bez szczegółów
-                            completed_listings.append(original_listing)
-                
-                # Zastąp podstawowe listingi uzupełnionymi
-                page_listings = completed_listings
-                logger.info(f"✅ Zakończono wielowątkowe pobieranie szczegółów dla strony {page}")
+                    # Sprawdź czy istnieją przyciski nawigacji
+                    pagination_elements = soup.select("nav, .pagination, [data-cy*='pagination'], a[title*='następna'], a[title*='dalej']")
             
-            # KROK 3: Dodaj do głównej listy i obsłuż batche
-            for listing in page_listings:
-                listings.append(listing)
-                
-                # Batch zapisu
-                if batch_size and len(listings) >= batch_size and batch_callback:
-                    logger.info("💾 Osiągnięto wielkość batcha – zapisuję do bazy…")
-                    try:
-                        batch_callback(listings)
-                    finally:
-                        listings.clear()
+                    if not pagination_elements:
+                        logger.info(f"🏁 Brak elementów paginacji na stronie {page} - koniec")
+                        break
             
-            random_delay()
+                    # Jeśli nie ma wyraźnych wskaźników końca, spróbuj jeszcze kilka stron
+                    if page <= 5:  # Dla pierwszych 5 stron - może być przejściowy błąd
+                        logger.warning(f"⚠️ Strona {page} pusta, ale kontynuuję (może być przejściowy błąd)")
+                        page += 1
+                        continue
+                    else:
+                        logger.info(f"🏁 Brak ogłoszeń na stronie {page} - prawdopodobnie koniec wyników")
+                        break
+        
+                logger.info(f"📋 Znaleziono {len(offers)} ogłoszeń na stronie {page}")
+        
+                # Dodaj sprawdzenie czy liczba ogłoszeń znacznie spadła
+                if page > 3 and len(offers) < 10:  # Jeśli po 3 stronie mniej niż 10 ogłoszeń
+                    logger.warning(f"⚠️ Znaczny spadek liczby ogłoszeń na stronie {page} ({len(offers)})")
             
+                    # Sprawdź czy to rzeczywiście koniec
+                    total_items_text = soup.get_text()
+                    if "wynik" in total_items_text.lower():
+                        # Spróbuj wyciągnąć informację o łącznej liczbie wyników
+                        total_results = parse_total_results(total_items_text)
+                        if total_results:
+                            expected_pages = (total_results // RESULTS_PER_PAGE) + 1
+                            logger.info(f"📊 Znaleziono informację o {total_results} wynikach, oczekiwane strony: {expected_pages}")
+                    
+                            if page > expected_pages:
+                                logger.info(f"🏁 Przekroczono oczekiwaną liczbę stron ({page} > {expected_pages})")
+                                break
+        
+                # KROK 1: Sparsuj wszystkie podstawowe dane z tej strony
+                page_listings = []
+                for i, offer in enumerate(offers):
+                    try:
+                        listing = parse_otodom_listing(offer)
+                        if listing:
+                            listing["source"] = "otodom.pl"
+                            listing["source_page"] = page
+                            listing["source_position"] = i + 1
+                            page_listings.append(listing)
+                            logger.debug(f"✅ Parsowano podstawowe dane {i+1}: {listing.get('title_raw', '')[:30]}...")
+                    except Exception as e:
+                        logger.error(f"❌ Błąd parsowania podstawowych danych ogłoszenia {i+1}: {e}")
+        
+            # KROK 2: Oddaj stronę konsumentowi (przy pełnej kolejce producent czeka)
+            yield page, page_listings
+        
             # Jeśli nie znaleziono żadnych ofert na kolejnej stronie, zakończ pętlę
             # (sprawdzenie będzie wykonane na początku kolejnej iteracji)
 
         except Exception as e:
             logger.error(f"❌ Błąd pobierania strony {page}: {e}")
-            
+        
             # LEPSZA OBSŁUGA BŁĘDÓW
             error_msg = str(e).lower()
-            
+        
             # Sprawdź czy to błąd tymczasowy
             temporary_errors = [
                 "timeout", "connection", "network", "ssl", "http",
                 "502", "503", "504", "connection reset", "connection refused"
             ]
-            
+        
             if any(temp_error in error_msg for temp_error in temporary_errors):
-                logger.warning(f"⚠️ Błąd tymczasowy na stronie {page}, czekam 10 sekund i próbuję ponownie...")
-                time.sleep(10)
+                logger.warning(f"⚠️ Błąd tymczasowy na stronie {page}, wstrzymuję host na {TEMPORARY_ERROR_BACKOFF_SECONDS}s i próbuję ponownie...")
+                get_rate_limiter().bucket(base_url).penalize(TEMPORARY_ERROR_BACKOFF_SECONDS)
                 continue
-            
+        
             # Sprawdź czy to błąd blokady (anti-bot)
-            blocking_errors = [
-                "403", "forbidden", "blocked", "bot", "robot", "captcha"
-            ]
-            
-            if any(block_error in error_msg for block_error in blocking_errors):
+            if is_blocking_signal(error_msg):
                 logger.error(f"🚫 Prawdopodobna blokada anti-bot na stronie {page}")
                 logger.info("💡 Sugestia: Zwiększ opóźnienia między żądaniami lub użyj proxy")
                 break
-            
+        
             # Dla innych błędów - przejdź do następnej strony ale nie przerywaj całkowicie
             logger.warning(f"⚠️ Pomijam stronę {page} z powodu błędu: {e}")
-            
+        
             # Jeśli jest zbyt wiele błędów pod rząd, przerwij
-            if not hasattr(get_otodom_listings, 'consecutive_errors'):
+            if not hasattr(iter_results_pages, 'consecutive_errors'):
                 consecutive_errors = 0
             else:
-                consecutive_errors = getattr(get_otodom_listings, 'consecutive_errors', 0)
-                
-            consecutive_errors += 1
-            setattr(get_otodom_listings, 'consecutive_errors', consecutive_errors)
+                consecutive_errors = getattr(iter_results_pages, 'consecutive_errors', 0)
             
+            consecutive_errors += 1
+            setattr(iter_results_pages, 'consecutive_errors', consecutive_errors)
+        
             if consecutive_errors >= 3:
                 logger.error(f"❌ Zbyt wiele błędów pod rząd ({consecutive_errors}), przerywam")
                 break
-                
-            # Opóźnienie po błędzie
-            time.sleep(5)
             
+            # Opóźnienie po błędzie (dotyczy wszystkich wątków pobierających z hosta)
+            get_rate_limiter().bucket(base_url).penalize(ERROR_BACKOFF_SECONDS)
+        
         # Zapisz progres
         if resume:
             progress_data[progress_key] = page
@@ -416,18 +712,283 @@ def get_otodom_listings(base_url: str = DEFAULT_BASE_URL,
                 logger.warning(f"⚠️ Nie udało się zapisać checkpointu: {e}")
 
         page += 1
-
-    # Resetuj checkpoint po zakończeniu
-    if resume and progress_key in progress_data:
+    
+    # Resetuj checkpoint po zakończeniu (tylko gdy crawl doszedł do końca)
+    if resume and progress_key in progress_data and not stopped_by_deadline:
         progress_data.pop(progress_key, None)
         try:
             progress_file.write_text(json.dumps(progress_data, ensure_ascii=False), encoding="utf-8")
         except Exception:
             pass
 
+def parse_total_results(text: str) -> Optional[int]:
+    """Łączna liczba wyników z tekstu strony ("... 12 345 wyników ...")"""
+    matches = TOTAL_RESULTS_PATTERN.findall(text.lower())
+    return int(re.sub(r"\D", "", matches[0])) if matches else None
+
+def iter_otodom_listings(base_url: str = DEFAULT_BASE_URL,
+                         max_pages: Optional[int] = 0,
+                         scrape_details: bool = True,
+                         resume: bool = False,
+                         max_workers: int = 4,
+                         enable_geocoding: bool = True,
+                         prefer_json: bool = True,
+                         adaptive_concurrency: bool = True,
+                         incremental: bool = False,
+                         stop_after_known_pages: int = INCREMENTAL_STOP_AFTER_KNOWN_PAGES,
+                         known_index: Optional[KnownListingIndex] = None,
+                         checkpoint_file: Optional[Path] = None,
+                         journal: Optional[CrawlJournal] = None,
+                         deadline: Optional[CrawlDeadline] = None) -> Iterator[Dict]:
+    """
+    Strumieniowo pobiera ogłoszenia z Otodom.pl z opcjonalnym scrapingiem szczegółów
+    
+    Ogłoszenia są zwracane od razu po uzupełnieniu, więc konsument (np. zapis
+    do bazy) może je przetwarzać w stałej pamięci. Strony wyników pobiera
+    osobny wątek producenta, więc paginacja wyprzedza szczegóły i pula nie
+    opróżnia się na końcu każdej strony. Przerwanie iteracji (close() / break)
+    zamyka wątki scrapowania.
+    
+    Args:
+        base_url: Podstawowy URL do strony wyników
+        max_pages: (opcjonalnie) maksymalna liczba stron do przeskanowania. 
+                   Jeśli None lub <=0, scraper będzie przechodził kolejne strony 
+                   aż do wykrycia ostatniej (brak ogłoszeń lub brak przycisku "Następna strona").
+        scrape_details: Czy wchodzić w szczegóły każdego ogłoszenia
+        resume: Czy kontynuować od ostatniego punktu zapisu (domyślnie wyłączone)
+        max_workers: Liczba wątków do wielowątkowego scrapowania szczegółów (domyślnie 4;
+                     przy adaptive_concurrency - wartość początkowa)
+        enable_geocoding: Czy pobierać współrzędne geograficzne podczas scrapowania
+        prefer_json: Czy czytać dane z osadzonego JSON __NEXT_DATA__ przez zwykłe HTTP
+                     (Selenium + parsowanie DOM tylko jako fallback)
+        adaptive_concurrency: Czy dostrajać współbieżność szczegółów w trakcie przebiegu (AIMD)
+        incremental: Crawl przyrostowy - wyniki od najnowszych, a paginacja kończy się
+                     po stop_after_known_pages stronach samych znanych, niezmienionych ogłoszeń
+        stop_after_known_pages: Liczba kolejnych w pełni znanych stron kończąca crawl przyrostowy
+        known_index: Indeks ogłoszeń już zapisanych w bazie (domyślnie globalny, zob. load_known_index)
+        checkpoint_file: Plik checkpointów przy resume (domyślnie ~/.otodom_progress.json)
+        journal: Dziennik crawlu - najpierw zwracane są ogłoszenia pobrane przed awarią, a crawl
+                 rusza od pierwszej niedokończonej strony bez ukończonych już ogłoszeń. Każde
+                 zwrócone ogłoszenie trafia do dziennika; konsument potwierdza zapis do bazy
+                 przez journal.record_flush()
+        deadline: Budżet czasu (--deadline) - paginacja kończy się, gdy zaległa praca nie
+                  zmieści się w budżecie, nowe ogłoszenia mają pierwszeństwo przed zmienionymi,
+                  a po wyczerpaniu budżetu potok jest tylko opróżniany
+    
+    Yields:
+        Dict: Kolejne ogłoszenia
+    """
+    # Jedna przeglądarka z puli na każdy wątek scrapowania szczegółów
+    configure_driver_pool(size=max_workers)
+    
+    known_index = known_index if known_index is not None else get_known_index()
+    
+    if journal is not None:
+        # Pobrane przed awarią, niezapisane - wracają do zapisu bez ponownego pobierania
+        yield from journal.pending_listings()
+    
+    pages = iter_results_pages(base_url, max_pages=max_pages, resume=resume, prefer_json=prefer_json,
+                               newest_first=incremental, checkpoint_file=checkpoint_file,
+                               start_page=journal.resume_page() if journal is not None else None,
+                               deadline=deadline)
+    if incremental:
+        pages = _stop_at_known_pages(pages, known_index, stop_after_known_pages=stop_after_known_pages)
+    if journal is not None:
+        pages = journal.filter_pages(pages)
+    if not scrape_details:
+        for _, page_listings in pages:
+            for listing in page_listings:
+                if "card_status" not in listing:
+                    listing["card_status"] = known_index.card_status(listing)
+                if journal is not None:
+                    journal.record_listing(listing)
+                if deadline is not None:
+                    deadline.observe_cards(1, 0)
+                    deadline.observe_completion()
+                yield listing
+        _keep_journal_after_deadline(journal, deadline)
+        return
+    
+    # Kontroler AIMD: startuje od max_workers i sam szuka najszybszego bezpiecznego tempa.
+    # Pula przeglądarek podąża za bieżącym limitem.
+    max_limit = max(MAX_CONCURRENCY, max_workers) if adaptive_concurrency else max_workers
+    controller = AdaptiveConcurrencyController(
+        initial=max_workers,
+        min_limit=1 if adaptive_concurrency else max_workers,
+        max_limit=max_limit,
+        on_change=lambda limit: configure_driver_pool(size=limit)
+    )
+    
+    with _progress_lock:
+        _progress_counter["current"] = 0
+        _progress_counter["total"] = 0
+    
+    geocoding_status = "z geocodingiem ✅" if enable_geocoding and GEOCODING_AVAILABLE else "bez geocodingu ⚠️"
+    logger.info(f"🚀 Potokowe pobieranie szczegółów (współbieżność startowa {controller.limit}, {geocoding_status})")
+    
+    # Producent stron wyników działa w osobnym wątku i wyprzedza pobieranie szczegółów
+    # najwyżej o RESULTS_PREFETCH_PAGES stron (ograniczona kolejka = backpressure)
+    page_queue = queue.Queue(maxsize=RESULTS_PREFETCH_PAGES)
+    stop_event = threading.Event()
+    producer = threading.Thread(target=_produce_results_pages, args=(pages, page_queue, stop_event),
+                                name="OtodomPages", daemon=True)
+    
+    # Wątki przetwarzania szczegółów - jedna pula na cały przebieg, nie na stronę
+    detail_executor = ThreadPoolExecutor(max_workers=max_limit, thread_name_prefix="OtodomScraper")
+    producer.start()
+    try:
+        for listing in stream_listing_details(page_queue, detail_executor, enable_geocoding, prefer_json,
+                                              controller, known_index, deadline):
+            if journal is not None:
+                journal.record_listing(listing)
+            yield listing
+    finally:
+        stop_event.set()
+        producer.join()
+        detail_executor.shutdown(wait=True)
+        logger.info(f"📊 Współbieżność szczegółów: końcowa {controller.limit}, szczyt {controller.stats['peak']} "
+                    f"({controller.stats['increases']} wzrostów, {controller.stats['decreases']} redukcji)")
+        if len(known_index):
+            logger.info(f"🗂️ Indeks znanych ogłoszeń: {known_index.stats['hits']} trafień, "
+                        f"{known_index.stats['misses']} nowych")
+        _keep_journal_after_deadline(journal, deadline)
+
+def _keep_journal_after_deadline(journal: Optional[CrawlJournal], deadline: Optional[CrawlDeadline]):
+    """Crawl przerwany budżetem czasu nie jest zakończony - dziennik zostaje do wznowienia"""
+    if deadline is None:
+        return
+    deadline.log_forecast()
+    if journal is not None and (deadline.paging_stopped or deadline.stats["dropped"]):
+        journal.completed = False
+
+def _stop_at_known_pages(pages: Iterator[Tuple[int, List[Dict]]], known_index: KnownListingIndex,
+                         stop_after_known_pages: int = INCREMENTAL_STOP_AFTER_KNOWN_PAGES
+                         ) -> Iterator[Tuple[int, List[Dict]]]:
+    """
+    Crawl przyrostowy: kończy paginację po stop_after_known_pages kolejnych stronach
+    samych znanych, niezmienionych ogłoszeń. Ich karty przechodzą dalej bez pobierania
+    szczegółów - w bazie dostają tylko znacznik last_seen.
+    """
+    known_pages = 0
+    unchanged_total = 0
+    try:
+        for page, page_listings in pages:
+            for listing in page_listings:
+                listing["card_status"] = known_index.card_status(listing)
+            unchanged = sum(listing["card_status"] == CARD_UNCHANGED for listing in page_listings)
+            unchanged_total += unchanged
+            
+            if page_listings and unchanged == len(page_listings):
+                known_pages += 1
+                logger.info(f"⏭️ Strona {page}: wszystkie ogłoszenia już w bazie ({known_pages}/{stop_after_known_pages})")
+            else:
+                known_pages = 0
+                if page_listings:
+                    logger.info(f"🆕 Strona {page}: {len(page_listings) - unchanged} nowych lub zmienionych ogłoszeń "
+                                f"(niezmienionych: {unchanged})")
+            
+            yield page, page_listings
+            
+            if known_pages >= stop_after_known_pages:
+                logger.info(f"🏁 Crawl przyrostowy: {known_pages} stron pod rząd bez nowych ogłoszeń - koniec")
+                break
+    finally:
+        pages.close()
+        logger.info(f"⏭️ Crawl przyrostowy: {unchanged_total} niezmienionych ogłoszeń bez pobierania szczegółów")
+
+def _produce_results_pages(pages: Iterator[Tuple[int, List[Dict]]], page_queue: queue.Queue,
+                           stop_event: threading.Event):
+    """Wątek producenta: wkłada strony wyników do kolejki, na końcu znacznik END_OF_PAGES"""
+    try:
+        for page, page_listings in pages:
+            with _progress_lock:
+                _progress_counter["total"] += len(page_listings)
+            while not stop_event.is_set():
+                try:
+                    page_queue.put(page_listings, timeout=QUEUE_POLL_SECONDS)
+                    break
+                except queue.Full:
+                    continue
+            if stop_event.is_set():
+                pages.close()
+                return
+    except Exception as e:
+        logger.error(f"❌ Błąd producenta stron wyników: {e}")
+    finally:
+        # Konsument czeka na znacznik końca - wkładamy go nawet po błędzie
+        while not stop_event.is_set():
+            try:
+                page_queue.put(END_OF_PAGES, timeout=QUEUE_POLL_SECONDS)
+                break
+            except queue.Full:
+                continue
+
+def get_otodom_listings(base_url: str = DEFAULT_BASE_URL,
+                        max_pages: Optional[int] = 0,
+                        scrape_details: bool = True,
+                        batch_size: int = 100,
+                        batch_callback: Optional[Callable[[List[Dict]], None]] = None,
+                        resume: bool = False,
+                        max_workers: int = 4,
+                        enable_geocoding: bool = True,
+                        prefer_json: bool = True,
+                        adaptive_concurrency: bool = True,
+                        incremental: bool = False) -> List[Dict]:
+    """
+    Pobiera ogłoszenia z Otodom.pl z opcjonalnym scrapingiem szczegółów
+    
+    Nakładka na iter_otodom_listings zbierająca ogłoszenia do listy.
+    
+    Args:
+        base_url: Podstawowy URL do strony wyników
+        max_pages: Maksymalna liczba stron (None lub <=0 = wszystkie)
+        scrape_details: Czy wchodzić w szczegóły każdego ogłoszenia
+        batch_size: Rozmiar batcha do zapisu do bazy
+        batch_callback: Funkcja do zapisu batcha do bazy (zapisane ogłoszenia nie zostają na liście)
+        resume: Czy kontynuować od ostatniego punktu zapisu (domyślnie wyłączone)
+        max_workers: Początkowa liczba wątków scrapowania szczegółów (domyślnie 4)
+        enable_geocoding: Czy pobierać współrzędne geograficzne podczas scrapowania
+        prefer_json: Czy czytać dane z osadzonego JSON __NEXT_DATA__
+        adaptive_concurrency: Czy dostrajać współbieżność szczegółów w trakcie przebiegu (AIMD)
+        incremental: Crawl przyrostowy - tylko nowe ogłoszenia (od najnowszych)
+    
+    Returns:
+        List[Dict]: Lista ogłoszeń
+    """
+    listings = []
+    
+    for listing in iter_otodom_listings(base_url=base_url,
+                                        max_pages=max_pages,
+                                        scrape_details=scrape_details,
+                                        resume=resume,
+                                        max_workers=max_workers,
+                                        enable_geocoding=enable_geocoding,
+                                        prefer_json=prefer_json,
+                                        adaptive_concurrency=adaptive_concurrency,
+                                        incremental=incremental):
+        listings.append(listing)
+        
+        # Batch zapisu
+        if batch_size and len(listings) >= batch_size and batch_callback:
+            logger.info("💾 Osiągnięto wielkość batcha – zapisuję do bazy…")
+            try:
+                batch_callback(listings)
+            finally:
+                listings.clear()
+    
     logger.info(f"✅ Pobrano ŁĄCZNIE {len(listings)} ogłoszeń z Otodom.pl")
     return listings
 
+# Selektory pól karty wyników (kolejność = priorytet; martwe spadają na koniec łańcucha)
+CARD_TITLE_SELECTORS = selector_chain("card.title", ["[data-cy='listing-item-title']", "p.css-u3orbr", "h3", "h2"])
+CARD_PRICE_SELECTORS = selector_chain("card.price", ["span.css-2bt9f1", "[data-sentry-element='Content']",
+                                                     "[data-cy*='price']"])
+CARD_LOCATION_SELECTORS = selector_chain("card.location", ["p.css-42r2ms", "[data-sentry-element='StyledParagraph']",
+                                                           "[data-cy='listing-item-location']"])
+CARD_LINK_SELECTORS = selector_chain("card.link", ["[data-cy='listing-item-link']", "a[href*='/oferta/']", "a"])
+CARD_SPECS_SELECTORS = selector_chain("card.specs", ["dl.css-9q2yy4"])
+CARD_AREA_SELECTORS = selector_chain("card.area", ["span:-soup-contains('m²')"])
+
 def parse_otodom_listing(offer_element) -> Dict:
     """
     Parsuje pojedyncze ogłoszenie z Otodom.pl zgodnie z nową strukturą bazy
@@ -439,29 +1000,20 @@ def parse_otodom_listing(offer_element) -> Dict:
         Dict: Dane ogłoszenia zgodne z nową strukturą bazy
     """
     # TYTUŁ (title_raw)
-    title_elem = (offer_element.select_one("[data-cy='listing-item-title']") or
-                  offer_element.select_one("p.css-u3orbr") or
-                  offer_element.select_one("h3") or
-                  offer_element.select_one("h2"))
+    title_elem = CARD_TITLE_SELECTORS.select_one(offer_element)
     title_raw = clean_text(title_elem.get_text()) if title_elem else ""
     
     # CENA
-    price_elem = (offer_element.select_one("span.css-2bt9f1") or
-                  offer_element.select_one("[data-sentry-element='Content']") or
-                  offer_element.select_one("[data-cy*='price']"))
+    price_elem = CARD_PRICE_SELECTORS.select_one(offer_element)
     price_text = clean_text(price_elem.get_text()) if price_elem else ""
     price_data = extract_price(price_text)
     
     # LOKALIZACJA (address_raw)
-    location_elem = (offer_element.select_one("p.css-42r2ms") or
-                     offer_element.select_one("[data-sentry-element='StyledParagraph']") or
-                     offer_element.select_one("[data-cy='listing-item-location']"))
+    location_elem = CARD_LOCATION_SELECTORS.select_one(offer_element)
     address_raw = clean_text(location_elem.get_text()) if location_elem else ""
     
     # LINK (URL)
-    link_elem = (offer_element.select_one("[data-cy='listing-item-link']") or
-                 offer_element.select_one("a[href*='/oferta/']") or
-                 offer_element.select_one("a"))
+    link_elem = CARD_LINK_SELECTORS.select_one(offer_element)
     url = link_elem.get("href") if link_elem else ""
     if url and not url.startswith("http"):
         url = f"https://www.otodom.pl{url}"
@@ -470,7 +1022,7 @@ def parse_otodom_listing(offer_element) -> Dict:
     area_value = None
     rooms_value = None
     
-    specs_list = offer_element.select_one("dl.css-9q2yy4")
+    specs_list = CARD_SPECS_SELECTORS.select_one(offer_element)
     if specs_list:
         dt_elements = specs_list.select("dt")
         dd_elements = specs_list.select("dd")
@@ -487,13 +1039,52 @@ def parse_otodom_listing(offer_element) -> Dict:
     
     # Fallback dla powierzchni
     if not area_value:
-        area_elem = offer_element.select_one("span:contains('m²')")
+        area_elem = CARD_AREA_SELECTORS.select_one(offer_element)
         if area_elem:
             area_value = extract_numeric_value(area_elem.get_text())
     
     # DODATKOWE SZCZEGÓŁY z sekcji AdDetails
     additional_details = extract_detailed_features(offer_element)
     
+    return build_listing_record(title_raw, address_raw, url, price_data["price"],
+                                area_value, rooms_value, additional_details)
+
+def parse_otodom_search_item(item: Dict) -> Optional[Dict]:
+    """
+    Buduje ogłoszenie z wpisu wyników wyszukiwania w __NEXT_DATA__
+    (odpowiednik parse_otodom_listing dla szybkiej ścieżki JSON)
+    
+    Args:
+        item: Surowy wpis z props.pageProps.data.searchAds.items
+    
+    Returns:
+        Dict: Dane ogłoszenia zgodne z nową strukturą bazy
+    """
+    card = map_search_item(item)
+    if not card:
+        return None
+    
+    listing = build_listing_record(card["title_raw"], card["address_raw"], card["url"],
+                                   card["price"], card["area"], card["rooms"])
+    if listing:
+        listing["listing_id"] = card["listing_id"]
+        listing["listing_date"] = card["listing_date"]
+        if card["floor"] is not None:
+            listing["floor"] = card["floor"]
+    return listing
+
+def build_listing_record(title_raw: str, address_raw: str, url: str, price: Optional[float],
+                         area_value: Optional[float], rooms_value: Optional[float],
+                         additional_details: Optional[Dict] = None) -> Optional[Listing]:
+    """
+    Składa rekord ogłoszenia z podstawowych pól karty (wspólne dla DOM i JSON)
+    
+    Returns:
+        Listing: Dane ogłoszenia zgodne z nową strukturą bazy lub None bez tytułu i URL
+    """
+    if additional_details is None:
+        additional_details = {'boolean_features': {}, 'market': None}
+    
     # Sprawdź czy mamy podstawowe dane
     if not title_raw and not url:
         return None
@@ -521,8 +1112,8 @@ def parse_otodom_listing(offer_element) -> Dict:
     city = address_components.get("city")
     province = address_components.get("province")
     
-    # Struktura danych zgodna z nową bazą danych
-    listing = {
+    # Struktura danych zgodna z nową bazą danych (wartości normalizowane raz, w rekordzie)
+    listing = Listing({
         # Podstawowe informacje
         "url": url,
         "listing_id": None,  # Będzie uzupełnione ze szczegółów
@@ -530,7 +1121,7 @@ def parse_otodom_listing(offer_element) -> Dict:
         "address_raw": address_raw,
         
         # Cena i powierzchnia
-        "price": price_data["price"],
+        "price": price,
         "area": area_value,
         "rooms": int(rooms_value) if rooms_value and rooms_value > 0 else None,
         
@@ -568,7 +1159,10 @@ def parse_otodom_listing(offer_element) -> Dict:
         
         # Metadane
         "source": "otodom.pl"
-    }
+    })
+    
+    # Odcisk pól karty - szczegóły znanych ogłoszeń pobieramy ponownie tylko po jego zmianie
+    listing["card_fingerprint"] = card_fingerprint(listing)
     
     return listing
 
@@ -603,273 +1197,129 @@ def extract_detailed_features(offer_element) -> Dict:
     }
     
     # Szukaj sekcji szczegółów
-    details_container = offer_element.select_one('[data-sentry-component="AdDetailsBase"]')
+    details_container = offer_element.select_one(DETAILS_CONTAINER_SELECTOR)
     if not details_container:
         return result
     
-    # Wszystkie pary klucz-wartość z sekcji szczegółów
-    item_containers = details_container.select('[data-sentry-source-file="AdDetailItem.tsx"].css-1xw0jqp')
+    # Jedno przejście po sekcji - wspólna tabela pól z parserem stron ogłoszeń
+    details = extract_ad_details(details_container)
+    for field, value in details.items():
+        if field in result['boolean_features']:
+            result['boolean_features'][field] = value
+        elif field in result:
+            result[field] = value
     
-    for container in item_containers:
-        # Znajdź etykietę i wartość
-        label_elem = container.select_one('p.esen0m92.css-1airkmu:first-child')
-        value_elem = container.select_one('p.esen0m92.css-1airkmu:nth-child(2), p.esen0m92.css-wcoypf')
-        
-        if not label_elem or not value_elem:
+    return result
+
+def scrape_results_page(url: str, page: int, prefer_json: bool = True) -> Tuple[List[Dict], Optional[int]]:
+    """
+    Pobiera pojedynczą stronę wyników (dla workerów kolejki - bez logiki paginacji)
+    
+    Args:
+        url: URL strony wyników
+        page: Numer strony (do pól source_page)
+        prefer_json: Czy czytać dane z osadzonego JSON __NEXT_DATA__
+    
+    Returns:
+        Tuple[List[Dict], Optional[int]]: Ogłoszenia z kart i liczba stron wyników (jeśli znana)
+    
+    Raises:
+        RuntimeError: Strona nie zawiera ani danych JSON, ani kart ogłoszeń
+    """
+    search_page = scrape_results_page_json(url) if prefer_json else None
+    if search_page is not None:
+        cards, parse_card = search_page["items"], parse_otodom_search_item
+        total_pages = search_page["total_pages"]
+    else:
+        soup = get_soup(url, use_selenium=True)
+        offers = soup.select("[data-cy='listing-item']") or soup.select("article")
+        if not offers and "otodom" not in soup.get_text().lower():
+            raise RuntimeError(f"Strona wyników nie załadowała się prawidłowo: {url}")
+        cards, parse_card = offers, parse_otodom_listing
+        # Liczba stron z tekstu "N wyników" (jak w iter_otodom_listings)
+        total_results = parse_total_results(soup.get_text()) if offers else None
+        total_pages = -(-total_results // RESULTS_PER_PAGE) if total_results else None
+    
+    page_listings = []
+    for i, card in enumerate(cards):
+        try:
+            listing = parse_card(card)
+        except Exception as e:
+            logger.error(f"❌ Błąd parsowania ogłoszenia {i+1} na stronie {page}: {e}")
             continue
-            
-        label = clean_text(label_elem.get_text()).lower()
-        value = clean_text(value_elem.get_text()).lower()
-        
-        # Mapowanie pól
-        if 'powierzchnia' in label:
-            # Już obsługiwane w głównej funkcji
-            pass
-        elif 'liczba pokoi' in label:
-            # Już obsługiwane w głównej funkcji
-            pass
-        elif 'piętro' in label:
-            # Format: "3/4" -> floor=3, total_floors=4
-            if '/' in value:
-                parts = value.split('/')
-                try:
-                    result['floor'] = int(parts[0].strip())
-                    result['total_floors'] = int(parts[1].strip())
-                except (ValueError, IndexError):
-                    pass
-        elif 'rok budowy' in label:
-            try:
-                year = int(value.strip())
-                if 1800 <= year <= 2030:  # Walidacja rozsądnych lat
-                    result['year_of_construction'] = year
-            except ValueError:
-                pass
-        elif 'winda' in label:
-            result['boolean_features']['has_elevator'] = 'tak' in value or 'yes' in value
-        elif 'rodzaj zabudowy' in label:
-            # blok, kamienica, dom wolnostojący, itp.
-            result['building_type'] = value
-        elif 'stan wykończenia' in label:
-            result['standard_of_finish'] = value
-        elif 'ogrzewanie' in label:
-            result['heating_type'] = value
-        elif 'czynsz' in label:
-            # Wyciągnij kwotę czynszu
-            rent_value = extract_numeric_value(value)
-            if rent_value and rent_value > 0:
-                result['rent_amount'] = rent_value
-        elif 'rynek' in label:
-            if 'pierwotny' in value:
-                result['market'] = 'pierwotny'
-            elif 'wtórny' in value:
-                result['market'] = 'wtórny'
-    
-    # Szukaj cech boolean w sekcji "Informacje dodatkowe"
-    additional_info_containers = details_container.select('span.css-axw7ok.esen0m94')
-    for span in additional_info_containers:
-        feature_text = clean_text(span.get_text()).lower()
-        
-        if 'balkon' in feature_text:
-            result['boolean_features']['has_balcony'] = True
-        elif 'garaż' in feature_text or 'parking' in feature_text:
-            result['boolean_features']['has_garage'] = True
-        elif 'ogród' in feature_text or 'działka' in feature_text:
-            result['boolean_features']['has_garden'] = True
-        elif 'piwnica' in feature_text:
-            result['boolean_features']['has_basement'] = True
-        elif 'oddzielna kuchnia' in feature_text:
-            result['boolean_features']['has_separate_kitchen'] = True
-        elif 'winda' in feature_text:
-            result['boolean_features']['has_elevator'] = True
+        if listing:
+            listing["source"] = "otodom.pl"
+            listing["source_page"] = page
+            listing["source_position"] = i + 1
+            page_listings.append(listing)
+    return page_listings, total_pages
+
+def scrape_results_page_json(url: str) -> Optional[Dict]:
+    """
+    Pobiera stronę wyników zwykłym HTTP i czyta dane z __NEXT_DATA__
     
-    return result
+    Args:
+        url: URL strony wyników
+    
+    Returns:
+        Dict: Wynik parse_search_page (items, total_pages, ...) lub None gdy
+              JSON jest niedostępny - wtedy należy użyć ścieżki Selenium/DOM
+    """
+    try:
+        soup = get_soup(url, use_selenium=False, parse_only=NEXT_DATA_ONLY)
+        search_page = parse_search_page(extract_next_data(soup))
+        if search_page is None:
+            logger.warning(f"⚠️ Brak danych __NEXT_DATA__ na stronie wyników - fallback do Selenium")
+        return search_page
+    except Exception as e:
+        logger.warning(f"⚠️ Szybka ścieżka JSON nieudana dla {url}: {e} - fallback do Selenium")
+        return None
 
-def scrape_individual_listing(url: str) -> Dict:
+def scrape_individual_listing_json(url: str) -> Optional[Dict]:
+    """
+    Pobiera stronę ogłoszenia zwykłym HTTP i mapuje __NEXT_DATA__ na szczegóły
+    
+    Args:
+        url: URL do strony ogłoszenia
+    
+    Returns:
+        Dict: Szczegółowe dane (te same klucze co ścieżka DOM) lub None
+    """
+    try:
+        html = get_html(url, use_selenium=False)
+        detailed_data = get_parse_pool().parse(parse_ad_html, html)
+        if detailed_data:
+            logger.debug(f"✅ Szczegóły z __NEXT_DATA__: {url}")
+        return detailed_data
+    except Exception as e:
+        logger.debug(f"⚠️ Szybka ścieżka JSON nieudana dla {url}: {e}")
+        return None
+
+def scrape_individual_listing(url: str, prefer_json: bool = True) -> Dict:
     """
     Scrapuje szczegółowe dane z indywidualnej strony ogłoszenia
     
     Args:
         url: URL do strony ogłoszenia
+        prefer_json: Czy najpierw próbować danych __NEXT_DATA__ (Selenium tylko jako fallback)
     
     Returns:
         Dict: Szczegółowe dane z ogłoszenia
     """
     try:
-        # Pobierz stronę ogłoszenia
-        soup = get_soup(url, use_selenium=True)
+        if prefer_json:
+            detailed_data = scrape_individual_listing_json(url)
+            if detailed_data:
+                return detailed_data
         
-        if not soup:
+        # Pobierz stronę ogłoszenia - parsowanie DOM w puli procesów
+        html = get_html(url, use_selenium=True)
+        
+        if not html:
             logger.error(f"❌ Nie udało się załadować strony: {url}")
             return {}
         
-        # Dodaj krótkie opóźnienie między requestami
-        random_delay()
-        
-        # Struktura wynikowa
-        detailed_data = {
-            "year_of_construction": None,
-            "building_type": None,
-            "floor": None,
-            "total_floors": None,
-            "standard_of_finish": None,
-            "heating_type": None,
-            "rent_amount": None,
-            "has_balcony": False,
-            "has_garage": False,
-            "has_garden": False,
-            "has_elevator": False,
-            "has_basement": False,
-            "has_separate_kitchen": False,
-            "has_dishwasher": False,
-            "has_fridge": False,
-            "has_oven": False,
-            "security_features": [],
-            "media_features": []
-        }
-        
-        # Znajdź sekcję AdDetails
-        details_container = soup.select_one('[data-sentry-component="AdDetailsBase"]')
-        if not details_container:
-            # Fallback - szukaj innych kontenerów ze szczegółami
-            details_container = soup.select_one('.css-8mnxk5') or soup
-        
-        # Parsuj szczegóły z par klucz-wartość
-        item_containers = details_container.select('[data-sentry-source-file="AdDetailItem.tsx"].css-1xw0jqp')
-        
-        for container in item_containers:
-            # Znajdź etykietę i wartość
-            label_elem = container.select_one('p.esen0m92.css-1airkmu:first-child')
-            value_elem = container.select_one('p.esen0m92.css-1airkmu:nth-child(2), p.esen0m92.css-wcoypf')
-            
-            if not label_elem or not value_elem:
-                continue
-                
-            label = clean_text(label_elem.get_text()).lower()
-            value = clean_text(value_elem.get_text()).lower()
-            
-            # Mapowanie pól szczegółowych
-            if 'piętro' in label:
-                # Format: "3/4" -> floor=3, total_floors=4
-                if '/' in value:
-                    parts = value.split('/')
-                    try:
-                        detailed_data['floor'] = int(parts[0].strip())
-                        detailed_data['total_floors'] = int(parts[1].strip())
-                    except (ValueError, IndexError):
-                        pass
-            elif 'rok budowy' in label:
-                try:
-                    year = int(value.strip())
-                    if 1800 <= year <= 2030:  # Walidacja rozsądnych lat
-                        detailed_data['year_of_construction'] = year
-                except ValueError:
-                    pass
-            elif 'winda' in label:
-                detailed_data['has_elevator'] = 'tak' in value or 'yes' in value
-            elif 'rodzaj zabudowy' in label:
-                # Mapuj na enum wartości z bazy
-                building_mapping = {
-                    'blok': 'blok',
-                    'kamienica': 'kamienica', 
-                    'apartamentowiec': 'apartamentowiec',
-                    'dom wielorodzinny': 'dom wielorodzinny',
-                    'wielka płyta': 'wielka płyta'
-                }
-                for key, mapped_value in building_mapping.items():
-                    if key in value:
-                        detailed_data['building_type'] = mapped_value
-                        break
-                if not detailed_data['building_type']:
-                    detailed_data['building_type'] = 'inny'
-            elif 'stan wykończenia' in label:
-                # Mapuj na liczby (standard_of_finish to tinyint)
-                finish_mapping = {
-                    'do zamieszkania': 1,
-                    'gotowe do zamieszkania': 1,
-                    'developerski': 2,
-                    'deweloperski': 2,
-                    'do wykończenia': 3,
-                    'do remontu': 4,
-                    'surowy otwarty': 5,
-                    'surowy zamknięty': 6
-                }
-                for key, mapped_value in finish_mapping.items():
-                    if key in value:
-                        detailed_data['standard_of_finish'] = mapped_value
-                        break
-            elif 'ogrzewanie' in label:
-                detailed_data['heating_type'] = value
-            elif 'czynsz' in label:
-                # Wyciągnij kwotę czynszu
-                rent_value = extract_numeric_value(value)
-                if rent_value and rent_value > 0:
-                    detailed_data['rent_amount'] = rent_value
-            elif 'rynek' in label:
-                # To jest już parsowane na poziomie listing, ale dla pewności
-                if 'pierwotny' in value:
-                    detailed_data['market'] = 'pierwotny'
-                elif 'wtórny' in value:
-                    detailed_data['market'] = 'wtórny'
-        
-        # Parsuj cechy boolean z sekcji "Informacje dodatkowe"
-        additional_info_containers = details_container.select('span.css-axw7ok.esen0m94')
-        for span in additional_info_containers:
-            feature_text = clean_text(span.get_text()).lower()
-            
-            if 'balkon' in feature_text:
-                detailed_data['has_balcony'] = True
-            elif 'garaż' in feature_text or 'parking' in feature_text:
-                detailed_data['has_garage'] = True
-            elif 'ogród' in feature_text or 'działka' in feature_text:
-                detailed_data['has_garden'] = True
-            elif 'piwnica' in feature_text:
-                detailed_data['has_basement'] = True
-            elif 'oddzielna kuchnia' in feature_text:
-                detailed_data['has_separate_kitchen'] = True
-            elif 'winda' in feature_text:
-                detailed_data['has_elevator'] = True
-            elif 'zmywarka' in feature_text:
-                detailed_data['has_dishwasher'] = True
-            elif 'lodówka' in feature_text:
-                detailed_data['has_fridge'] = True
-            elif 'piekarnik' in feature_text:
-                detailed_data['has_oven'] = True
-        
-        # Pobierz ID ogłoszenia z sekcji opisu
-        try:
-            # Szukaj ID w sekcji z opisem - używamy dokładnego selektora z przykładu
-            id_element = soup.select_one('p.e1izz2zk2.css-htq2ld')
-            if id_element and 'ID:' in id_element.get_text():
-                id_text = id_element.get_text()
-                # Wyciągnij samo ID (np. z "ID: 66708040")
-                id_match = re.search(r'ID:\s*(\d+)', id_text)
-                if id_match:
-                    detailed_data['listing_id'] = id_match.group(1)
-                    logger.debug(f"✅ Pobrano ID ogłoszenia: {detailed_data['listing_id']}")
-            else:
-                # Fallback - szukaj innych możliwych selektorów ID
-                fallback_selectors = [
-                    "p:contains('ID:')",
-                    "[data-cy*='id']",
-                    "*:contains('ID:')"
-                ]
-                for selector in fallback_selectors:
-                    try:
-                        id_element = soup.select_one(selector)
-                        if id_element and 'ID:' in id_element.get_text():
-                            id_text = id_element.get_text()
-                            id_match = re.search(r'ID:\s*(\d+)', id_text)
-                            if id_match:
-                                detailed_data['listing_id'] = id_match.group(1)
-                                logger.debug(f"✅ Pobrano ID (fallback): {detailed_data['listing_id']}")
-                                break
-                    except:
-                        continue
-        except Exception as e:
-            logger.warning(f"⚠️ Nie udało się pobrać ID ogłoszenia: {e}")
-        
-        # Parsuj sekcje rozwijane (Wyposażenie, Zabezpieczenia, Media)
-        parse_equipment_sections(soup, detailed_data)
+        detailed_data = get_parse_pool().parse(parse_ad_html, html, False, True)
         
         logger.debug(f"✅ Szczegóły pobrane: {sum(1 for v in detailed_data.values() if v)} pól wypełnionych")
         return detailed_data
@@ -878,62 +1328,6 @@ def scrape_individual_listing(url: str) -> Dict:
         logger.error(f"❌ Błąd scrapingu szczegółów {url}: {e}")
         return {}
 
-def parse_equipment_sections(soup, detailed_data: Dict):
-    """
-    Parsuje sekcje wyposażenia, zabezpieczeń i mediów z rozwijanych accordionów
-    
-    Args:
-        soup: BeautifulSoup object strony
-        detailed_data: Słownik do aktualizacji danymi
-    """
-    try:
-        # Znajdź wszystkie sekcje accordion
-        accordion_sections = soup.select('[data-isopen="false"] .n-accordionitem-content, [data-isopen="true"] .n-accordionitem-content')
-        
-        for section in accordion_sections:
-            # Sprawdź content sekcji
-            section_text = clean_text(section.get_text()).lower()
-            
-            # Parsuj cechy z wyposażenia
-            equipment_spans = section.select('span.css-axw7ok.esen0m94')
-            for span in equipment_spans:
-                feature_text = clean_text(span.get_text()).lower()
-                
-                # Wyposażenie AGD
-                if 'zmywarka' in feature_text:
-                    detailed_data['has_dishwasher'] = True
-                elif 'lodówka' in feature_text:
-                    detailed_data['has_fridge'] = True
-                elif 'piekarnik' in feature_text:
-                    detailed_data['has_oven'] = True
-                
-                # Zabezpieczenia
-                elif 'antywłamaniowe' in feature_text or 'drzwi antywłamaniowe' in feature_text:
-                    if 'security_features' not in detailed_data:
-                        detailed_data['security_features'] = []
-                    detailed_data['security_features'].append('drzwi_antywlamaniowe')
-                elif 'domofon' in feature_text or 'wideofon' in feature_text:
-                    if 'security_features' not in detailed_data:
-                        detailed_data['security_features'] = []
-                    detailed_data['security_features'].append('domofon')
-                
-                # Media
-                elif 'internet' in feature_text:
-                    if 'media_features' not in detailed_data:
-                        detailed_data['media_features'] = []
-                    detailed_data['media_features'].append('internet')
-                elif 'telewizja kablowa' in feature_text:
-                    if 'media_features' not in detailed_data:
-                        detailed_data['media_features'] = []
-                    detailed_data['media_features'].append('tv_kablowa')
-                elif 'telefon' in feature_text:
-                    if 'media_features' not in detailed_data:
-                        detailed_data['media_features'] = []
-                    detailed_data['media_features'].append('telefon')
-    
-    except Exception as e:
-        logger.debug(f"⚠️ Błąd parsowania sekcji wyposażenia: {e}")
-
 def parse_address_components(address_raw: str) -> Dict[str, str]:
     """
     Parsuje adres na komponenty: ulica, dzielnica, miasto, województwo
@@ -0,0 +1,271 @@
+#!/usr/bin/env python3
+"""
+SHARDOWANY CRAWL OTODOM.PL
+Planer dzieli przestrzeń wyszukiwania (cała Polska) na niezależne adresy
+wyników - województwa, a zbyt duże województwa dalej na przedziały cen -
+tak, by każdy shard miał około TARGET_SHARD_PAGES stron. Shardy są
+wykonywane równolegle w osobnych procesach (lub na wielu maszynach przez
+--shard-index/--shard-count), każdy z własnym checkpointem.
+"""
+import json
+import logging
+import multiprocessing
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Optional
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+
+# Dodaj główny katalog do ścieżki
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from src.scrapers.otodom_scraper import (
+    DEFAULT_BASE_URL, INCREMENTAL_STOP_AFTER_KNOWN_PAGES, build_results_page_url,
+    scrape_results_page_json, iter_otodom_listings
+)
+from src.fetching.rate_limiter import get_rate_limiter, HOST_LIMITS
+
+logger = logging.getLogger(__name__)
+
+# Konfiguracja planera
+TARGET_SHARD_PAGES = 50          # Docelowa liczba stron wyników na shard
+MIN_PRICE_BAND = 20_000          # Najwęższy przedział cen (zł) - dalej nie dzielimy
+PRICE_ROUNDING = 10_000
+PRICE_BREAKPOINTS = [300_000, 500_000, 700_000, 1_000_000, 1_500_000, 2_500_000]
+MAX_PRICE = 50_000_000           # Powyżej tej ceny przedział otwarty nie jest dzielony
+SHARD_CHECKPOINT_DIR = Path.home() / ".otodom_shards"
+OTODOM_HOST = "www.otodom.pl"
+
+# Województwa w adresach wyników Otodom
+VOIVODESHIPS = [
+    "dolnoslaskie", "kujawsko--pomorskie", "lodzkie", "lubelskie", "lubuskie",
+    "malopolskie", "mazowieckie", "opolskie", "podkarpackie", "podlaskie",
+    "pomorskie", "slaskie", "swietokrzyskie", "warminsko--mazurskie",
+    "wielkopolskie", "zachodniopomorskie",
+]
+
+
+class Shard(NamedTuple):
+    """Niezależny fragment przestrzeni wyszukiwania"""
+    name: str
+    url: str
+    estimated_pages: Optional[int] = None
+
+
+def _with_params(url: str, **params) -> str:
+    """Dodaje/zastępuje parametry query w URL (None usuwa parametr)"""
+    parts = urlsplit(url)
+    query = dict(parse_qsl(parts.query))
+    for key, value in params.items():
+        if value is None:
+            query.pop(key, None)
+        else:
+            query[key] = str(value)
+    return urlunsplit(parts._replace(query=urlencode(query)))
+
+
+def _region_url(base_url: str, region: str) -> str:
+    """Zastępuje końcowy segment 'cala-polska' adresu wyników województwem"""
+    parts = urlsplit(base_url)
+    path = parts.path.rstrip("/").rsplit("/", 1)[0] + f"/{region}"
+    return urlunsplit(parts._replace(path=path))
+
+
+def probe_total_pages(url: str) -> Optional[int]:
+    """Liczba stron wyników dla adresu (z __NEXT_DATA__ pierwszej strony)"""
+    try:
+        search_page = scrape_results_page_json(build_results_page_url(url))
+    except Exception as e:
+        logger.warning(f"⚠️ Nie udało się sprawdzić liczby stron {url}: {e}")
+        return None
+    if search_page is None:
+        return None
+    return search_page["total_pages"] or (1 if search_page["items"] else 0)
+
+
+def _split_by_price(name: str, url: str, low: int, high: Optional[int], pages: Optional[int],
+                    target_pages: int) -> List[Shard]:
+    """Dzieli przedział cen na pół, dopóki shard jest większy niż target_pages stron"""
+    if pages is not None and pages <= target_pages:
+        return [Shard(name, url, pages)] if pages else []
+    if high is None:
+        # Otwarty przedział "od X wzwyż" - podwajamy dolną granicę
+        if not low or low >= MAX_PRICE:
+            return [Shard(name, url, pages)]
+        bands = ((low, 2 * low - 1), (2 * low, None))
+    elif high - low < 2 * MIN_PRICE_BAND:
+        return [Shard(name, url, pages)]
+    else:
+        middle = (low + high) // 2 // PRICE_ROUNDING * PRICE_ROUNDING
+        bands = ((low, middle - 1), (middle, high))
+
+    shards = []
+    for band_low, band_high in bands:
+        band_url = _with_params(url, priceMin=band_low or None, priceMax=band_high)
+        band_name = f"{name.rsplit('-cena-', 1)[0]}-cena-{band_low}-{band_high if band_high is not None else 'max'}"
+        shards += _split_by_price(band_name, band_url, band_low, band_high,
+                                  probe_total_pages(band_url), target_pages)
+    return shards
+
+
+def plan_shards(base_url: str = DEFAULT_BASE_URL, target_pages: int = TARGET_SHARD_PAGES) -> List[Shard]:
+    """
+    Dzieli wyszukiwanie na shardy o rozmiarze około target_pages stron
+
+    Adres 'cala-polska' jest dzielony na województwa; każdy obszar większy niż
+    target_pages stron - na przedziały cen (PRICE_BREAKPOINTS, potem połowienie).
+
+    Args:
+        base_url: Podstawowy URL wyników (filtry w query są zachowywane)
+        target_pages: Docelowa liczba stron na shard
+
+    Returns:
+        List[Shard]: Shardy w deterministycznej kolejności
+    """
+    if urlsplit(base_url).path.rstrip("/").endswith("/cala-polska"):
+        regions = [(region, _region_url(base_url, region)) for region in VOIVODESHIPS]
+    else:
+        regions = [(urlsplit(base_url).path.rstrip("/").rsplit("/", 1)[-1] or "wyniki", base_url)]
+
+    shards = []
+    for name, url in regions:
+        pages = probe_total_pages(url)
+        if pages is not None and pages <= target_pages:
+            if pages:
+                shards.append(Shard(name, url, pages))
+            continue
+
+        # Obszar za duży (lub nieznany) - przedziały cen
+        bounds = [0] + PRICE_BREAKPOINTS + [None]
+        for low, high in zip(bounds, bounds[1:]):
+            band_high = high - 1 if high is not None else None
+            band_url = _with_params(url, priceMin=low or None, priceMax=band_high)
+            band_name = f"{name}-cena-{low}-{band_high if band_high is not None else 'max'}"
+            shards += _split_by_price(band_name, band_url, low, band_high,
+                                      probe_total_pages(band_url), target_pages)
+
+    estimated = sum(shard.estimated_pages or 0 for shard in shards)
+    logger.info(f"🧩 Plan shardów: {len(shards)} shardów, ~{estimated} stron wyników")
+    return shards
+
+
+def save_shard_plan(shards: List[Shard], path: Path):
+    """Zapisuje plan shardów (JSON) - wspólny dla wielu maszyn"""
+    Path(path).write_text(json.dumps([shard._asdict() for shard in shards], ensure_ascii=False, indent=2),
+                          encoding="utf-8")
+
+
+def load_shard_plan(path: Path) -> List[Shard]:
+    """Wczytuje plan shardów zapisany przez save_shard_plan"""
+    return [Shard(**entry) for entry in json.loads(Path(path).read_text(encoding="utf-8"))]
+
+
+def select_shards(shards: List[Shard], shard_index: int = 0, shard_count: int = 1) -> List[Shard]:
+    """Shardy przypisane jednej maszynie (co shard_count-ty, od shard_index)"""
+    return shards[shard_index::shard_count]
+
+
+def shard_checkpoint_file(shard: Shard) -> Path:
+    """Osobny plik checkpointu dla każdego shardu"""
+    return SHARD_CHECKPOINT_DIR / f"{shard.name}.json"
+
+
+def _init_shard_worker(workers: int, options: Dict):
+    """Inicjalizacja procesu: podział limitu tempa hosta, archiwum/replay, indeks znanych ogłoszeń"""
+    from src.fetching.html_archive import configure_html_archive, enable_replay_mode
+
+    # Procesy mają osobne limitery - każdy dostaje swoją część limitu hosta
+    rate, burst = options.get("host_limit") or HOST_LIMITS.get(OTODOM_HOST, (2.0, 4))
+    get_rate_limiter().configure(OTODOM_HOST, rate / workers, max(1, burst // workers))
+
+    configure_html_archive(root=options.get("archive_dir"), enabled=options.get("archive_enabled"))
+    if options.get("replay"):
+        enable_replay_mode(before=options.get("replay_before"))
+    elif options.get("load_known_index", True):
+        from src.deduplication.known_index import load_known_index
+        load_known_index()
+
+
+def _run_shard(shard: Shard, options: Dict) -> Dict:
+    """Proces roboczy: crawl jednego shardu z zapisem batchami do bazy"""
+    from mysql_utils import save_listings_to_mysql
+    from src.deduplication.deduplicator import deduplicate_listings
+
+    stats = {"shard": shard.name, "listings": 0, "saved": 0, "error": None}
+    batch_size = options.get("batch_size") or 100
+
+    def save_batch(batch: List[Dict]):
+        unique_batch = deduplicate_listings(batch, similarity_threshold=75.0, keep_best_source=True)
+        stats["saved"] += save_listings_to_mysql(unique_batch, require_complete=False)
+
+    batch = []
+    try:
+        shard_checkpoint_file(shard).parent.mkdir(parents=True, exist_ok=True)
+        for listing in iter_otodom_listings(base_url=shard.url,
+                                            max_pages=options.get("max_pages", 0),
+                                            scrape_details=options.get("scrape_details", True),
+                                            resume=True,
+                                            max_workers=options.get("max_workers", 4),
+                                            enable_geocoding=options.get("enable_geocoding", True),
+                                            incremental=options.get("incremental", False),
+                                            stop_after_known_pages=options.get("stop_after_known_pages",
+                                                                               INCREMENTAL_STOP_AFTER_KNOWN_PAGES),
+                                            checkpoint_file=shard_checkpoint_file(shard)):
+            stats["listings"] += 1
+            batch.append(listing)
+            if len(batch) >= batch_size:
+                save_batch(batch)
+                batch.clear()
+        if batch:
+            save_batch(batch)
+    except Exception as e:
+        logger.error(f"❌ Błąd shardu {shard.name}: {e}")
+        stats["error"] = str(e)
+    return stats
+
+
+def run_shards(shards: List[Shard], workers: int = 4, **options) -> Dict:
+    """
+    Wykonuje shardy równolegle w osobnych procesach i scala wyniki
+
+    Każdy proces zapisuje swoje ogłoszenia batchami do bazy (unikalny URL scala
+    shardy), a limit tempa hosta jest dzielony między procesy.
+
+    Args:
+        shards: Shardy do wykonania
+        workers: Liczba równoległych procesów
+        **options: max_pages (na shard), scrape_details, max_workers, enable_geocoding,
+                   incremental, stop_after_known_pages, batch_size, replay, replay_before,
+                   archive_dir, archive_enabled
+
+    Returns:
+        Dict: Zbiorcze statystyki (shards, listings, saved, failed)
+    """
+    workers = max(1, min(workers, len(shards) or 1))
+    summary = {"shards": len(shards), "listings": 0, "saved": 0, "failed": []}
+    if not shards:
+        return summary
+
+    logger.info(f"🧩 Uruchamiam {len(shards)} shardów w {workers} procesach")
+    options.setdefault("host_limit", HOST_LIMITS.get(OTODOM_HOST, (2.0, 4)))
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context,
+                             initializer=_init_shard_worker, initargs=(workers, options)) as executor:
+        futures = {executor.submit(_run_shard, shard, options): shard for shard in shards}
+        for done, future in enumerate(as_completed(futures), 1):
+            shard = futures[future]
+            try:
+                stats = future.result()
+            except Exception as e:
+                stats = {"shard": shard.name, "listings": 0, "saved": 0, "error": str(e)}
+            summary["listings"] += stats["listings"]
+            summary["saved"] += stats["saved"]
+            if stats["error"]:
+                summary["failed"].append(shard.name)
+            logger.info(f"🧩 [{done}/{len(shards)}] {shard.name}: {stats['listings']} ogłoszeń, "
+                        f"zapisano {stats['saved']}{' ❌ ' + stats['error'] if stats['error'] else ''}")
+
+    logger.info(f"✅ Shardy zakończone: {summary['listings']} ogłoszeń, zapisano {summary['saved']}, "
+                f"błędy: {len(summary['failed'])}")
+    return summary
@@ -0,0 +1,253 @@
+#!/usr/bin/env python3
+"""
+CRAWL OTODOM.PL Z TRWAŁEJ KOLEJKI ZADAŃ
+Zamiast jednej pętli po stronach: strony wyników i szczegóły ogłoszeń są
+zadaniami w kolejce (src/scrapers/work_queue.py). Każdy uruchomiony worker
+- lokalny proces, job macierzy GitHub Actions, inna maszyna - pobiera
+zadania, zapisuje ogłoszenia do bazy i dopisuje kolejne zadania, więc
+przepustowość rośnie z liczbą workerów.
+"""
+import logging
+import os
+import socket
+import sys
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+# Dodaj główny katalog do ścieżki
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from src.scrapers.otodom_scraper import (
+    DEFAULT_BASE_URL, INCREMENTAL_STOP_AFTER_KNOWN_PAGES, build_results_page_url,
+    scrape_results_page, scrape_individual_listing
+)
+from src.scrapers.work_queue import WorkQueue, Task, DEFAULT_VISIBILITY_TIMEOUT
+from src.scrapers.listing import Listing
+from src.deduplication.known_index import get_known_index, CARD_UNCHANGED
+
+logger = logging.getLogger(__name__)
+
+# Rodzaje zadań
+TASK_RESULTS_PAGE = "results_page"
+TASK_DETAIL = "detail"
+
+# Konfiguracja workera
+RESULTS_PAGE_PRIORITY = 10        # Strony wyników przed szczegółami - szybciej rośnie pula pracy
+DETAIL_LEASE_BATCH = 20           # Ile zadań szczegółów worker bierze naraz
+IDLE_POLL_SECONDS = 5.0           # Odstęp sprawdzania kolejki, gdy chwilowo nie ma zadań
+
+
+def default_run_id() -> str:
+    """Identyfikator przebiegu - te same zadania w różnych przebiegach mają różne klucze"""
+    return datetime.now().strftime("%Y%m%d%H")
+
+
+def default_worker_id() -> str:
+    """Unikalny identyfikator workera (właściciel leasów)"""
+    return f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:6]}"
+
+
+def _page_task(run_id: str, base_url: str, page: int, options: Dict) -> tuple:
+    payload = dict(options, run_id=run_id, base_url=base_url, page=page)
+    return TASK_RESULTS_PAGE, payload, f"{run_id}:page:{base_url}:{page}"
+
+
+def seed_crawl(queue: WorkQueue, base_url: str = DEFAULT_BASE_URL, run_id: Optional[str] = None,
+               max_pages: int = 0, incremental: bool = False,
+               stop_after_known_pages: int = INCREMENTAL_STOP_AFTER_KNOWN_PAGES) -> str:
+    """
+    Zakłada przebieg crawlu: zadanie pierwszej strony wyników
+
+    Kolejne strony dopisuje worker, który przetworzy stronę 1 (znając liczbę stron),
+    a w trybie przyrostowym lub przy nieznanej liczbie stron - worker poprzedniej strony
+    (dopóki pojawiają się nowe ogłoszenia / strona ma karty).
+    Ponowne wywołanie z tym samym run_id niczego nie duplikuje.
+
+    Returns:
+        str: Identyfikator przebiegu
+    """
+    run_id = run_id or default_run_id()
+    options = {"max_pages": max_pages or 0, "incremental": incremental,
+               "stop_after_known_pages": stop_after_known_pages, "known_streak": 0}
+    queue.enqueue_many([_page_task(run_id, base_url, 1, options)], priority=RESULTS_PAGE_PRIORITY)
+    logger.info(f"🌱 Przebieg {run_id}: zadanie strony 1 dla {base_url}")
+    return run_id
+
+
+def handle_results_page(queue: WorkQueue, task: Task, scrape_details: bool = True,
+                        prefer_json: bool = True) -> int:
+    """
+    Przetwarza zadanie strony wyników: zadania szczegółów dla nowych/zmienionych kart
+    i zadania kolejnych stron
+
+    Returns:
+        int: Liczba zadań szczegółów dopisanych do kolejki
+    """
+    from mysql_utils import save_listings_to_mysql
+
+    payload = task.payload
+    run_id, base_url, page = payload["run_id"], payload["base_url"], payload["page"]
+    url = build_results_page_url(base_url, page, newest_first=payload.get("incremental", False))
+    page_listings, total_pages = scrape_results_page(url, page, prefer_json)
+    logger.info(f"📋 [{run_id}] Strona {page}: {len(page_listings)} ogłoszeń")
+
+    known_index = get_known_index()
+    for listing in page_listings:
+        listing["card_status"] = known_index.card_status(listing)
+    fresh = [listing for listing in page_listings if listing["card_status"] != CARD_UNCHANGED]
+
+    # Karty bez szczegółów (lub niezmienione) trafiają do bazy od razu
+    if not scrape_details:
+        save_listings_to_mysql(page_listings, require_complete=False)
+    else:
+        unchanged = [listing for listing in page_listings if listing["card_status"] == CARD_UNCHANGED]
+        if unchanged:
+            save_listings_to_mysql(unchanged, require_complete=False)
+
+    added = 0
+    if scrape_details and fresh:
+        added = queue.enqueue_many(
+            [(TASK_DETAIL, {"run_id": run_id, "listing": dict(listing)}, f"{run_id}:detail:{listing['url']}")
+             for listing in fresh if listing.get("url")]
+        )
+
+    # Kolejne strony
+    max_pages = payload.get("max_pages") or 0
+    next_pages = []
+    if payload.get("incremental"):
+        streak = 0 if fresh or not page_listings else payload.get("known_streak", 0) + 1
+        stop_after = payload.get("stop_after_known_pages", INCREMENTAL_STOP_AFTER_KNOWN_PAGES)
+        has_more = page_listings and (not total_pages or page < total_pages)
+        if has_more and streak < stop_after and (not max_pages or page < max_pages):
+            next_pages = [(page + 1, streak)]
+        elif streak >= stop_after:
+            logger.info(f"🏁 [{run_id}] Crawl przyrostowy: {streak} stron pod rząd bez nowych ogłoszeń")
+    elif page == 1 and total_pages:
+        last_page = min(total_pages, max_pages) if max_pages else total_pages
+        next_pages = [(next_page, 0) for next_page in range(2, last_page + 1)]
+    elif page == 1 or payload.get("chained"):
+        # Liczba stron nieznana (np. ścieżka DOM bez "N wyników") - kolejna strona, dopóki są karty
+        has_more = page_listings and (not total_pages or page < total_pages)
+        if has_more and (not max_pages or page < max_pages):
+            next_pages = [(page + 1, 0)]
+            payload = dict(payload, chained=True)
+
+    if next_pages:
+        queue.enqueue_many(
+            [_page_task(run_id, base_url, next_page, dict(payload, known_streak=streak))
+             for next_page, streak in next_pages],
+            priority=RESULTS_PAGE_PRIORITY
+        )
+    return added
+
+
+def handle_detail_batch(queue: WorkQueue, tasks: List[Task], executor: ThreadPoolExecutor,
+                        prefer_json: bool = True) -> Tuple[int, int]:
+    """
+    Pobiera szczegóły partii ogłoszeń, zapisuje je do bazy i potwierdza zadania
+
+    Zadania są potwierdzane dopiero po zapisie (at-least-once); nieudane
+    pobrania wracają do kolejki z opóźnieniem lub trafiają do dead-letter.
+
+    Returns:
+        Tuple[int, int]: Liczba zapisanych ogłoszeń i liczba nieudanych zadań
+    """
+    from mysql_utils import save_listings_to_mysql, get_mysql_connection
+
+    def fetch(task: Task) -> Optional[Dict]:
+        listing = Listing(task.payload["listing"])
+        details = scrape_individual_listing(listing["url"], prefer_json=prefer_json)
+        if not details:
+            return None
+        listing.update(details)
+        return listing
+
+    results = list(zip(tasks, executor.map(_safe(fetch), tasks)))
+    fetched = [(task, listing) for task, (listing, _) in results if listing]
+    for task, (listing, error) in results:
+        if not listing:
+            queue.fail(task, error or "brak szczegółów ogłoszenia")
+
+    saved = save_listings_to_mysql([listing for _, listing in fetched], require_complete=False) if fetched else 0
+    if fetched:
+        # save_listing nie zgłasza błędów połączenia (zwraca False jak dla duplikatu) - potwierdzamy
+        # tylko przy osiągalnej bazie, inaczej zadania wracają do kolejki (jak confirm_saved dla dziennika)
+        try:
+            get_mysql_connection().close()
+        except Exception as e:
+            logger.warning(f"⚠️ Baza nieosiągalna - {len(fetched)} zadań szczegółów wraca do kolejki: {e}")
+            for task, _ in fetched:
+                queue.fail(task, f"baza nieosiągalna: {e}")
+            return 0, len(results)
+    for task, _ in fetched:
+        queue.complete(task)
+    return saved, len(results) - len(fetched)
+
+
+def _safe(func):
+    """Opakowuje funkcję tak, by zwracała (wynik, błąd) zamiast rzucać wyjątek"""
+    def wrapper(*args):
+        try:
+            return func(*args), None
+        except Exception as e:
+            return None, str(e)
+    return wrapper
+
+
+def run_queue_worker(queue: WorkQueue, worker_id: Optional[str] = None, max_workers: int = 4,
+                     scrape_details: bool = True, prefer_json: bool = True,
+                     visibility_timeout: float = DEFAULT_VISIBILITY_TIMEOUT,
+                     exit_when_drained: bool = True) -> Dict[str, int]:
+    """
+    Pętla workera: strony wyników (priorytet), potem partie szczegółów
+
+    Args:
+        queue: Kolejka zadań
+        worker_id: Identyfikator workera (domyślnie host-pid-losowy)
+        max_workers: Liczba wątków pobierających szczegóły
+        scrape_details: Czy pobierać szczegóły ogłoszeń
+        prefer_json: Czy czytać dane z osadzonego JSON __NEXT_DATA__
+        visibility_timeout: Czas leasu zadań (s)
+        exit_when_drained: Zakończ, gdy w kolejce nie ma zadań oczekujących ani w trakcie
+
+    Returns:
+        Dict[str, int]: Statystyki workera (pages, details, saved, failed)
+    """
+    worker_id = worker_id or default_worker_id()
+    stats = {"pages": 0, "details": 0, "saved": 0, "failed": 0}
+    logger.info(f"👷 Worker {worker_id} startuje")
+
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="QueueWorker") as executor:
+        while True:
+            page_tasks = queue.lease(worker_id, [TASK_RESULTS_PAGE], limit=1, visibility_timeout=visibility_timeout)
+            for task in page_tasks:
+                try:
+                    handle_results_page(queue, task, scrape_details, prefer_json)
+                    queue.complete(task)
+                    stats["pages"] += 1
+                except Exception as e:
+                    logger.error(f"❌ Zadanie strony {task.payload.get('page')}: {e}")
+                    queue.fail(task, str(e))
+                    stats["failed"] += 1
+            if page_tasks:
+                continue
+
+            detail_tasks = queue.lease(worker_id, [TASK_DETAIL], limit=DETAIL_LEASE_BATCH,
+                                       visibility_timeout=visibility_timeout)
+            if detail_tasks:
+                saved, failed = handle_detail_batch(queue, detail_tasks, executor, prefer_json)
+                stats["details"] += len(detail_tasks)
+                stats["saved"] += saved
+                stats["failed"] += failed
+                logger.info(f"🔍 Worker {worker_id}: {stats['details']} szczegółów, zapisano {stats['saved']}")
+                continue
+
+            if exit_when_drained and queue.is_drained():
+                break
+            time.sleep(IDLE_POLL_SECONDS)
+
+    logger.info(f"✅ Worker {worker_id} zakończył: {stats}")
+    return stats
@@ -0,0 +1,374 @@
+#!/usr/bin/env python3
+"""
+TRWAŁA KOLEJKA ZADAŃ CRAWLU - LEASE, VISIBILITY TIMEOUT, RETRY, DEAD-LETTER
+Zadania (strony wyników, szczegóły ogłoszeń) leżą w bazie, a dowolna liczba
+workerów - procesów, jobów GitHub Actions, maszyn - pobiera je na czas
+określony leasem. Zadanie workera, który padł, wraca do kolejki po upływie
+visibility timeout; po MAX_ATTEMPTS nieudanych próbach trafia do dead-letter.
+
+Backendy: SQLite (domyślny, jedna maszyna) i MySQL (wiele maszyn, ta sama
+baza co ogłoszenia). Kolejne można dopisać do WORK_QUEUE_BACKENDS.
+"""
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Iterable, List, NamedTuple, Optional, Sequence, Tuple
+
+# Dodaj główny katalog do ścieżki
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+logger = logging.getLogger(__name__)
+
+# Konfiguracja kolejki
+DEFAULT_QUEUE_PATH = Path(os.getenv("WORK_QUEUE_PATH", str(Path.home() / ".otodom_queue.sqlite")))
+DEFAULT_VISIBILITY_TIMEOUT = 300.0   # Czas leasu (s) - po nim zadanie wraca do kolejki
+MAX_ATTEMPTS = 4                     # Próby przed przeniesieniem do dead-letter
+RETRY_BACKOFF_SECONDS = 30.0         # Opóźnienie ponowienia: 30s, 60s, 120s, ...
+QUEUE_TABLE = "crawl_tasks"
+
+# Statusy zadań
+STATUS_PENDING = "pending"
+STATUS_LEASED = "leased"
+STATUS_DONE = "done"
+STATUS_DEAD = "dead"
+
+
+class Task(NamedTuple):
+    """Zadanie pobrane z kolejki"""
+    id: int
+    kind: str
+    payload: Dict
+    attempts: int
+    lease_owner: str
+
+
+def task_key(kind: str, payload: Dict) -> str:
+    """Domyślny klucz deduplikacji zadania (ten sam rodzaj i payload = to samo zadanie)"""
+    data = json.dumps(payload, sort_keys=True, ensure_ascii=False)
+    return f"{kind}:{hashlib.sha1(data.encode('utf-8')).hexdigest()}"
+
+
+class WorkQueue:
+    """
+    Wspólna implementacja kolejki na bazie SQL
+
+    Podklasa dostarcza połączenie (_connect), znacznik parametru (PARAM),
+    DDL tabeli oraz sposób atomowego wyboru zadań do leasu (_select_for_lease).
+    """
+
+    PARAM = "?"
+    TABLE_DDL = ""
+
+    def __init__(self, max_attempts: int = MAX_ATTEMPTS):
+        self.max_attempts = max_attempts
+
+    # --- do nadpisania w backendach ---
+
+    def _connect(self):
+        raise NotImplementedError
+
+    def _begin(self, cursor):
+        raise NotImplementedError
+
+    def _select_for_lease(self, cursor, kinds: Optional[Sequence[str]], now: float, limit: int) -> List[tuple]:
+        raise NotImplementedError
+
+    # --- wspólne operacje ---
+
+    def _sql(self, query: str) -> str:
+        return query.replace("?", self.PARAM)
+
+    def _execute(self, query: str, params: Sequence = (), many: bool = False) -> int:
+        connection = self._connect()
+        cursor = connection.cursor()
+        try:
+            if many:
+                cursor.executemany(self._sql(query), params)
+            else:
+                cursor.execute(self._sql(query), params)
+            connection.commit()
+            return cursor.rowcount
+        finally:
+            cursor.close()
+
+    def enqueue(self, kind: str, payload: Dict, key: Optional[str] = None, priority: int = 0) -> bool:
+        """
+        Dodaje zadanie (ignorowane, jeśli zadanie o tym kluczu już istnieje)
+
+        Returns:
+            bool: True jeśli zadanie zostało dodane
+        """
+        return self.enqueue_many([(kind, payload, key)], priority) > 0
+
+    def enqueue_many(self, tasks: Iterable[Tuple[str, Dict, Optional[str]]], priority: int = 0) -> int:
+        """Dodaje wiele zadań jednym zapytaniem; zwraca liczbę nowych zadań"""
+        now = time.time()
+        rows = [
+            (kind, key or task_key(kind, payload), json.dumps(payload, ensure_ascii=False), priority, now, now)
+            for kind, payload, key in tasks
+        ]
+        if not rows:
+            return 0
+        return self._execute(self._insert_ignore_sql(), rows, many=True)
+
+    def _insert_ignore_sql(self) -> str:
+        return (f"INSERT OR IGNORE INTO {QUEUE_TABLE} (kind, task_key, payload, priority, available_at, updated_at) "
+                f"VALUES (?, ?, ?, ?, ?, ?)")
+
+    def lease(self, worker_id: str, kinds: Optional[Sequence[str]] = None, limit: int = 1,
+              visibility_timeout: float = DEFAULT_VISIBILITY_TIMEOUT) -> List[Task]:
+        """
+        Pobiera zadania na wyłączność do czasu upływu visibility timeout
+
+        Zadania z wygasłym leasem (worker padł) są odzyskiwane; te, które wyczerpały
+        MAX_ATTEMPTS prób, trafiają do dead-letter zamiast do workera.
+
+        Args:
+            worker_id: Identyfikator workera (właściciel leasu)
+            kinds: Rodzaje zadań (None = wszystkie)
+            limit: Maksymalna liczba zadań
+            visibility_timeout: Czas leasu w sekundach
+
+        Returns:
+            List[Task]: Zadania przydzielone workerowi
+        """
+        now = time.time()
+        connection = self._connect()
+        cursor = connection.cursor()
+        tasks = []
+        try:
+            self._begin(cursor)
+            for task_id, kind, payload, attempts in self._select_for_lease(cursor, kinds, now, limit):
+                if attempts >= self.max_attempts:
+                    cursor.execute(self._sql(
+                        f"UPDATE {QUEUE_TABLE} SET status = ?, lease_owner = NULL, last_error = ?, updated_at = ? "
+                        f"WHERE id = ?"), (STATUS_DEAD, "lease wygasł - worker nie ukończył zadania", now, task_id))
+                    continue
+                cursor.execute(self._sql(
+                    f"UPDATE {QUEUE_TABLE} SET status = ?, lease_owner = ?, lease_expires = ?, "
+                    f"attempts = attempts + 1, updated_at = ? WHERE id = ?"),
+                    (STATUS_LEASED, worker_id, now + visibility_timeout, now, task_id))
+                tasks.append(Task(task_id, kind, json.loads(payload), attempts + 1, worker_id))
+            connection.commit()
+        except Exception:
+            connection.rollback()
+            raise
+        finally:
+            cursor.close()
+        return tasks
+
+    def extend(self, task: Task, visibility_timeout: float = DEFAULT_VISIBILITY_TIMEOUT) -> bool:
+        """Przedłuża lease długiego zadania; False gdy lease został już odebrany"""
+        now = time.time()
+        return self._execute(
+            f"UPDATE {QUEUE_TABLE} SET lease_expires = ?, updated_at = ? "
+            f"WHERE id = ? AND status = ? AND lease_owner = ?",
+            (now + visibility_timeout, now, task.id, STATUS_LEASED, task.lease_owner)) > 0
+
+    def complete(self, task: Task) -> bool:
+        """Oznacza zadanie jako wykonane (tylko właściciel aktualnego leasu)"""
+        return self._execute(
+            f"UPDATE {QUEUE_TABLE} SET status = ?, lease_owner = NULL, updated_at = ? "
+            f"WHERE id = ? AND lease_owner = ?",
+            (STATUS_DONE, time.time(), task.id, task.lease_owner)) > 0
+
+    def fail(self, task: Task, error: str) -> str:
+        """
+        Zgłasza nieudane zadanie: ponowienie z wykładniczym opóźnieniem lub dead-letter
+
+        Returns:
+            str: Nowy status zadania (STATUS_PENDING lub STATUS_DEAD)
+        """
+        now = time.time()
+        if task.attempts >= self.max_attempts:
+            status, available_at = STATUS_DEAD, now
+            logger.warning(f"☠️ Zadanie {task.kind} #{task.id} w dead-letter po {task.attempts} próbach: {error}")
+        else:
+            status = STATUS_PENDING
+            available_at = now + RETRY_BACKOFF_SECONDS * 2 ** (task.attempts - 1)
+        self._execute(
+            f"UPDATE {QUEUE_TABLE} SET status = ?, lease_owner = NULL, available_at = ?, last_error = ?, "
+            f"updated_at = ? WHERE id = ? AND lease_owner = ?",
+            (status, available_at, str(error)[:1000], now, task.id, task.lease_owner))
+        return status
+
+    def counts(self) -> Dict[str, int]:
+        """Liczba zadań w każdym statusie"""
+        connection = self._connect()
+        cursor = connection.cursor()
+        try:
+            cursor.execute(f"SELECT status, COUNT(*) FROM {QUEUE_TABLE} GROUP BY status")
+            counts = {STATUS_PENDING: 0, STATUS_LEASED: 0, STATUS_DONE: 0, STATUS_DEAD: 0}
+            counts.update({status: count for status, count in cursor.fetchall()})
+            return counts
+        finally:
+            cursor.close()
+
+    def is_drained(self) -> bool:
+        """Czy w kolejce nie ma już zadań oczekujących ani w trakcie"""
+        counts = self.counts()
+        return counts[STATUS_PENDING] == 0 and counts[STATUS_LEASED] == 0
+
+    def requeue_dead(self, kinds: Optional[Sequence[str]] = None) -> int:
+        """Przywraca zadania z dead-letter do kolejki (z wyzerowanym licznikiem prób)"""
+        query = (f"UPDATE {QUEUE_TABLE} SET status = ?, attempts = 0, available_at = ?, updated_at = ? "
+                 f"WHERE status = ?")
+        params = [STATUS_PENDING, time.time(), time.time(), STATUS_DEAD]
+        if kinds:
+            query += f" AND kind IN ({', '.join('?' * len(kinds))})"
+            params += list(kinds)
+        return self._execute(query, params)
+
+
+class SQLiteWorkQueue(WorkQueue):
+    """Kolejka w pliku SQLite (WAL) - workery na tej samej maszynie / wspólnym dysku"""
+
+    TABLE_DDL = f"""
+        CREATE TABLE IF NOT EXISTS {QUEUE_TABLE} (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            kind TEXT NOT NULL,
+            task_key TEXT NOT NULL UNIQUE,
+            payload TEXT NOT NULL,
+            priority INTEGER NOT NULL DEFAULT 0,
+            status TEXT NOT NULL DEFAULT '{STATUS_PENDING}',
+            attempts INTEGER NOT NULL DEFAULT 0,
+            lease_owner TEXT,
+            lease_expires REAL,
+            available_at REAL NOT NULL,
+            last_error TEXT,
+            updated_at REAL NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idx_{QUEUE_TABLE}_ready ON {QUEUE_TABLE} (status, kind, available_at);
+    """
+
+    def __init__(self, path: Path = DEFAULT_QUEUE_PATH, max_attempts: int = MAX_ATTEMPTS):
+        super().__init__(max_attempts)
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._local = threading.local()
+        connection = self._connect()
+        connection.executescript(self.TABLE_DDL)
+
+    def _connect(self) -> sqlite3.Connection:
+        # Osobne połączenie na wątek; autocommit + jawne transakcje przy leasie
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(str(self.path), timeout=30, isolation_level=None)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self._local.connection = connection
+        return connection
+
+    def _begin(self, cursor):
+        # IMMEDIATE: blokada zapisu od początku - dwa workery nie wybiorą tego samego zadania
+        cursor.execute("BEGIN IMMEDIATE")
+
+    def _select_for_lease(self, cursor, kinds, now, limit):
+        query = (f"SELECT id, kind, payload, attempts FROM {QUEUE_TABLE} "
+                 f"WHERE ((status = ? AND available_at <= ?) OR (status = ? AND lease_expires <= ?))")
+        params = [STATUS_PENDING, now, STATUS_LEASED, now]
+        if kinds:
+            query += f" AND kind IN ({', '.join('?' * len(kinds))})"
+            params += list(kinds)
+        query += " ORDER BY priority DESC, id LIMIT ?"
+        cursor.execute(query, params + [limit])
+        return cursor.fetchall()
+
+
+class MySQLWorkQueue(WorkQueue):
+    """Kolejka w bazie MySQL (ta sama co ogłoszenia) - workery na wielu maszynach"""
+
+    PARAM = "%s"
+    TABLE_DDL = f"""
+        CREATE TABLE IF NOT EXISTS {QUEUE_TABLE} (
+            id BIGINT AUTO_INCREMENT PRIMARY KEY,
+            kind VARCHAR(32) NOT NULL,
+            task_key VARCHAR(128) NOT NULL UNIQUE,
+            payload JSON NOT NULL,
+            priority INT NOT NULL DEFAULT 0,
+            status VARCHAR(16) NOT NULL DEFAULT '{STATUS_PENDING}',
+            attempts INT NOT NULL DEFAULT 0,
+            lease_owner VARCHAR(128),
+            lease_expires DOUBLE,
+            available_at DOUBLE NOT NULL,
+            last_error TEXT,
+            updated_at DOUBLE NOT NULL,
+            INDEX idx_{QUEUE_TABLE}_ready (status, kind, available_at)
+        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
+    """
+
+    def __init__(self, max_attempts: int = MAX_ATTEMPTS):
+        super().__init__(max_attempts)
+        self._local = threading.local()
+        self._execute(self.TABLE_DDL)
+
+    def _connect(self):
+        from mysql_utils import get_mysql_connection
+
+        connection = getattr(self._local, "connection", None)
+        if connection is None or not connection.is_connected():
+            connection = get_mysql_connection()
+            connection.autocommit = False
+            self._local.connection = connection
+        return connection
+
+    def _sql(self, query: str) -> str:
+        return query.replace("?", "%s").replace("INSERT OR IGNORE", "INSERT IGNORE")
+
+    def _begin(self, cursor):
+        cursor.execute("START TRANSACTION")
+
+    def _select_for_lease(self, cursor, kinds, now, limit):
+        # SKIP LOCKED: równolegli workerzy dostają rozłączne zadania bez czekania na siebie
+        query = (f"SELECT id, kind, payload, attempts FROM {QUEUE_TABLE} "
+                 f"WHERE ((status = %s AND available_at <= %s) OR (status = %s AND lease_expires <= %s))")
+        params = [STATUS_PENDING, now, STATUS_LEASED, now]
+        if kinds:
+            query += f" AND kind IN ({', '.join(['%s'] * len(kinds))})"
+            params += list(kinds)
+        query += " ORDER BY priority DESC, id LIMIT %s FOR UPDATE SKIP LOCKED"
+        cursor.execute(query, params + [limit])
+        return cursor.fetchall()
+
+
+# Rejestr backendów: schemat adresu kolejki -> klasa
+WORK_QUEUE_BACKENDS = {
+    "sqlite": SQLiteWorkQueue,
+    "mysql": MySQLWorkQueue,
+}
+
+
+def open_work_queue(spec: Optional[str] = None) -> WorkQueue:
+    """
+    Otwiera kolejkę według adresu
+
+    Args:
+        spec: "sqlite:///ścieżka/kolejki.sqlite" (jak w SQLAlchemy), sama ścieżka pliku SQLite
+              lub "mysql" (tabela crawl_tasks w bazie ogłoszeń); None = DEFAULT_QUEUE_PATH
+
+    Returns:
+        WorkQueue: Kolejka wybranego backendu
+
+    Raises:
+        ValueError: Nieznany backend
+    """
+    if not spec:
+        return SQLiteWorkQueue(DEFAULT_QUEUE_PATH)
+    scheme, separator, location = spec.partition("://")
+    if not separator:
+        if spec in WORK_QUEUE_BACKENDS:
+            return WORK_QUEUE_BACKENDS[spec]()
+        return SQLiteWorkQueue(Path(spec))
+    backend = WORK_QUEUE_BACKENDS.get(scheme)
+    if backend is None:
+        raise ValueError(f"Nieznany backend kolejki: {scheme} (dostępne: {', '.join(WORK_QUEUE_BACKENDS)})")
+    if backend is SQLiteWorkQueue:
+        # Jak w SQLAlchemy: sqlite:///względna.sqlite, sqlite:////bezwzględna.sqlite
+        return SQLiteWorkQueue(Path(location[1:] if location.startswith("/") else location))
+    return backend()
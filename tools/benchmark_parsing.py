@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+BENCHMARK PARSOWANIA HTML
+Porównuje czas i szczytowe zużycie pamięci parsowania strony ogłoszenia:
+html.parser vs lxml, pełne drzewo vs częściowe parsowanie (SoupStrainer).
+
+Użycie:
+    python tools/benchmark_parsing.py                     # syntetyczna strona ogłoszenia
+    python tools/benchmark_parsing.py strona1.html ...    # zapisane strony Otodom
+"""
+import argparse
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+# Dodaj główny katalog do ścieżki
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bs4 import BeautifulSoup
+
+from src.parsers.html_parser import LXML_AVAILABLE, NEXT_DATA_ONLY, AD_PAGE_ONLY, make_soup
+from src.parsers.otodom_json_parser import extract_next_data
+
+
+def build_synthetic_ad_page(filler_blocks: int = 1500) -> str:
+    """Buduje stronę o strukturze zbliżonej do ogłoszenia Otodom (kilkaset KB)"""
+    next_data = {
+        "props": {"pageProps": {"ad": {
+            "id": 66708040,
+            "characteristics": [{"key": f"key_{i}", "value": str(i), "localizedValue": f"wartość {i}"} for i in range(60)],
+            "description": "<p>" + "Przestronne mieszkanie z balkonem. " * 400 + "</p>",
+            "images": [{"large": f"https://ireland.apollo.olxcdn.com/v1/files/{i}/image"} for i in range(40)],
+        }}}
+    }
+    details = "".join(
+        f'<div data-sentry-source-file="AdDetailItem.tsx" class="css-1xw0jqp">'
+        f'<p class="esen0m92 css-1airkmu">Etykieta {i}</p><p class="esen0m92 css-1airkmu">wartość {i}</p></div>'
+        for i in range(20)
+    )
+    accordions = "".join(
+        f'<div data-isopen="false"><div class="n-accordionitem-content">'
+        f'<span class="css-axw7ok esen0m94">cecha {i}</span></div></div>'
+        for i in range(6)
+    )
+    filler = "".join(
+        f'<div class="css-{i:x}"><a href="/pl/oferta/inne-{i}"><img src="/img/{i}.webp" alt="zdjęcie {i}">'
+        f'<span>Polecane ogłoszenie {i}</span></a><svg><path d="M0 0L{i} {i}"/></svg></div>'
+        for i in range(filler_blocks)
+    )
+    return (
+        "<!DOCTYPE html><html lang='pl'><head>"
+        + "".join(f"<link rel='stylesheet' href='/_next/static/css/{i}.css'>" for i in range(30))
+        + "".join(f"<script src='/_next/static/chunks/{i}.js'></script>" for i in range(60))
+        + "</head><body><div id='__next'><header>" + filler[: len(filler) // 3] + "</header><main>"
+        + f'<div data-sentry-component="AdDetailsBase">{details}{accordions}</div>'
+        + '<p class="e1izz2zk2 css-htq2ld">ID: 66708040</p>'
+        + filler[len(filler) // 3:]
+        + "</main></div>"
+        + f'<script id="__NEXT_DATA__" type="application/json">{json.dumps(next_data, ensure_ascii=False)}</script>'
+        + "</body></html>"
+    )
+
+
+def measure(func, markup: str, repeat: int):
+    """Zwraca (średni czas w ms, szczytowa pamięć w MB) dla funkcji parsującej"""
+    func(markup)  # rozgrzewka
+
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func(markup)
+    avg_ms = (time.perf_counter() - start) / repeat * 1000
+
+    tracemalloc.start()
+    func(markup)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return avg_ms, peak / (1024 * 1024)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark backendów parsowania HTML")
+    parser.add_argument("files", nargs="*", help="Zapisane strony HTML (domyślnie strona syntetyczna)")
+    parser.add_argument("--repeat", type=int, default=10, help="Liczba powtórzeń na wariant")
+    args = parser.parse_args()
+
+    if args.files:
+        pages = []
+        for path in args.files:
+            with open(path, encoding="utf-8", errors="replace") as f:
+                pages.append((os.path.basename(path), f.read()))
+    else:
+        pages = [("syntetyczna strona ogłoszenia", build_synthetic_ad_page())]
+
+    variants = [("html.parser - pełne drzewo", lambda m: BeautifulSoup(m, "html.parser"))]
+    if LXML_AVAILABLE:
+        variants.append(("lxml - pełne drzewo", lambda m: BeautifulSoup(m, "lxml")))
+    variants += [
+        ("make_soup - sekcje ogłoszenia (DOM)", lambda m: make_soup(m, AD_PAGE_ONLY)),
+        ("make_soup - tylko __NEXT_DATA__", lambda m: make_soup(m, NEXT_DATA_ONLY)),
+        ("regex __NEXT_DATA__ (bez drzewa)", lambda m: extract_next_data(m)),
+    ]
+
+    print("=" * 80)
+    print("⏱️ BENCHMARK PARSOWANIA HTML")
+    print("=" * 80)
+    for name, markup in pages:
+        print(f"\n📄 {name} ({len(markup) / 1024:.0f} KB, {args.repeat} powtórzeń)")
+        baseline = None
+        for label, func in variants:
+            avg_ms, peak_mb = measure(func, markup, args.repeat)
+            baseline = baseline or avg_ms
+            print(f"   • {label:<40} {avg_ms:8.1f} ms  {peak_mb:7.1f} MB  (x{baseline / avg_ms:.1f})")
+    print("=" * 80)
+
+
+if __name__ == "__main__":
+    main()
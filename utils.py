@@ -1,24 +1,52 @@
-import requests
 from bs4 import BeautifulSoup
-import time
 import random
+import time
 import logging
 from fake_useragent import UserAgent
 import re
 from typing import List, Dict, Tuple, Optional
 
+from src.fetching.driver_pool import get_driver_pool
+from src.fetching.http_session import http_get, record_network_time, ACCEPT_ENCODING
+from src.fetching.rate_limiter import wait_for_slot, get_rate_limiter
+from src.parsers.html_parser import make_soup
+from src.fetching.html_archive import archive_page, replay_page, is_replay_mode, ArchiveMissError
+
 # Konfiguracja domyślna (zastąpienie config.py)
 DEFAULT_DELAY = (1, 3)  # Random delay między requestami (min, max)
 MAX_RETRIES = 3
+RETRY_BACKOFF = (2, 5)  # Wstrzymanie hosta po nieudanej próbie (min, max) w sekundach
 TIMEOUT = 10
 SELENIUM_HEADLESS = True
 SELENIUM_TIMEOUT = 20
-SELENIUM_WAIT_TIME = 2
+SELENIUM_READY_TIMEOUT = 10  # Maksymalne oczekiwanie na gotową treść strony (s)
+
+# Warunki gotowości strony wg typu (wystarczy dowolny selektor z listy)
+RESULTS_PAGE_READY_SELECTORS = ["[data-cy='listing-item']"]
+AD_PAGE_READY_SELECTORS = ['[data-sentry-component="AdDetailsBase"]', "script#__NEXT_DATA__"]
+
+# Lekkie renderowanie: zachowujemy tylko page_source, więc obrazy, fonty, CSS
+# i skrypty śledzące są blokowane (mniej transferu, CPU i pamięci Chrome)
+SELENIUM_LIGHTWEIGHT = True
+BLOCKED_RESOURCE_PATTERNS = [
+    "*.png", "*.jpg", "*.jpeg", "*.gif", "*.webp", "*.avif", "*.svg", "*.ico",
+    "*.woff", "*.woff2", "*.ttf", "*.otf", "*.eot",
+    "*.css",
+    "*.mp4", "*.webm",
+]
+BLOCKED_TRACKER_DOMAINS = [
+    "googletagmanager.com", "google-analytics.com", "doubleclick.net",
+    "googlesyndication.com", "adservice.google.com", "facebook.net",
+    "connect.facebook.net", "hotjar.com", "criteo.com", "criteo.net",
+    "gemius.pl", "hit.gemius.pl", "adform.net", "tiktok.com", "clarity.ms",
+    "bing.com", "onetrust.com", "cookielaw.org", "nr-data.net",
+]
 
 logger = logging.getLogger(__name__)
 ua = UserAgent()
 
-def get_soup(url: str, use_selenium: bool = False, retries: int = MAX_RETRIES) -> BeautifulSoup:
+def get_soup(url: str, use_selenium: bool = False, retries: int = MAX_RETRIES,
+             parse_only=None) -> BeautifulSoup:
     """
     Pobiera i parsuje stronę HTML
     
@@ -26,92 +54,166 @@ def get_soup(url: str, use_selenium: bool = False, retries: int = MAX_RETRIES) -
         url: URL do pobrania
         use_selenium: Czy użyć Selenium (dla JS-heavy stron)
         retries: Liczba prób ponowienia
+        parse_only: Filtr SoupStrainer - parsowane są tylko potrzebne fragmenty strony
     
     Returns:
         BeautifulSoup: Sparsowana strona
     """
+    return make_soup(get_html(url, use_selenium, retries), parse_only)
+
+def get_html(url: str, use_selenium: bool = False, retries: int = MAX_RETRIES) -> str:
+    """
+    Pobiera surowy HTML strony (bez parsowania - np. dla puli procesów parsujących)
+    
+    Args:
+        url: URL do pobrania
+        use_selenium: Czy użyć Selenium (dla JS-heavy stron)
+        retries: Liczba prób ponowienia
+    
+    Returns:
+        str: HTML strony
+    """
     for attempt in range(retries):
         try:
             if use_selenium:
-                return get_soup_selenium(url)
+                return get_html_selenium(url)
             else:
-                return get_soup_requests(url)
+                return get_html_requests(url)
+        except ArchiveMissError:
+            # Tryb replay - ponawianie nic nie da
+            raise
         except Exception as e:
             logger.warning(f"Próba {attempt + 1}/{retries} nieudana dla {url}: {e}")
             if attempt < retries - 1:
-                time.sleep(random.uniform(2, 5))
+                # Backoff przez limiter - kolejne żądania do hosta poczekają (także z innych wątków)
+                get_rate_limiter().bucket(url).penalize(random.uniform(*RETRY_BACKOFF))
             else:
                 raise
 
-def get_soup_requests(url: str) -> BeautifulSoup:
-    """Pobiera stronę używając requests"""
-    headers = {
+def build_request_headers() -> Dict[str, str]:
+    """Nagłówki przeglądarki dla zwykłych żądań HTTP (losowy User-Agent)"""
+    return {
         "User-Agent": ua.random,
         "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
         "Accept-Language": "pl-PL,pl;q=0.8,en-US;q=0.5,en;q=0.3",
-        "Accept-Encoding": "gzip, deflate",
+        "Accept-Encoding": ACCEPT_ENCODING,
         "Connection": "keep-alive",
     }
+
+def get_html_requests(url: str) -> str:
+    """Pobiera stronę używając requests (wspólna sesja z pulą połączeń keep-alive)"""
+    if is_replay_mode():
+        return replay_page(url)
     
-    response = requests.get(url, headers=headers, timeout=TIMEOUT)
+    headers = build_request_headers()
+    
+    response = http_get(url, headers=headers, timeout=TIMEOUT)
     response.raise_for_status()
-    return BeautifulSoup(response.text, "html.parser")
+    archive_page(url, response.text)
+    return response.text
 
-def get_soup_selenium(url: str) -> BeautifulSoup:
-    """Pobiera stronę używając Selenium"""
+def create_chrome_driver():
+    """Tworzy nową instancję headless Chrome (fabryka dla puli przeglądarek)"""
+    from selenium import webdriver
+    from selenium.webdriver.chrome.options import Options
+    
+    options = Options()
+    if SELENIUM_HEADLESS:
+        options.add_argument("--headless")
+    options.add_argument("--no-sandbox")
+    options.add_argument("--disable-dev-shm-usage")
+    options.add_argument("--disable-gpu")
+    options.add_argument("--window-size=1920,1080")
+    options.add_argument(f"--user-agent={ua.random}")
+    options.add_argument("--disable-blink-features=AutomationControlled")
+    options.add_experimental_option("excludeSwitches", ["enable-automation"])
+    options.add_experimental_option('useAutomationExtension', False)
+    
+    if SELENIUM_LIGHTWEIGHT:
+        options.add_argument("--blink-settings=imagesEnabled=false")
+        options.add_experimental_option("prefs", {
+            "profile.managed_default_content_settings.images": 2,
+            "profile.managed_default_content_settings.media_stream": 2,
+            "profile.default_content_setting_values.notifications": 2,
+            "profile.default_content_setting_values.geolocation": 2,
+        })
+    
+    driver = webdriver.Chrome(options=options)
+    driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
+    driver.set_page_load_timeout(SELENIUM_TIMEOUT)
+    
+    if SELENIUM_LIGHTWEIGHT:
+        block_heavy_resources(driver)
+    return driver
+
+def block_heavy_resources(driver):
+    """
+    Blokuje fonty, CSS, obrazy i domeny trackerów przez CDP (Network.setBlockedURLs)
+    
+    Preferencje Chrome wyłączają tylko obrazy - pozostałe typy zasobów
+    i skrypty reklamowe odcinamy na poziomie sieci przeglądarki.
+    """
+    patterns = list(BLOCKED_RESOURCE_PATTERNS)
+    for domain in BLOCKED_TRACKER_DOMAINS:
+        patterns.extend([f"*://{domain}/*", f"*://*.{domain}/*"])
+    
+    try:
+        driver.execute_cdp_cmd("Network.enable", {})
+        driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": patterns})
+        logger.debug(f"🚫 Zablokowano {len(patterns)} wzorców zasobów w Chrome")
+    except Exception as e:
+        # Starsze sterowniki bez CDP - zostają same preferencje (obrazy)
+        logger.debug(f"⚠️ Nie udało się włączyć blokowania zasobów przez CDP: {e}")
+
+def ready_selectors_for(url: str) -> List[str]:
+    """Selektory CSS oznaczające gotową treść dla danego typu strony"""
+    if "/oferta/" in url:
+        return AD_PAGE_READY_SELECTORS
+    if "/wyniki/" in url:
+        return RESULTS_PAGE_READY_SELECTORS
+    return ["body"]
+
+def get_html_selenium(url: str) -> str:
+    """Pobiera stronę używając Selenium (przeglądarka wypożyczana z puli)"""
+    if is_replay_mode():
+        return replay_page(url)
+    
     try:
-        from selenium import webdriver
-        from selenium.webdriver.chrome.options import Options
-        from selenium.webdriver.chrome.service import Service
         from selenium.webdriver.common.by import By
         from selenium.webdriver.support.ui import WebDriverWait
         from selenium.webdriver.support import expected_conditions as EC
+        from selenium.common.exceptions import TimeoutException
         
-        options = Options()
-        if SELENIUM_HEADLESS:
-            options.add_argument("--headless")
-        options.add_argument("--no-sandbox")
-        options.add_argument("--disable-dev-shm-usage")
-        options.add_argument("--disable-gpu")
-        options.add_argument("--window-size=1920,1080")
-        options.add_argument(f"--user-agent={ua.random}")
-        options.add_argument("--disable-blink-features=AutomationControlled")
-        options.add_experimental_option("excludeSwitches", ["enable-automation"])
-        options.add_experimental_option('useAutomationExtension', False)
-        
-        driver = webdriver.Chrome(options=options)
-        driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
-        
-        try:
-            driver.set_page_load_timeout(SELENIUM_TIMEOUT)
-            driver.get(url)
+        # Przeglądarka pochodzi z globalnej puli - nie uruchamiamy Chrome dla każdego URL
+        with get_driver_pool(create_chrome_driver).driver() as driver:
+            wait_for_slot(url)
+            # Kontroler AIMD dostaje tylko czas ładowania strony (bez oczekiwania na treść)
+            start = time.monotonic()
+            try:
+                driver.get(url)
+            finally:
+                record_network_time(time.monotonic() - start)
             
-            # Czekaj na załadowanie podstawowej zawartości
-            WebDriverWait(driver, SELENIUM_WAIT_TIME).until(
-                EC.presence_of_element_located((By.TAG_NAME, "body"))
-            )
-            
-            # Dodatkowe oczekiwanie na JavaScript
-            time.sleep(SELENIUM_WAIT_TIME)
+            # Czekaj aż pojawi się właściwa treść strony - zwykle milisekundy, najwyżej SELENIUM_READY_TIMEOUT
+            selectors = ready_selectors_for(url)
+            try:
+                WebDriverWait(driver, SELENIUM_READY_TIMEOUT).until(EC.any_of(
+                    *(EC.presence_of_element_located((By.CSS_SELECTOR, selector)) for selector in selectors)
+                ))
+            except TimeoutException:
+                logger.warning(f"⏱️ Treść strony nie pojawiła się w {SELENIUM_READY_TIMEOUT}s "
+                               f"({', '.join(selectors)}) - zapisuję częściowy stan: {url}")
             
             html = driver.page_source
-            return BeautifulSoup(html, "html.parser")
-        finally:
-            driver.quit()
+        archive_page(url, html)
+        return html
     except ImportError:
         logger.warning("Selenium nie jest zainstalowany, używam requests")
-        return get_soup_requests(url)
+        return get_html_requests(url)
     except Exception as e:
         logger.error(f"Błąd Selenium: {e}")
         logger.warning("Przełączam na requests")
-        return get_soup_requests(url)
-
-def random_delay():
-    """Losowe opóźnienie między żądaniami, aby uniknąć blokowania przez serwery"""
-    # Zwiększone opóźnienia dla uniknięcia blokad anti-bot
-    delay = random.uniform(3.0, 8.0)  # Było 1.0-3.0, teraz 3.0-8.0
-    logger.debug(f"⏱️ Czekam {delay:.1f} sekund...")
-    time.sleep(delay)
+        return get_html_requests(url)
 
 def clean_text(text: str) -> str:
     """Czyści tekst z niepotrzebnych znaków"""